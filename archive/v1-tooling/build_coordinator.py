@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Run the post enhancers over posts/ and archive/v1-posts in one invocation
+Each corpus gets only its own stage: the archived v1 posts get their
+educational variants, and the live essays in posts/ are left alone unless
+the rich stage is asked for by name, and even then only the v1 posts it
+has content for are touched. Redirect stubs are never enhanced. A single worker pool loads the
+enhancers' tables, templates and compiled rules once per worker, and every
+post is held under its advisory lock while its stage runs, so builds
+started from a hook and by hand can overlap without tearing each other's files
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from page_delta import VARIANT_SUFFIX
+from post_metrics import load_store, measure_post, save_store
+from site_files import SITE_ROOT, FileLock, file_hash
+
+# Stage -> enhancer module
+STAGES = {
+    'rich': 'enhance_all_posts',
+    'educational': 'enhance_posts_educational',
+}
+# Corpus -> the stages a plain run applies to it
+CORPORA = {
+    'posts': (),
+    'archive/v1-posts': ('educational',),
+}
+# Corpus -> stages that only run when named with --stage. The rich stage
+# writes v1 boilerplate into the post itself, so it never reaches the live
+# essays by default, and only touches the posts listed in its own table
+OPT_IN_STAGES = {
+    'posts': ('rich',),
+}
+# Stages that record an enhanced variant; a committed variant page is the
+# published record, so these skip any post that already has one
+VARIANT_STAGES = {'educational'}
+# Stages that rewrite the post itself; the workers refresh its reading time,
+# and its stored metrics are updated afterwards by this process alone
+POST_STAGES = {'rich'}
+# The whole archive is noindex, so there noindex alone does not mark a stub
+ARCHIVE_CORPORA = {'archive/v1-posts'}
+
+REFRESH_RE = re.compile(r'<meta[^>]+http-equiv=["\']refresh["\']', re.IGNORECASE)
+NOINDEX_RE = re.compile(r'<meta[^>]+name=["\']robots["\'][^>]+noindex', re.IGNORECASE)
+
+_modules = {}
+
+
+def _init_worker(stages):
+    """Import each enhancer once: its tables are validated and its rules compiled here"""
+    for name in stages:
+        _modules[name] = importlib.import_module(STAGES[name])
+
+
+def _run_stage(name, path):
+    """Whether the stage changed anything for the post"""
+    module = _modules[name]
+    if name == 'rich':
+        filename = os.path.basename(path)
+        return module.enhance_post(path, module.HIGHLIGHTS.get(filename, module.DEFAULT_HIGHLIGHTS))
+    return module.enhance_post(path) is not None
+
+
+def build_post(job):
+    """Run a post's stages under its lock; returns (path, stages that changed it, output, error)"""
+    path, stages = job
+    out = io.StringIO()
+    changed, error = [], None
+    try:
+        # The enhancers lock the post too; in this thread that only deepens the lock
+        with contextlib.redirect_stdout(out), FileLock(path):
+            for name in stages:
+                if _run_stage(name, path):
+                    changed.append(name)
+    except (OSError, ValueError) as e:
+        error = e
+    return path, changed, out.getvalue(), error
+
+
+def is_stub(path, corpus):
+    """Whether a page is a redirect stub or, outside the archive, otherwise noindex"""
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    if REFRESH_RE.search(html):
+        return True
+    return corpus not in ARCHIVE_CORPORA and bool(NOINDEX_RE.search(html))
+
+
+def stage_posts(name):
+    """Filenames an opt-in stage is limited to"""
+    if name == 'rich':
+        return set(importlib.import_module(STAGES[name]).HIGHLIGHTS)
+    return None
+
+
+def corpus_posts(root, corpora=tuple(CORPORA), stages=None):
+    """(absolute path, stages) of every post the stages apply to, in one global order
+
+    stages=None runs each corpus's default stages; naming stages also
+    allows that corpus's opt-in ones.
+    """
+    jobs = []
+    for corpus in corpora:
+        if corpus not in CORPORA:
+            raise ValueError(f"unknown corpus {corpus!r}; expected one of {', '.join(CORPORA)}")
+        if stages is None:
+            names = CORPORA[corpus]
+        else:
+            names = tuple(name for name in CORPORA[corpus] + OPT_IN_STAGES.get(corpus, ())
+                          if name in stages)
+        if not names:
+            continue
+        allowed = {name: stage_posts(name) for name in names if name in OPT_IN_STAGES.get(corpus, ())}
+        directory = os.path.join(root, corpus)
+        for f in os.listdir(directory):
+            path = os.path.join(directory, f)
+            if not f.endswith('.html') or VARIANT_SUFFIX in f or is_stub(path, corpus):
+                continue
+            variant = os.path.splitext(path)[0] + VARIANT_SUFFIX + '.html'
+            post_stages = tuple(name for name in names
+                                if not (name in VARIANT_STAGES and os.path.exists(variant))
+                                and (allowed.get(name) is None or f in allowed[name]))
+            if post_stages:
+                jobs.append((path, post_stages))
+    # Every build locks in this order, so overlapping builds queue instead of deadlocking
+    return sorted(jobs)
+
+
+def build(root=SITE_ROOT, corpora=tuple(CORPORA), stages=None, workers=None):
+    """Enhance every post; returns [(path, stages that changed it, output, error)] in path order"""
+    jobs = corpus_posts(root, corpora, stages)
+    needed = tuple(name for name in STAGES if any(name in names for _, names in jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(needed,)) as pool:
+        return list(pool.map(build_post, jobs, chunksize=2))
+
+
+def record_metrics(paths):
+    """Measure posts a stage rewrote into the metadata store the index cards read"""
+    if not paths:
+        return
+    store = load_store()
+    for path in paths:
+        with FileLock(path), open(path, 'r', encoding='utf-8') as f:
+            measure_post(os.path.basename(path), f.read(), store)
+    save_store(store)
+
+
+def changed_essays(root=SITE_ROOT, workers=1):
+    """Live essays in posts/ that a plain run would change, found on a copy of both corpora"""
+    tmp = tempfile.mkdtemp(prefix='coordinator-')
+    try:
+        for corpus in CORPORA:
+            shutil.copytree(os.path.join(root, corpus), os.path.join(tmp, corpus))
+        before = {f: file_hash(os.path.join(tmp, 'posts', f))
+                  for f in os.listdir(os.path.join(tmp, 'posts')) if f.endswith('.html')}
+        with contextlib.redirect_stdout(io.StringIO()):
+            build(tmp, workers=workers)
+        return sorted(f for f, digest in before.items()
+                      if file_hash(os.path.join(tmp, 'posts', f)) != digest)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    """Enhance both corpora, each with its own stage, in one locked, shared-pool pass"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('corpora', nargs='*', default=list(CORPORA),
+                        help='post directories relative to the site root (default: both corpora)')
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--stage', action='append', choices=list(STAGES),
+                        help='run this stage where it applies (repeatable; default: each '
+                             'corpus\'s own; the rich stage only runs when named)')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    unknown = sorted(set(args.corpora) - set(CORPORA))
+    if unknown:
+        parser.error(f"unknown corpus {', '.join(unknown)}; expected {', '.join(CORPORA)}")
+
+    start = time.perf_counter()
+    results = build(args.root, args.corpora, args.stage, args.workers)
+    record_metrics([path for path, changed, _, _ in results if POST_STAGES & set(changed)])
+    counts = dict.fromkeys(args.stage or STAGES, 0)
+    errors = 0
+    for path, changed, output, error in results:
+        sys.stdout.write(output)
+        for name in changed:
+            counts[name] += 1
+        if error is not None:
+            errors += 1
+            print(f"❌ {os.path.relpath(path, args.root)}: {error}")
+
+    summary = ', '.join(f"{name} {n}" for name, n in counts.items())
+    print(f"\n{'❌' if errors else '✅'} {len(results)} posts in {len(args.corpora)} corpora "
+          f"({summary} changed, {errors} failed) in {time.perf_counter() - start:.2f}s")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Export the curriculum as a streaming JSONL dataset
+One record per page in posts/, archive/v1-posts and models/: metadata,
+clean text, headings, code blocks with their language and internal links,
+parsed in a single streaming pass. Runs append only the pages whose build
+manifest hash changed; a later line supersedes an earlier one for the same
+path, and {"path": ..., "deleted": true} removes it
+"""
+
+import argparse
+import html
+import importlib
+import json
+import os
+import posixpath
+import re
+import sys
+
+from fingerprint_assets import FINGERPRINT_RE
+from highlight import LEXERS, language_of
+from highlight import tokenize as lex
+from html_text import CLASS_RE, RAW_TEXT_TAGS, TAG_RE, iter_chunks, iter_tokens
+from site_files import BUILD_DIR, file_hash, iter_site_files, load_json, load_manifest, save_json
+
+blog = importlib.import_module('generate-blog-posts')
+
+OUTPUT_PATH = os.path.join(BUILD_DIR, 'corpus.jsonl')
+STATE_PATH = os.path.join(BUILD_DIR, '.corpus-export.json')
+# Bump when the record layout changes so the dataset is rewritten
+EXPORT_VERSION = 1
+
+EXPORT_DIRS = ('posts', 'archive/v1-posts', 'models')
+# Rewrite the file once superseded lines outnumber the live ones
+COMPACT_RATIO = 1.0
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+CODE_CLASSES = ('code-block',)
+# Generated per build (related_posts.py); not part of the page's own content
+IGNORED_CLASSES = ('related-posts',)
+# Language labels on a code block or its inner tags
+LANG_CLASS_RE = re.compile(r'^(?:language|lang)-(\S+)$')
+# The label create_all_posts appends to each language's example
+LANG_MARKER_RE = re.compile(r'// (\S+) specific implementation')
+# Keywords, builtins and comments a lexer must recognise to name an unlabelled
+# block, and its lead over the runner-up (the lexers share much of their syntax)
+MIN_GUESS_HITS = 3
+MIN_GUESS_LEAD = 2
+ATTR_RE = re.compile(r'''([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?''')
+SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+REFRESH_URL_RE = re.compile(r'url\s*=\s*(\S+)', re.IGNORECASE)
+
+POSTS = {p.filename: p for p in blog.POSTS}
+
+
+def attributes(attrs):
+    """{name: value} of a tag's attribute string; bare attributes map to ''"""
+    found = {}
+    for m in ATTR_RE.finditer(attrs):
+        value = next((v for v in m.group(2, 3, 4) if v is not None), '')
+        found.setdefault(m.group(1).lower(), html.unescape(value))
+    return found
+
+
+def has_class(attrs, classes):
+    m = CLASS_RE.search(attrs)
+    return bool(m) and any(c in classes for c in (m.group(1) or m.group(2) or m.group(3) or '').split())
+
+
+def internal_link(page, href):
+    """Site-relative path an href points to, or None for external and in-page links"""
+    href = href.strip().split('#', 1)[0].split('?', 1)[0]
+    if not href or SCHEME_RE.match(href) or href.startswith('//'):
+        return None
+    path = href.lstrip('/') if href.startswith('/') else posixpath.join(posixpath.dirname(page), href)
+    path = posixpath.normpath(path)
+    if path.startswith('..'):
+        return None
+    if path == '.':
+        return 'index.html'
+    return path + '/index.html' if href.endswith('/') else path
+
+
+def guess_language(code):
+    """The lexer that clearly recognises the most of code, or None"""
+    scores = sorted(((sum(1 for kind, _ in lex(code, lang) if kind in ('keyword', 'builtin', 'comment')), lang)
+                     for lang in LEXERS), key=lambda s: -s[0])
+    (best, lang), (runner_up, _) = scores[0], scores[1]
+    if best >= MIN_GUESS_HITS and best - runner_up >= max(MIN_GUESS_LEAD, best // 4):
+        return lang
+    return None
+
+
+def code_block(text, label):
+    """Code record for a block's text and its explicit language label, if any"""
+    text = html.unescape(text)
+    language = language_of(label) if label else None
+    if language is None:
+        m = LANG_MARKER_RE.search(text)
+        language = language_of(m.group(1)) if m else None
+    guessed = language is None
+    if guessed:
+        language = guess_language(text)
+    return {'language': language, 'guessed': guessed and language is not None, 'text': text}
+
+
+def parse_page(rel_path, chunks):
+    """Record fields of one page from its HTML chunks, in a single pass"""
+    title, description, lang, redirect, noindex = [], None, None, None, False
+    text, headings, code, links = [], [], [], []
+    heading = None        # [level, text pieces] of the open heading
+    block = None          # [tag, depth, text pieces, language label] of the open code block
+    ignored = None        # [tag, depth] of an open generated region
+    in_head = in_title = in_raw = False
+
+    for kind, piece in iter_tokens(chunks):
+        if kind != 'markup':
+            if ignored:
+                continue
+            if block:
+                block[2].append(piece)
+            elif in_title:
+                title.append(piece)
+            elif not (in_head or in_raw):
+                # Inline code reads as part of the sentence around it
+                text.append(piece)
+            if heading and not block:
+                heading[1].append(piece)
+            continue
+
+        m = TAG_RE.match(piece)
+        if not m:
+            continue
+        closing, name, attrs = m.group(1), m.group(2).lower(), m.group(3)
+        for region in (ignored, block):
+            if region and region[0] == name:
+                region[1] += -1 if closing else 1
+        if ignored:
+            if ignored[1] == 0:
+                ignored = None
+            continue
+        if block:
+            if block[1] == 0:
+                code.append(code_block(''.join(block[2]), block[3]))
+                block = None
+            elif not closing and block[3] is None:
+                block[3] = _language_label(attributes(attrs))
+            continue
+
+        if closing:
+            if name == 'head':
+                in_head = False
+            elif name == 'title':
+                in_title = False
+            elif name in RAW_TEXT_TAGS:
+                in_raw = False
+            elif heading and name == f"h{heading[0]}":
+                headings.append({'level': heading[0], 'text': _squash(''.join(heading[1]))})
+                heading = None
+            continue
+
+        if has_class(attrs, IGNORED_CLASSES):
+            ignored = [name, 1]
+        elif name == 'pre' or has_class(attrs, CODE_CLASSES):
+            block = [name, 1, [], _language_label(attributes(attrs))]
+        elif name == 'head':
+            in_head = True
+        elif name == 'title':
+            in_title = True
+        elif name in RAW_TEXT_TAGS:
+            in_raw = True
+        elif name == 'html':
+            lang = attributes(attrs).get('lang')
+        elif name in HEADING_TAGS:
+            heading = [int(name[1]), []]
+        elif name == 'meta':
+            meta = attributes(attrs)
+            key = (meta.get('name') or meta.get('http-equiv') or '').lower()
+            if key == 'description':
+                description = meta.get('content')
+            elif key == 'robots':
+                noindex = 'noindex' in meta.get('content', '').lower()
+            elif key == 'refresh':
+                url = REFRESH_URL_RE.search(meta.get('content', ''))
+                redirect = url and internal_link(rel_path, url.group(1).strip('\'"'))
+        elif name == 'a':
+            target = internal_link(rel_path, attributes(attrs).get('href', ''))
+            if target and target != rel_path and target not in links:
+                links.append(target)
+
+    clean = _squash(html.unescape(''.join(text)))
+    return {
+        'title': re.sub(r'\s+-\s+edikan\.ai$', '', _squash(html.unescape(''.join(title)))),
+        'description': description,
+        'lang': lang,
+        'published': not noindex and redirect is None,
+        'redirect': redirect,
+        'words': len(clean.split()),
+        'text': clean,
+        'headings': [dict(h, text=html.unescape(h['text'])) for h in headings],
+        'code': code,
+        'links': links,
+    }
+
+
+def _language_label(attrs):
+    if attrs.get('data-lang'):
+        return attrs['data-lang']
+    for c in attrs.get('class', '').split():
+        m = LANG_CLASS_RE.match(c)
+        if m:
+            return m.group(1)
+    return None
+
+
+def _squash(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def read_record(root, rel_path, digest):
+    """The JSONL record of one page"""
+    post = POSTS.get(posixpath.basename(rel_path)) if rel_path.startswith('posts/') else None
+    with open(os.path.join(root, rel_path), 'r', encoding='utf-8', errors='replace') as f:
+        fields = parse_page(rel_path, iter_chunks(f))
+    return dict({
+        'path': rel_path,
+        'hash': digest,
+        'section': blog.section_of(post)['slug'] if post else None,
+        'part': post.part if post else None,
+        'date': post.date if post else None,
+        'status': post.status if post else None,
+    }, **fields)
+
+
+def iter_pages(root=BUILD_DIR, dirs=EXPORT_DIRS):
+    """Yield (site-relative path, content hash) of every page to export
+
+    In the build tree the manifest already holds each page's output hash,
+    so unchanged pages are neither read nor hashed.
+    """
+    manifest = load_manifest(root) if root == BUILD_DIR else {}
+    prefixes = tuple(f"{d}/" for d in dirs)
+    for rel_path in iter_site_files(root, {'.html'}):
+        if rel_path.startswith(prefixes) and not FINGERPRINT_RE.search(rel_path):
+            entry = manifest.get(rel_path)
+            yield rel_path, entry['output'] if entry else file_hash(os.path.join(root, rel_path))
+
+
+def changed_records(root, pages, state):
+    """Yield a record for every new or changed page and a tombstone for every removed one"""
+    exported = state['pages']
+    seen = set()
+    for rel_path, digest in pages:
+        seen.add(rel_path)
+        if rel_path not in exported or exported[rel_path][0] != digest:
+            yield read_record(root, rel_path, digest)
+    for rel_path in sorted(set(exported) - seen):
+        yield {'path': rel_path, 'deleted': True}
+
+
+def append_records(output, records, state):
+    """Append records to the dataset, tracking each live record's offset; returns lines written"""
+    pages = state['pages']
+    written = 0
+    with open(output, 'ab') as f:
+        for record in records:
+            offset = f.tell()
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+            written += 1
+            path = record['path']
+            if path in pages:
+                state['dead'] += 1
+            if record.get('deleted'):
+                state['dead'] += 1
+                pages.pop(path, None)
+            else:
+                pages[path] = [record['hash'], offset]
+        state['size'] = f.tell()
+    return written
+
+
+def compact(output, state):
+    """Rewrite the dataset with only its live lines, streaming; returns lines dropped"""
+    live = {offset: path for path, (_, offset) in state['pages'].items()}
+    tmp = output + '.tmp'
+    dropped = 0
+    with open(output, 'rb') as src, open(tmp, 'wb') as dst:
+        offset = 0
+        for line in src:
+            path = live.get(offset)
+            if path is None:
+                dropped += 1
+            else:
+                state['pages'][path][1] = dst.tell()
+                dst.write(line)
+            offset += len(line)
+        state['size'] = dst.tell()
+    os.replace(tmp, output)
+    state['dead'] = 0
+    return dropped
+
+
+def export(root=BUILD_DIR, output=OUTPUT_PATH, state_path=STATE_PATH, full=False):
+    """Bring the dataset up to date with root; returns (live pages, lines appended, lines compacted away)"""
+    state = load_json(state_path)
+    size = os.path.getsize(output) if os.path.exists(output) else -1
+    if (full or state.get('version') != EXPORT_VERSION or state.get('root') != root
+            or state.get('size') != size):
+        # No trustworthy record of what the file holds: start it over
+        state = {'version': EXPORT_VERSION, 'root': root, 'size': 0, 'dead': 0, 'pages': {}}
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        open(output, 'wb').close()
+
+    appended = append_records(output, changed_records(root, iter_pages(root), state), state)
+    dropped = 0
+    if state['dead'] > COMPACT_RATIO * len(state['pages']):
+        dropped = compact(output, state)
+    save_json(state_path, state)
+    return len(state['pages']), appended, dropped
+
+
+def main():
+    """Export or update the corpus dataset"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=BUILD_DIR,
+                        help='tree to export (default: the minified build)')
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--state', default=STATE_PATH)
+    parser.add_argument('--full', action='store_true', help='rewrite the dataset from scratch')
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    if not os.path.isdir(root):
+        print(f"❌ {root} does not exist; run minify_site.py first")
+        return 2
+    live, appended, dropped = export(root, args.output, args.state, args.full)
+    print(f"✅ {args.output}: {live} pages, {appended} record(s) appended"
+          + (f", {dropped} superseded line(s) compacted away" if dropped else ''))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
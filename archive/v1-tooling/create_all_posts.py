@@ -5,7 +5,11 @@ Generate ALL remaining blog posts for edikan.ai
 
 import os
 
-def create_post(num, filename, title, date, focus, languages=[]):
+from highlight import HIGHLIGHT_CSS, highlight, load_cache, save_cache
+from post_metrics import READING_TIME_MARKER, load_store, save_store, with_reading_time
+from records import load_modules
+
+def create_post(num, filename, title, date, focus, languages=(), metrics_store=None, highlight_cache=None):
     """Create a complete blog post with industrial focus"""
     
     # Language-specific code examples
@@ -24,7 +28,10 @@ def create_post(num, filename, title, date, focus, languages=[]):
         lang_section = "<h3>Multi-Language Implementation</h3>\n"
         for lang in languages:
             if lang in code_examples:
-                lang_section += f'<div class="code-block">{code_examples[lang]}\n// {lang.upper()} specific implementation</div>\n'
+                # Highlighted at build time; identical snippets are lexed once per corpus
+                code = highlight(code_examples[lang], lang, highlight_cache)
+                lang_section += (f'<div class="code-block">{code}\n'
+                                 f'<span class="hl-c">// {lang.upper()} specific implementation</span></div>\n')
     
     template = f"""<!DOCTYPE html>
 <html lang="en">
@@ -43,6 +50,7 @@ def create_post(num, filename, title, date, focus, languages=[]):
         h3 {{ color: #333; margin: 25px 0 15px; font-size: 1.3rem; }}
         .post-meta {{ color: #999; font-size: 0.9em; }}
         .code-block {{ background: #2d2d2d; color: #f8f8f2; padding: 20px; border-radius: 8px; overflow-x: auto; margin: 20px 0; font-family: 'Courier New', monospace; white-space: pre; }}
+        {HIGHLIGHT_CSS}
         .personal-story {{ background: #f8f9fa; border-left: 4px solid #667eea; padding: 20px; margin: 25px 0; font-style: italic; }}
         .exercise-box {{ background: #f0f8ff; border: 2px solid #667eea; border-radius: 8px; padding: 25px; margin: 30px 0; }}
         .truth-bomb {{ background: #fff3cd; border: 1px solid #ffc107; border-radius: 8px; padding: 20px; margin: 25px 0; }}
@@ -56,7 +64,7 @@ def create_post(num, filename, title, date, focus, languages=[]):
             <div class="post-header">
                 <h1>{title}</h1>
                 <div class="post-meta">
-                    {date} • 12 min read • Part {num} of Industrial AI Mastery
+                    {date} • {READING_TIME_MARKER} • Part {num} of Industrial AI Mastery
                 </div>
             </div>
             
@@ -125,7 +133,9 @@ def my_broken_function():
 </body>
 </html>"""
     
-    return template
+    # Reading time comes from the rendered text, not a guess; the enhancers
+    # measure again after they add to the post
+    return with_reading_time(filename, template, metrics_store)
 
 # Define ALL posts
 all_posts = [
@@ -211,35 +221,47 @@ all_posts = [
      'date': 'October 3, 2025', 'focus': 'regularization techniques',
      'languages': ['python', 'cpp']}
 ]
+all_posts = load_modules(all_posts)
 
-# Create all remaining posts
-posts_dir = '/Users/edikan/Documents/PROJECT FORGE/edikan-ai/posts'
-created_count = 0
-
-for post in all_posts:
-    filepath = os.path.join(posts_dir, post['filename'])
-    
-    # Skip if already exists
-    if os.path.exists(filepath):
-        print(f"Skipping (exists): {post['filename']}")
-        continue
-    
-    # Create the post
-    html_content = create_post(
-        post['num'],
-        post['filename'],
-        post['title'],
-        post['date'],
-        post['focus'],
-        post.get('languages', [])
-    )
-    
-    with open(filepath, 'w') as f:
-        f.write(html_content)
-    
-    created_count += 1
-    print(f"Created: {post['filename']}")
+def main():
+    """Create all remaining posts"""
+    posts_dir = '/Users/edikan/Documents/PROJECT FORGE/edikan-ai/posts'
+    created_count = 0
+    metrics_store = load_store()
+    highlight_cache = load_cache()
+    
+    for post in all_posts:
+        filepath = os.path.join(posts_dir, post.filename)
+        
+        # Skip if already exists
+        if os.path.exists(filepath):
+            print(f"Skipping (exists): {post.filename}")
+            continue
+        
+        # Create the post
+        html_content = create_post(
+            post.num,
+            post.filename,
+            post.title,
+            post.date,
+            post.focus,
+            post.languages,
+            metrics_store,
+            highlight_cache
+        )
+        
+        with open(filepath, 'w') as f:
+            f.write(html_content)
+        
+        created_count += 1
+        print(f"Created: {post.filename}")
+    
+    save_store(metrics_store)
+    save_cache(highlight_cache)
+    
+    print(f"\n✅ Created {created_count} new posts")
+    print(f"📝 Total posts now: 24")
+    print("\nRemember to add your personal stories to each post!")
 
-print(f"\n✅ Created {created_count} new posts")
-print(f"📝 Total posts now: 24")
-print("\nRemember to add your personal stories to each post!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
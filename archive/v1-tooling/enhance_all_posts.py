@@ -5,6 +5,10 @@ Enhance all blog posts with substantial, engaging content
 
 import os
 
+from post_metrics import load_store, save_store, with_reading_time
+from records import Highlights, load_table, make_record
+from site_files import FileLock
+
 # Define rich content for each post
 post_enhancements = {
     '2025-09-10-transpose-button-confession.html': {
@@ -62,8 +66,31 @@ post_enhancements = {
     }
 }
 
-def enhance_post(filepath, enhancements):
+# Filled in for any list an entry leaves out
+HIGHLIGHT_DEFAULTS = {
+    'examples': ['Recommendation algorithms'],
+    'industry_stories': ['Production systems depend on this'],
+    'key_insights': [],
+}
+
+# Validated once at import; rendering reads attributes with defaults already in place
+HIGHLIGHTS = load_table(Highlights, post_enhancements, 'post_enhancements', HIGHLIGHT_DEFAULTS)
+
+# Used for posts without an entry
+DEFAULT_HIGHLIGHTS = make_record(Highlights, {
+    'examples': ['Industry-leading implementations'],
+    'industry_stories': ['Critical production systems'],
+    'key_insights': ['Fundamental understanding required']
+}, 'DEFAULT_HIGHLIGHTS')
+
+def enhance_post(filepath, enhancements, metrics_store=None):
     """Add rich content to a blog post"""
+    # Held from the read to the write-back, so an overlapping build never interleaves
+    with FileLock(filepath):
+        return _add_rich_content(filepath, enhancements, metrics_store)
+
+def _add_rich_content(filepath, enhancements, metrics_store=None):
+    """Insert the rich content section once, after the first personal story"""
     
     # Read existing post
     with open(filepath, 'r') as f:
@@ -88,14 +115,14 @@ def enhance_post(filepath, enhancements):
                 
                 <p>This isn't just about coding better. The same concepts power:</p>
                 <ul>
-                    <li><strong>Netflix:</strong> {enhancements.get('examples', ['Recommendation algorithms'])[0]}</li>
+                    <li><strong>Netflix:</strong> {enhancements.examples[0]}</li>
                     <li><strong>SpaceX:</strong> Real-time trajectory calculations</li>
                     <li><strong>Your smartphone:</strong> Every swipe, tap, and animation</li>
                 </ul>
                 
                 <div class="industry-example">
                     <strong>Real Industrial Impact:</strong><br>
-                    {enhancements.get('industry_stories', ['Production systems depend on this'])[0]}
+                    {enhancements.industry_stories[0]}
                 </div>
                 
                 <h2>The Hidden Cost</h2>
@@ -110,29 +137,34 @@ def enhance_post(filepath, enhancements):
     # Insert rich content
     enhanced = content[:insert_point + 6] + rich_content + content[insert_point + 6:]
     
+    # The post is longer now; its reading time and stored metrics follow
+    enhanced = with_reading_time(os.path.basename(filepath), enhanced, metrics_store)
+    
     # Write back
     with open(filepath, 'w') as f:
         f.write(enhanced)
     
     return True
 
-# Process all posts
-posts_dir = '/Users/edikan/Documents/PROJECT FORGE/edikan-ai/posts'
-enhanced_count = 0
-
-for filename in os.listdir(posts_dir):
-    if filename.endswith('.html'):
-        filepath = os.path.join(posts_dir, filename)
-        
-        # Get enhancements for this post (use defaults if not specified)
-        enhancements = post_enhancements.get(filename, {
-            'examples': ['Industry-leading implementations'],
-            'industry_stories': ['Critical production systems'],
-            'key_insights': ['Fundamental understanding required']
-        })
-        
-        if enhance_post(filepath, enhancements):
-            enhanced_count += 1
-            print(f"Enhanced: {filename}")
+def main():
+    """Enhance every post in the posts directory"""
+    posts_dir = '/Users/edikan/Documents/PROJECT FORGE/edikan-ai/posts'
+    enhanced_count = 0
+    metrics_store = load_store()
+    
+    for filename in os.listdir(posts_dir):
+        if filename.endswith('.html'):
+            filepath = os.path.join(posts_dir, filename)
+            
+            # Get enhancements for this post (use defaults if not specified)
+            enhancements = HIGHLIGHTS.get(filename, DEFAULT_HIGHLIGHTS)
+            
+            if enhance_post(filepath, enhancements, metrics_store):
+                enhanced_count += 1
+                print(f"Enhanced: {filename}")
+    
+    save_store(metrics_store)
+    print(f"\n✅ Enhanced {enhanced_count} posts with richer content")
 
-print(f"\n✅ Enhanced {enhanced_count} posts with richer content")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,12 @@ Similar depth to the SVD post with Netflix/Google examples
 import os
 import re
 
+from highlight import highlight, with_css
+from pipeline import run_pipeline
+from post_metrics import load_store, save_store, with_reading_time
+from records import Story, load_table
+from site_files import FileLock
+
 # Comprehensive content for each post type
 comprehensive_enhancements = {
     'transpose-button': {
@@ -150,6 +156,19 @@ for i in range(1, 101):
     }
 }
 
+# Filled in for any piece a post type leaves out
+STORY_DEFAULTS = {
+    'hook': 'This concept is more important than you think.',
+    'companies': ['Industry examples'],
+    'disaster': 'Production systems fail when fundamentals are ignored.',
+    'cost': 'Millions lost from not understanding basics',
+    'revelation': 'Understanding fundamentals changes everything',
+    'exercises': '# Real implementation goes here',
+}
+
+# Validated once at import; rendering reads attributes with defaults already in place
+STORIES = load_table(Story, comprehensive_enhancements, 'comprehensive_enhancements', STORY_DEFAULTS)
+
 def get_post_type(filename):
     """Identify post type from filename"""
     patterns = {
@@ -187,53 +206,81 @@ def get_post_type(filename):
 def create_rich_content(post_type):
     """Generate rich content based on post type"""
     
-    # Get specific enhancements or use defaults
-    content = comprehensive_enhancements.get(post_type, comprehensive_enhancements.get('transpose-button'))
+    # Get specific enhancements, or the opening post's for unknown types
+    story = STORIES.get(post_type, STORIES['transpose-button'])
+    companies = story.companies
     
     return f"""
                 <h2>The Hidden Truth No One Talks About</h2>
                 
-                <p>{content.get('hook', 'This concept is more important than you think.')}</p>
+                <p>{story.hook}</p>
                 
                 <h2>How The Giants Use (and Abuse) This</h2>
                 
                 <div class="industry-example">
                     <strong>Tech Giants' Reality:</strong><br>
-                    • {content.get('companies', ['Industry examples'])[0]}<br>
-                    {f"• {content['companies'][1]}<br>" if len(content.get('companies', [])) > 1 else ""}
-                    {f"• {content['companies'][2]}" if len(content.get('companies', [])) > 2 else ""}
+                    • {companies[0]}<br>
+                    {f"• {companies[1]}<br>" if len(companies) > 1 else ""}
+                    {f"• {companies[2]}" if len(companies) > 2 else ""}
                 </div>
                 
                 <h2>The Disaster That Made Headlines</h2>
                 
-                <p>{content.get('disaster', 'Production systems fail when fundamentals are ignored.')}</p>
+                <p>{story.disaster}</p>
                 
                 <div class="warning-box">
                     <strong>💰 The Real Cost:</strong><br>
-                    {content.get('cost', 'Millions lost from not understanding basics')}
+                    {story.cost}
                 </div>
                 
                 <h2>The Code That Actually Matters</h2>
                 
-                <div class="code-block">{content.get('exercises', '# Real implementation goes here')}</div>
+                <div class="code-block">{highlight(story.exercises, 'python')}</div>
                 
                 <div class="truth-bomb">
                     <strong>The Revelation:</strong><br>
-                    {content.get('revelation', 'Understanding fundamentals changes everything')}
+                    {story.revelation}
                 </div>
 """
 
+def enrich_content(filename, content):
+    """Insert rich content into a post, or return None if it already has some"""
+    
+    # Check if already has rich content
+    if 'Tech Giants' in content or 'Netflix' in content or 'The Real Cost' in content:
+        print(f"Already has rich content: {filename}")
+        return None
+    
+    # Get post type and create content
+    post_type = get_post_type(filename)
+    rich_content = create_rich_content(post_type)
+    
+    # Find insertion point (after first h2 or personal story)
+    insert_point = content.find('</h2>')
+    if insert_point != -1:
+        insert_point = content.find('</p>', insert_point) + 4
+    
+    if insert_point == -1 or insert_point == 3:
+        insert_point = content.find('</div>', content.find('personal-story')) + 6
+    
+    if insert_point == 5:  # Still not found
+        print(f"Could not find insertion point in {filename}")
+        return None
+    
+    # Insert rich content; its code block needs the highlight colours
+    return with_css(content[:insert_point] + rich_content + content[insert_point:])
+
 def enhance_all_posts():
     """Enhance all posts with rich content"""
     posts_dir = '/Users/edikan/Documents/PROJECT FORGE/edikan-ai/posts'
     enhanced = 0
     skipped = 0
     
-    for filename in os.listdir(posts_dir):
+    paths = []
+    # Sorted, so the locks below are taken in the order every other build uses
+    for filename in sorted(os.listdir(posts_dir)):
         if not filename.endswith('.html'):
             continue
-            
-        filepath = os.path.join(posts_dir, filename)
         
         # Skip SVD post (already enhanced)
         if 'svd' in filename:
@@ -241,40 +288,33 @@ def enhance_all_posts():
             skipped += 1
             continue
         
-        with open(filepath, 'r') as f:
-            content = f.read()
-        
-        # Check if already has rich content
-        if 'Tech Giants' in content or 'Netflix' in content or 'The Real Cost' in content:
-            print(f"Already has rich content: {filename}")
+        paths.append(os.path.join(posts_dir, filename))
+    
+    # transform runs on this thread only, so the store has a single writer
+    metrics_store = load_store()
+    
+    def transform(filepath, content):
+        filename = os.path.basename(filepath)
+        enhanced_content = enrich_content(filename, content)
+        if enhanced_content is None:
+            return None
+        # Write back, with the reading time of the enriched page
+        return filepath, with_reading_time(filename, enhanced_content, metrics_store)
+    
+    # Reads, rendering and writes overlap instead of taking turns; each post
+    # stays locked from its read to its write, as in the other enhancers
+    for filepath, output_path, error in run_pipeline(paths, transform, encoding=None, lock=FileLock):
+        filename = os.path.basename(filepath)
+        if error is not None:
+            # The page on disk may not be the one just measured
+            metrics_store.pop(filename, None)
+            print(f"Error enhancing {filename}: {error}")
+        elif output_path is None:
             skipped += 1
-            continue
-        
-        # Get post type and create content
-        post_type = get_post_type(filename)
-        rich_content = create_rich_content(post_type)
-        
-        # Find insertion point (after first h2 or personal story)
-        insert_point = content.find('</h2>')
-        if insert_point != -1:
-            insert_point = content.find('</p>', insert_point) + 4
-        
-        if insert_point == -1 or insert_point == 3:
-            insert_point = content.find('</div>', content.find('personal-story')) + 6
-        
-        if insert_point == 5:  # Still not found
-            print(f"Could not find insertion point in {filename}")
-            continue
-        
-        # Insert rich content
-        enhanced_content = content[:insert_point] + rich_content + content[insert_point:]
-        
-        # Write back
-        with open(filepath, 'w') as f:
-            f.write(enhanced_content)
-        
-        enhanced += 1
-        print(f"✅ Enhanced: {filename}")
+        else:
+            enhanced += 1
+            print(f"✅ Enhanced: {filename}")
+    save_store(metrics_store)
     
     print(f"\n📊 Summary:")
     print(f"  Enhanced: {enhanced} posts")
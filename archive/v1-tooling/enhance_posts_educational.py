@@ -8,6 +8,13 @@ import os
 import re
 from datetime import datetime, timedelta
 
+from html_text import rewrite_text, rewrite_text_stream
+from page_delta import delta_path_for, dump_delta, make_delta, stream_delta
+from pipeline import run_pipeline
+from records import Enhancement, load_table
+from regex_rules import Rule, RuleSet, format_stats
+from site_files import FileLock
+
 # Enhanced educational content for each post
 POST_ENHANCEMENTS = {
     "2025-09-10-fizzbuzz-confession.html": {
@@ -179,10 +186,64 @@ POST_ENHANCEMENTS = {
     }
 }
 
+# Validated once at import; posts without an entry get an enhancement with every piece absent
+ENHANCEMENTS = load_table(Enhancement, POST_ENHANCEMENTS, 'POST_ENHANCEMENTS')
+NO_ENHANCEMENT = Enhancement()
+
+# Pages larger than this are streamed in bounded memory instead of read whole
+STREAM_THRESHOLD = 256 * 1024
+# How far past its start a structural match attempt can look when streaming:
+# titles, headings and the post-meta block are far shorter
+STRUCTURE_WINDOW = 8 * 1024
+# The same for the pronoun rules; a longer run of whitespace still reads on
+# until the match ends
+PRONOUN_WINDOW = 256
+
+# Regex rules behind a literal prefilter: a rule only runs when a literal
+# every match must contain occurs in the text. Literals and windows are
+# declared, not derived; snapshot.py checks them with regex_rules.check_rules
+STRUCTURE_RULES = RuleSet([
+    Rule('title', r'<title>.*?</title>', literals=['</title>'], window=STRUCTURE_WINDOW),
+    Rule('h1', r'<h1>.*?</h1>', count=1, literals=['</h1>'], window=STRUCTURE_WINDOW),
+    Rule('intro', r'(</div>\s*<!--\s*post-meta\s*-->)', literals=['post-meta'], window=STRUCTURE_WINDOW),
+    Rule('industrial_context', r'(</p>\s*<p>)', count=1, literals=['</p>'], window=STRUCTURE_WINDOW),
+])
+
+# Enhancement each structural rule needs, and its replacement built from it
+STRUCTURE_REPLACEMENTS = {
+    'title': ('title', lambda e: f'<title>{e.title} - edikan.ai</title>'),
+    'h1': ('title', lambda e: f'<h1>{e.title}</h1>'),
+    # Intro box after the post meta
+    'intro': ('intro', lambda e: f'\\1\n{e.intro}'),
+    # Industrial context after the first paragraph
+    'industrial_context': ('industrial_context', lambda e: f'{e.industrial_context}\\1'),
+}
+
+# Remove personal pronouns and make universal
+PRONOUN_RULES = RuleSet([
+    Rule('pronoun_I', r'\bI\s+', 'Engineers ', flags=re.IGNORECASE, literals=['I'], window=PRONOUN_WINDOW),
+    Rule('pronoun_my', r'\bmy\s+', 'a typical ', flags=re.IGNORECASE, literals=['my'], window=PRONOUN_WINDOW),
+    Rule('pronoun_we', r'\bwe\s+', 'teams ', flags=re.IGNORECASE, literals=['we'], window=PRONOUN_WINDOW),
+    Rule('pronoun_our', r'\bour\s+', 'industrial ', flags=re.IGNORECASE, literals=['our'],
+         window=PRONOUN_WINDOW),
+    Rule('pronoun_Ive', r'I\'ve\s+', 'Engineers have ', flags=re.IGNORECASE, literals=["I've"],
+         window=PRONOUN_WINDOW),
+    Rule('pronoun_Im', r'I\'m\s+', 'Professionals are ', flags=re.IGNORECASE, literals=["I'm"],
+         window=PRONOUN_WINDOW),
+    Rule('pronoun_Id', r'I\'d\s+', 'One would ', flags=re.IGNORECASE, literals=["I'd"],
+         window=PRONOUN_WINDOW),
+    Rule('pronoun_Ill', r'I\'ll\s+', 'This guide will ', flags=re.IGNORECASE, literals=["I'll"],
+         window=PRONOUN_WINDOW),
+])
+
+EXERCISES_MARKER = '<!-- Add exercises here -->'
+EXERCISES_RULE = Rule('exercises', re.escape(EXERCISES_MARKER), literals=[EXERCISES_MARKER],
+                      window=len(EXERCISES_MARKER) + 1)
+
 def create_educational_content(post_name, topic):
     """Generate comprehensive educational content for a post"""
     
-    base_content = POST_ENHANCEMENTS.get(post_name, {})
+    base_content = ENHANCEMENTS.get(post_name, NO_ENHANCEMENT)
     
     # Add comprehensive implementation examples
     implementation = """
@@ -300,79 +361,81 @@ def create_educational_content(post_name, topic):
         'resources': resources
     }
 
-def enhance_post(filepath):
-    """Enhance a single blog post with educational content"""
-    
-    filename = os.path.basename(filepath)
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+def enhanced_delta(filepath, base, content):
+    """Serialized splice list that turns the post into its enhanced variant"""
+    return dump_delta(make_delta(os.path.basename(filepath), base, content))
+
+def structure_replacements(filename):
+    """Replacement for each structural rule this post has the enhancement for"""
+    enhancement = ENHANCEMENTS.get(filename, NO_ENHANCEMENT)
+    return {name: build(enhancement)
+            for name, (key, build) in STRUCTURE_REPLACEMENTS.items()
+            if getattr(enhancement, key) is not None}
+
+def enhance_content(filename, content):
+    """Apply the educational enhancements for filename to its page content"""
     
-    # Get enhancements for this post
-    enhancements = POST_ENHANCEMENTS.get(filename, {})
     educational_content = create_educational_content(filename, "generic")
     
-    # Update title if provided
-    if 'title' in enhancements:
-        content = re.sub(
-            r'<title>.*?</title>',
-            f'<title>{enhancements["title"]} - edikan.ai</title>',
-            content
-        )
-        content = re.sub(
-            r'<h1>.*?</h1>',
-            f'<h1>{enhancements["title"]}</h1>',
-            content,
-            count=1
-        )
-    
-    # Add intro box after post meta
-    if 'intro' in enhancements:
-        content = re.sub(
-            r'(</div>\s*<!--\s*post-meta\s*-->)',
-            f'\\1\n{enhancements["intro"]}',
-            content
-        )
-    
-    # Add industrial context
-    if 'industrial_context' in enhancements:
-        # Find a good place to insert it (after first paragraph)
-        content = re.sub(
-            r'(</p>\s*<p>)',
-            f'{enhancements["industrial_context"]}\\1',
-            content,
-            count=1
-        )
+    # Structural edits only run for the pieces this post has
+    replacements = structure_replacements(filename)
+    if replacements:
+        content = STRUCTURE_RULES.apply(content, list(replacements), replacements)
     
-    # Remove personal pronouns and make universal
-    replacements = [
-        (r'\bI\s+', 'Engineers '),
-        (r'\bmy\s+', 'a typical '),
-        (r'\bwe\s+', 'teams '),
-        (r'\bour\s+', 'industrial '),
-        (r'I\'ve\s+', 'Engineers have '),
-        (r'I\'m\s+', 'Professionals are '),
-        (r'I\'d\s+', 'One would '),
-        (r'I\'ll\s+', 'This guide will '),
-    ]
-    
-    for pattern, replacement in replacements:
-        content = re.sub(pattern, replacement, content, flags=re.IGNORECASE)
+    # Only prose is rewritten; tags, CSS, scripts and code blocks pass through.
+    # Each text node runs only the rules its own literals allow; pages
+    # where no rule can fire skip the text walk entirely.
+    if PRONOUN_RULES.scan(content):
+        content = rewrite_text(content, PRONOUN_RULES.apply)
     
     # Add comprehensive examples and exercises
-    if '<!-- Add exercises here -->' in content:
+    if EXERCISES_MARKER in content:
         content = content.replace(
-            '<!-- Add exercises here -->',
+            EXERCISES_MARKER,
             educational_content['exercises']
         )
     
-    # Save enhanced version
-    enhanced_path = filepath.replace('.html', '-enhanced.html')
-    with open(enhanced_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    return content
+
+def enhance_stream(filename, pieces):
+    """enhance_content over a stream of (text, origin) pieces, in bounded memory
+    
+    Every rule runs over a sliding window as wide as its longest match, so
+    the joined output is exactly what enhance_content gives for the whole page.
+    """
+    exercises = create_educational_content(filename, "generic")['exercises']
+    replacements = structure_replacements(filename)
+    if replacements:
+        pieces = STRUCTURE_RULES.apply_stream(pieces, list(replacements), replacements)
+    pieces = rewrite_text_stream(pieces, PRONOUN_RULES.apply_stream)
+    return EXERCISES_RULE.stream(pieces, lambda m: exercises)
+
+def enhance_large_post(filepath):
+    """Serialized delta for a page too large to read whole"""
+    filename = os.path.basename(filepath)
+    return dump_delta(stream_delta(filepath, lambda pieces: enhance_stream(filename, pieces)))
+
+def enhance_post(filepath):
+    """Enhance a single blog post with educational content"""
+    
+    filename = os.path.basename(filepath)
     
-    print(f"Enhanced: {filename} -> {os.path.basename(enhanced_path)}")
-    return enhanced_path
+    # Another build may be rewriting the post; hold it until the delta is written
+    with FileLock(filepath):
+        if os.path.getsize(filepath) > STREAM_THRESHOLD:
+            record = enhance_large_post(filepath)
+        else:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                base = f.read()
+            record = enhanced_delta(filepath, base, enhance_content(filename, base))
+        
+        # Only the edits are stored; minify_site materializes the full page on publish
+        delta_path = delta_path_for(filepath)
+        with open(delta_path, 'w', encoding='utf-8') as f:
+            f.write(record)
+    
+    print(f"Enhanced: {filename} -> {os.path.basename(delta_path)}")
+    return delta_path
 
 def main():
     """Enhance all blog posts"""
@@ -384,17 +447,36 @@ def main():
     
     print(f"Found {len(post_files)} posts to enhance")
     
+    # Skip already enhanced files; very large pages are streamed one at a time
+    paths = [os.path.join(posts_dir, f) for f in sorted(post_files) if '-enhanced' not in f]
+    large = [p for p in paths if os.path.getsize(p) > STREAM_THRESHOLD]
+    paths = [p for p in paths if p not in large]
+    
+    def transform(filepath, content):
+        enhanced = enhance_content(os.path.basename(filepath), content)
+        return delta_path_for(filepath), enhanced_delta(filepath, content, enhanced)
+    
+    # Reads, regex work and writes overlap instead of taking turns; each post
+    # stays locked from its read to its delta's write
     enhanced_count = 0
-    for post_file in sorted(post_files):
-        if '-enhanced' not in post_file:  # Skip already enhanced files
-            filepath = os.path.join(posts_dir, post_file)
-            try:
-                enhance_post(filepath)
-                enhanced_count += 1
-            except Exception as e:
-                print(f"Error enhancing {post_file}: {e}")
+    for filepath, delta_path, error in run_pipeline(paths, transform, lock=FileLock):
+        post_file = os.path.basename(filepath)
+        if error is not None:
+            print(f"Error enhancing {post_file}: {error}")
+            continue
+        print(f"Enhanced: {post_file} -> {os.path.basename(delta_path)}")
+        enhanced_count += 1
+    
+    for filepath in large:
+        try:
+            enhance_post(filepath)
+            enhanced_count += 1
+        except (OSError, ValueError) as e:
+            print(f"Error enhancing {os.path.basename(filepath)}: {e}")
     
     print(f"\nSuccessfully enhanced {enhanced_count} posts")
+    print("Regex rules (runs only where the literal prefilter matched):")
+    print(format_stats([STRUCTURE_RULES, PRONOUN_RULES]))
     print("Posts are now:")
     print("✓ Educational and universal (no personal pronouns)")
     print("✓ Accessible to beginners")
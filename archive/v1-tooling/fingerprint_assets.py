@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Fingerprint static assets in the build directory for immutable caching
+Copies each asset to a content-hashed name, rewrites references in every
+page in one parallel pass, and writes a manifest of logical -> hashed
+names. Unchanged assets keep their URL, so they can be cached forever
+by hosts that honour a _headers file (--headers; GitHub Pages does not)
+"""
+
+import argparse
+import os
+import posixpath
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from minify_site import write_output
+from site_files import BUILD_DIR, content_hash, iter_site_files, load_json, save_json
+
+MANIFEST_NAME = 'asset-manifest.json'
+# Per-path response headers, read by Netlify and Cloudflare Pages only. GitHub
+# Pages ignores the file and serves everything with a short max-age
+HEADERS_NAME = '_headers'
+HASH_LENGTH = 10
+
+ASSET_EXTENSIONS = {
+    '.css', '.js', '.svg', '.ipynb', '.bin',
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2',
+}
+# Pages that are only ever embedded, never navigated to, are assets too
+EMBEDDED_PAGES = {'models/workforce_pipeline_model_v02.html'}
+# Must keep their URL: a service worker's scope and update check depend on it
+STABLE_NAMES = {'sw.js'}
+# Assets whose references are rewritten and whose content is hashed after that
+REWRITE_EXTENSIONS = {'.html', '.css', '.js', '.svg'}
+
+# name.0123456789.ext, as written by this stage
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{%d}\.[A-Za-z0-9]+$' % HASH_LENGTH)
+# Bundler output that already carries a hash, e.g. index-CWTHRVVV.js
+HASHED_RE = re.compile(r'-(?=[A-Za-z0-9_]*[A-Z0-9])[A-Za-z0-9_]{8}\.[A-Za-z0-9]+$')
+# A src/href attribute value, a data-table attribute (the file scenario-explorer.js
+# fetches) or CSS url(...) argument that may name a local file; other strings
+# (prose, JS literals, other data attributes) are never rewritten
+REF_RE = re.compile(r'''((?<![\w-])(?:src|href|data-table)\s*=\s*["']?|url\(\s*["']?)([^"'()\s<>?#]+)''',
+                    re.IGNORECASE)
+
+IMMUTABLE = 'Cache-Control: public, max-age=31536000, immutable'
+
+
+def is_asset(rel_path):
+    """Whether a build file gets a fingerprinted copy"""
+    name = posixpath.basename(rel_path)
+    if FINGERPRINT_RE.search(name) or HASHED_RE.search(name) or rel_path in STABLE_NAMES:
+        return False
+    ext = posixpath.splitext(name)[1].lower()
+    return ext in ASSET_EXTENSIONS or rel_path in EMBEDDED_PAGES
+
+
+def fingerprinted_name(rel_path, data):
+    """name.<hash>.ext next to the original"""
+    stem, ext = posixpath.splitext(rel_path)
+    return f"{stem}.{content_hash(data)[:HASH_LENGTH]}{ext}"
+
+
+def resolve(rel_path, url):
+    """Site-relative path a URL in rel_path refers to, or None if it is not local"""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if path.startswith('/'):
+        return posixpath.normpath(path.lstrip('/'))
+    return posixpath.normpath(posixpath.join(posixpath.dirname(rel_path), path))
+
+
+def rewrite_refs(text, rel_path, names):
+    """text with every reference to a key of names pointed at its hashed file"""
+    def replace(m):
+        url = m.group(2)
+        target = names.get(resolve(rel_path, url))
+        if target is None:
+            return m.group(0)
+        # The hashed file sits next to the original: only the file name changes
+        head = url[:url.rfind('/') + 1]
+        return m.group(1) + head + posixpath.basename(target)
+    return REF_RE.sub(replace, text)
+
+
+def references(text, rel_path, candidates):
+    """Members of candidates that text refers to"""
+    found = set()
+    for m in REF_RE.finditer(text):
+        target = resolve(rel_path, m.group(2))
+        if target in candidates:
+            found.add(target)
+    return found
+
+
+def _read_text(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    try:
+        return data, data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data, None
+
+
+def fingerprint_assets(root, assets, names):
+    """Hash every asset, dependencies first; fills names with logical -> hashed"""
+    state = {}
+
+    def visit(rel_path):
+        if state.get(rel_path):
+            return                                 # done, or on the current path (a cycle)
+        state[rel_path] = 'visiting'
+        path = os.path.join(root, rel_path)
+        data, text = _read_text(path)
+        if text is not None and posixpath.splitext(rel_path)[1].lower() in REWRITE_EXTENSIONS:
+            for dep in sorted(references(text, rel_path, assets)):
+                visit(dep)
+            rewritten = rewrite_refs(text, rel_path, names)
+            if rewritten != text:
+                data = rewritten.encode('utf-8')
+                write_output(path, data)
+        hashed = fingerprinted_name(rel_path, data)
+        if not os.path.exists(os.path.join(root, hashed)):
+            write_output(os.path.join(root, hashed), data)
+        names[rel_path] = hashed
+        state[rel_path] = 'done'
+
+    for rel_path in sorted(assets):
+        visit(rel_path)
+
+
+_names = {}
+
+
+def _init_worker(names):
+    global _names
+    _names = names
+
+
+def rewrite_page(args):
+    """Point one page's asset references at their hashed files"""
+    root, rel_path = args
+    path = os.path.join(root, rel_path)
+    data, text = _read_text(path)
+    if text is None:
+        return rel_path, False
+    rewritten = rewrite_refs(text, rel_path, _names)
+    if rewritten == text:
+        return rel_path, False
+    write_output(path, rewritten.encode('utf-8'))
+    return rel_path, True
+
+
+def remove_file(path):
+    for suffix in ('', '.gz', '.br'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def write_headers(root, names):
+    """Mark every hashed file immutable in a _headers file for hosts that read one"""
+    with open(os.path.join(root, HEADERS_NAME), 'w', encoding='utf-8') as f:
+        for hashed in sorted(names.values()):
+            f.write(f"/{hashed}\n  {IMMUTABLE}\n")
+
+
+def build(root=BUILD_DIR, workers=None, headers=False):
+    """Fingerprint assets and rewrite pages in root; returns (manifest, pages rewritten, stale removed)"""
+    old = load_json(os.path.join(root, MANIFEST_NAME))
+    old_hashed = set(old.values())
+    files = [p for p in iter_site_files(root)
+             if p not in old_hashed and not FINGERPRINT_RE.search(p)]
+    assets = {p for p in files if is_asset(p)}
+
+    names = {}
+    fingerprint_assets(root, assets, names)
+
+    # References left by the previous run point at hashed names of older content
+    lookup = dict(names)
+    for logical, hashed in old.items():
+        if logical in names:
+            lookup[hashed] = names[logical]
+
+    pages = [(root, p) for p in files
+             if p not in assets and posixpath.splitext(p)[1].lower() in REWRITE_EXTENSIONS]
+    rewritten = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(lookup,)) as pool:
+        for _, changed in pool.map(rewrite_page, pages, chunksize=8):
+            rewritten += changed
+
+    stale = old_hashed - set(names.values())
+    for hashed in stale:
+        remove_file(os.path.join(root, hashed))
+
+    save_json(os.path.join(root, MANIFEST_NAME), names)
+    if headers:
+        write_headers(root, names)
+    elif os.path.exists(os.path.join(root, HEADERS_NAME)):
+        os.remove(os.path.join(root, HEADERS_NAME))
+    return names, rewritten, len(stale)
+
+
+def main():
+    """Fingerprint the build directory's assets"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=BUILD_DIR,
+                        help='build tree to fingerprint (default: the minified build)')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--headers', action='store_true',
+                        help=f'write {HEADERS_NAME} for a Netlify or Cloudflare Pages deploy')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ {args.root} does not exist; run minify_site.py first")
+        return 2
+    names, rewritten, stale = build(args.root, args.workers, args.headers)
+    print(f"✅ Fingerprinted {len(names)} assets, rewrote {rewritten} pages, removed {stale} stale copies")
+    for logical, hashed in sorted(names.items()):
+        print(f"   {logical} -> {posixpath.basename(hashed)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
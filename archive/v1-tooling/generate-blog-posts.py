@@ -1,11 +1,20 @@
 """
 Blog post generation script for edikan.ai
-Generates all 24 posts with proper structure
+Generates all 24 posts with proper structure, and the blog index either as
+one page or sharded into a light landing page plus one page per section
 """
 
+import argparse
+import html as html_lib
+import json
 import os
+from dataclasses import asdict
 from datetime import datetime, timedelta
 
+from post_metrics import format_reading_time, load_store
+from records import load_posts
+from site_files import BUILD_DIR, SITE_ROOT, content_hash, load_json, save_json
+
 # Blog post metadata
 POSTS = [
     # Month 00: The Confession (6 posts)
@@ -184,17 +193,27 @@ POSTS = [
         'status': 'pending'
     }
 ]
+POSTS = load_posts(POSTS)
 
-def create_blog_index():
-    """Create the main blog index page"""
-    html = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Blog - edikan.ai | Industrial AI Mastery Journey</title>
-    <style>
-        * {
+# Curriculum sections, in order; a post belongs to the last section whose
+# first_part is not after its part. New months of the curriculum go here.
+SECTIONS = [
+    {'slug': 'month-00', 'first_part': 1,
+     'title': 'Month 00: The Confession', 'tagline': "Admitting what I don't know"},
+    {'slug': 'month-0', 'first_part': 7,
+     'title': 'Month 0: Building Competence', 'tagline': 'Learning the fundamentals properly'},
+    {'slug': 'month-1', 'first_part': 13,
+     'title': 'Month 1: Mathematical Foundations', 'tagline': 'The language of industrial AI'},
+    {'slug': 'month-2', 'first_part': 19,
+     'title': 'Month 2: Python Deep Dive', 'tagline': 'From basics to industrial applications'},
+]
+
+BLOG_DIR = os.path.join(SITE_ROOT, 'blog')
+SHARD_STATE_PATH = os.path.join(BUILD_DIR, '.blog-shards.json')
+SHARD_VERSION = 1
+CARDS_PER_BATCH = 12
+
+INDEX_STYLE = '''        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
@@ -319,87 +338,350 @@ def create_blog_index():
             margin: 0 15px;
             font-weight: 600;
         }
-    </style>
+'''
+
+SHARD_STYLE = '''
+        .pager {
+            display: flex;
+            justify-content: space-between;
+            background: white;
+            border-radius: 10px;
+            padding: 15px 20px;
+            margin-top: 30px;
+        }
+        
+        .pager a {
+            color: #667eea;
+            text-decoration: none;
+            font-weight: 600;
+        }
+        
+        .section-card p {
+            color: #666;
+            margin-bottom: 8px;
+        }
+        
+        .load-more {
+            display: block;
+            margin: 30px auto 0;
+            padding: 12px 30px;
+            border: none;
+            border-radius: 25px;
+            background: white;
+            color: #667eea;
+            font-weight: 600;
+            cursor: pointer;
+        }
+
+        .load-more-fallback {
+            display: block;
+            margin-top: 10px;
+            text-align: center;
+            color: white;
+        }
+'''
+
+# Appends the next batch of cards when the load-more sentinel scrolls into view
+BATCH_SCRIPT = '''
+    <script>
+    (function () {
+        var button = document.querySelector('.load-more');
+        if (!button) return;
+        var grid = document.querySelector('.posts-grid');
+        var batches = JSON.parse(button.getAttribute('data-batches'));
+        var loading = false;
+        var label = button.textContent;
+        var fallback = null;
+        function failed(url) {
+            // The batch stays first in line; offer a retry and the shard itself
+            loading = false;
+            button.textContent = 'Could not load more posts. Try again';
+            if (!fallback) {
+                fallback = document.createElement('a');
+                fallback.className = 'load-more-fallback';
+                fallback.textContent = 'Open the next posts directly';
+                button.insertAdjacentElement('afterend', fallback);
+            }
+            fallback.href = url;
+        }
+        function next() {
+            if (loading || !batches.length) return;
+            loading = true;
+            var url = batches[0];
+            fetch(url).then(function (r) {
+                if (!r.ok) throw new Error(r.status);
+                return r.text();
+            }).then(function (cards) {
+                batches.shift();
+                grid.insertAdjacentHTML('beforeend', cards);
+                loading = false;
+                button.textContent = label;
+                if (fallback) { fallback.remove(); fallback = null; }
+                if (!batches.length) button.remove();
+            }).catch(function () { failed(url); });
+        }
+        button.hidden = false;
+        button.addEventListener('click', next);
+        if ('IntersectionObserver' in window) {
+            new IntersectionObserver(function (entries) {
+                if (entries[0].isIntersecting) next();
+            }, {rootMargin: '400px'}).observe(button);
+        }
+    })();
+    </script>'''
+
+SECTION_HEADER = '''        <div class="section-header">
+            <h2>{title}</h2>
+            <p>{tagline}</p>
+        </div>
+        
+        <div class="posts-grid">
+'''
+
+
+def section_of(post):
+    """The section a post belongs to"""
+    return [s for s in SECTIONS if s['first_part'] <= post.part][-1]
+
+
+def posts_by_section(posts=POSTS):
+    """(section, posts) pairs in curriculum order, skipping empty sections"""
+    grouped = [(section, [p for p in posts if section_of(p) is section]) for section in SECTIONS]
+    return [(section, group) for section, group in grouped if group]
+
+
+def page_head(title, extra_style=''):
+    """Document head and opening container shared by every index page"""
+    return f'''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{INDEX_STYLE}{extra_style}    </style>
 </head>
 <body>
     <div class="container">
-        <div class="nav-links">
-            <a href="/">← Back to edikan.ai</a>
+'''
+
+
+def nav_links(prefix=''):
+    """Links back to the site and out to the exercises"""
+    return f'''        <div class="nav-links">
+            <a href="{prefix}/">← Back to edikan.ai</a>
             <a href="https://github.com/edikan-ai/edikan-ai-docs" target="_blank">View Exercises</a>
         </div>
-        
+'''
+
+
+def render_card(post, metrics_store, posts_prefix='posts/'):
+    """One post card, with reading time when the post has been measured"""
+    status_class = '' if post.status == 'created' else ' coming-soon'
+    metrics = metrics_store.get(post.filename)
+    reading_time = f" • {format_reading_time(metrics)}" if metrics else ""
+    return f'''
+            <a href="{posts_prefix}{post.filename}" class="post-card{status_class}">
+                <div class="post-number">{post.part}</div>
+                <h3 class="post-title">{post.title}</h3>
+                <p class="post-date">{post.date}{reading_time}</p>
+            </a>
+'''
+
+
+def create_blog_index(metrics_store=None):
+    """Create the main blog index page"""
+    if metrics_store is None:
+        metrics_store = load_store()
+    html = page_head('Blog - edikan.ai | Industrial AI Mastery Journey') + nav_links() + '''        
         <header>
             <h1>The Industrial AI Journey</h1>
             <p class="tagline">From confession to competence - A brutally honest path to mastery</p>
         </header>
         
-        <div class="section-header">
-            <h2>Month 00: The Confession</h2>
-            <p>Admitting what I don't know</p>
-        </div>
-        
-        <div class="posts-grid">
 '''
     
-    # Add all posts
-    current_section = "00"
-    for post in POSTS:
-        # Add section headers
-        if post['part'] == 7:
+    # Add all posts, opening a new grid at each section boundary
+    for n, (section, posts) in enumerate(posts_by_section()):
+        if n:
             html += '''
         </div>
         
-        <div class="section-header">
-            <h2>Month 0: Building Competence</h2>
-            <p>Learning the fundamentals properly</p>
-        </div>
-        
-        <div class="posts-grid">
-'''
-        elif post['part'] == 13:
-            html += '''
-        </div>
-        
-        <div class="section-header">
-            <h2>Month 1: Mathematical Foundations</h2>
-            <p>The language of industrial AI</p>
-        </div>
-        
-        <div class="posts-grid">
 '''
-        elif post['part'] == 19:
-            html += '''
-        </div>
-        
-        <div class="section-header">
-            <h2>Month 2: Python Deep Dive</h2>
-            <p>From basics to industrial applications</p>
+        html += SECTION_HEADER.format(**section)
+        for post in posts:
+            html += render_card(post, metrics_store)
+    
+    html += '''
         </div>
+    </div>
+</body>
+</html>'''
+    
+    return html
+
+
+def create_landing_page(metrics_store=None):
+    """Light blog landing page: one card per section, no post cards"""
+    if metrics_store is None:
+        metrics_store = load_store()
+    html = page_head('Blog - edikan.ai | Industrial AI Mastery Journey', SHARD_STYLE) + nav_links('..') + '''        
+        <header>
+            <h1>The Industrial AI Journey</h1>
+            <p class="tagline">From confession to competence - A brutally honest path to mastery</p>
+        </header>
         
         <div class="posts-grid">
 '''
-        
-        # Add post card
-        status_class = '' if post['status'] == 'created' else ' coming-soon'
+    for section, posts in posts_by_section():
+        created = sum(1 for p in posts if p.status == 'created')
+        minutes = sum(metrics_store[p.filename]['reading_minutes']
+                      for p in posts if p.filename in metrics_store)
+        detail = f"{len(posts)} posts, {created} published"
+        if minutes:
+            detail += f" • {minutes} min of reading"
         html += f'''
-            <a href="posts/{post['filename']}" class="post-card{status_class}">
-                <div class="post-number">{post['part']}</div>
-                <h3 class="post-title">{post['title']}</h3>
-                <p class="post-date">{post['date']}</p>
+            <a href="{section['slug']}.html" class="post-card section-card">
+                <h3 class="post-title">{section['title']}</h3>
+                <p>{section['tagline']}</p>
+                <p class="post-date">{detail}</p>
             </a>
 '''
-    
     html += '''
         </div>
     </div>
 </body>
 </html>'''
-    
     return html
 
-# Generate blog index
-blog_index = create_blog_index()
-print("Blog index generated")
-print(f"Total posts to create: {len(POSTS)}")
-print(f"Posts already created: {sum(1 for p in POSTS if p['status'] == 'created')}")
-print(f"Posts pending: {sum(1 for p in POSTS if p['status'] == 'pending')}")
\ No newline at end of file
+
+def batch_filename(section, n):
+    """Fragment file holding the n-th batch of cards (n >= 2) of a section"""
+    return f"{section['slug']}.{n}.html"
+
+
+def create_section_page(section, posts, prev_section, next_section, metrics_store):
+    """Shard page for one section: first batch of cards inline, the rest lazily
+
+    Returns {filename: html} for the page and each batch fragment.
+    """
+    batches = [posts[i:i + CARDS_PER_BATCH] for i in range(0, len(posts), CARDS_PER_BATCH)]
+    pages = {}
+    for n, batch in enumerate(batches[1:], start=2):
+        pages[batch_filename(section, n)] = ''.join(render_card(p, metrics_store, '../posts/') for p in batch)
+
+    title = html_lib.escape(section['title'])
+    html = page_head(f"{title} - edikan.ai Blog", SHARD_STYLE) + nav_links('..') + f'''        
+        <header>
+            <h1>{title}</h1>
+            <p class="tagline">{section['tagline']}</p>
+        </header>
+        
+        <div class="posts-grid">
+'''
+    html += ''.join(render_card(p, metrics_store, '../posts/') for p in batches[0])
+    html += '''
+        </div>
+'''
+    if len(batches) > 1:
+        later = [p for batch in batches[1:] for p in batch]
+        urls = json.dumps([batch_filename(section, n) for n in range(2, len(batches) + 1)])
+        html += f'''
+        <button class="load-more" hidden data-batches='{urls}'>Show {len(later)} more posts</button>
+        <noscript>
+            <ul class="nav-links">
+''' + ''.join(f'''                <li><a href="../posts/{p.filename}">{p.title}</a></li>
+''' for p in later) + '''            </ul>
+        </noscript>
+'''
+    prev_link = (f'<a href="{prev_section["slug"]}.html" rel="prev">← {prev_section["title"]}</a>'
+                 if prev_section else '<span></span>')
+    next_link = (f'<a href="{next_section["slug"]}.html" rel="next">{next_section["title"]} →</a>'
+                 if next_section else '<span></span>')
+    html += f'''
+        <nav class="pager">
+            {prev_link}
+            <a href="index.html">All sections</a>
+            {next_link}
+        </nav>
+    </div>''' + (BATCH_SCRIPT if len(batches) > 1 else '') + '''
+</body>
+</html>'''
+    pages[f"{section['slug']}.html"] = html
+    return pages
+
+
+def shard_fingerprint(section, posts, neighbours, metrics_store):
+    """Everything a section page is rendered from; unchanged means skip"""
+    return content_hash(json.dumps({
+        'version': SHARD_VERSION,
+        'batch': CARDS_PER_BATCH,
+        'section': section,
+        'posts': [asdict(p) for p in posts],
+        'metrics': [metrics_store.get(p.filename) for p in posts],
+        'neighbours': [n and (n['slug'], n['title']) for n in neighbours],
+    }, sort_keys=True))
+
+
+def write_blog_shards(out_dir=BLOG_DIR, metrics_store=None, state_path=SHARD_STATE_PATH, force=False):
+    """Write the landing page and every section shard that changed
+
+    Returns the list of files written.
+    """
+    if metrics_store is None:
+        metrics_store = load_store()
+    state = {} if force else load_json(state_path)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    def write(name, html):
+        with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+        written.append(name)
+
+    grouped = posts_by_section()
+    sections = [section for section, _ in grouped]
+    for i, (section, posts) in enumerate(grouped):
+        neighbours = (sections[i - 1] if i else None, sections[i + 1] if i + 1 < len(sections) else None)
+        digest = shard_fingerprint(section, posts, neighbours, metrics_store)
+        page = os.path.join(out_dir, f"{section['slug']}.html")
+        if state.get(section['slug']) == digest and os.path.exists(page):
+            continue
+        pages = create_section_page(section, posts, *neighbours, metrics_store)
+        for name, html in pages.items():
+            write(name, html)
+        # Drop batch fragments left over from a section that used to be longer
+        n = len(pages) + 1
+        while os.path.exists(os.path.join(out_dir, batch_filename(section, n))):
+            os.remove(os.path.join(out_dir, batch_filename(section, n)))
+            n += 1
+        state[section['slug']] = digest
+
+    landing = create_landing_page(metrics_store)
+    digest = content_hash(landing)
+    if state.get('index') != digest or not os.path.exists(os.path.join(out_dir, 'index.html')):
+        write('index.html', landing)
+        state['index'] = digest
+    save_json(state_path, state)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', default=BLOG_DIR, help='directory for the sharded index')
+    parser.add_argument('--force', action='store_true', help='rewrite every shard')
+    args = parser.parse_args()
+
+    metrics_store = load_store()
+    blog_index = create_blog_index(metrics_store)
+    print("Blog index generated")
+    written = write_blog_shards(args.out, metrics_store, force=args.force)
+    print(f"✅ Sharded index: {len(written)} file(s) written to {args.out}"
+          + (f" ({', '.join(written)})" if written else " (all shards up to date)"))
+    print(f"Total posts to create: {len(POSTS)}")
+    print(f"Posts already created: {sum(1 for p in POSTS if p.status == 'created')}")
+    print(f"Posts pending: {sum(1 for p in POSTS if p.status == 'pending')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Build-time syntax highlighting for code blocks
+One regex lexer per FORGE language turns a snippet into static span markup,
+so pages ship no highlighter script. Output is cached by snippet hash: the
+same snippets repeat across dozens of posts and each is lexed once
+"""
+
+import html
+import os
+import re
+
+from site_files import BUILD_DIR, content_hash, load_json, save_json
+
+CACHE_PATH = os.path.join(BUILD_DIR, '.highlight-cache.json')
+# Bump when a lexer or the markup changes so cached output is discarded
+LEXER_VERSION = 1
+
+# Token kind -> CSS class
+CLASSES = {
+    'comment': 'hl-c',
+    'string': 'hl-s',
+    'number': 'hl-n',
+    'keyword': 'hl-k',
+    'builtin': 'hl-b',
+    'meta': 'hl-m',          # preprocessor lines, decorators, macros
+}
+
+# Colours for the .code-block background (#2d2d2d)
+HIGHLIGHT_CSS = (
+    ".code-block .hl-c { color: #75715e; font-style: italic; } "
+    ".code-block .hl-s { color: #e6db74; } "
+    ".code-block .hl-n { color: #ae81ff; } "
+    ".code-block .hl-k { color: #f92672; } "
+    ".code-block .hl-b { color: #66d9ef; } "
+    ".code-block .hl-m { color: #a6e22e; }"
+)
+
+NUMBER = r'\b(?:0[xX][0-9a-fA-F_]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)(?:[a-zA-Z]\w*)?\b'
+DQ_STRING = r'"(?:\\.|[^"\\\n])*"'
+SQ_STRING = r"'(?:\\.|[^'\\\n])*'"
+C_COMMENT = r'//[^\n]*|/\*[\s\S]*?\*/'
+
+
+def _words(text):
+    return r'\b(?:' + '|'.join(text.split()) + r')\b'
+
+
+# Each language: ordered (kind, pattern) pairs; the first alternative that
+# matches at a position wins, so comments and strings come first
+LANGUAGES = {
+    'python': [
+        ('comment', r'#[^\n]*'),
+        ('string', r'(?i:[rbfu]{0,2})(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|' + DQ_STRING + '|' + SQ_STRING + ')'),
+        ('meta', r'^[ \t]*@[\w.]+'),
+        ('keyword', _words('False None True and as assert async await break class continue def del elif '
+                           'else except finally for from global if import in is lambda nonlocal not or '
+                           'pass raise return try while with yield')),
+        ('builtin', _words('abs all any bool dict enumerate filter float int isinstance len list map max '
+                           'min open print range round set sorted str sum super tuple type zip self')),
+        ('number', NUMBER),
+    ],
+    'sql': [
+        ('comment', r'--[^\n]*|/\*[\s\S]*?\*/'),
+        ('string', r"'(?:''|[^'])*'"),
+        ('keyword', '(?i:' + _words('select from where and or not in is null as join inner left right outer on '
+                                    'group by order having limit offset insert into values update set delete '
+                                    'create table index view drop alter distinct union all case when then else '
+                                    'end between like asc desc with over partition') + ')'),
+        ('builtin', '(?i:' + _words('count sum avg min max coalesce cast round lag lead row_number rank now') + ')'),
+        ('number', NUMBER),
+    ],
+    'matlab': [
+        ('comment', r'%\{[\s\S]*?%\}|%[^\n]*'),
+        # A quote after a name, bracket or another quote is the transpose operator
+        ('string', DQ_STRING + r"|(?<![\w)\]}.'])'[^'\n]*'"),
+        ('keyword', _words('break case catch classdef continue else elseif end for function global if '
+                           'otherwise parfor persistent return switch try while')),
+        ('builtin', _words('disp eig inv length numel ones plot size sqrt sum svd zeros mean std max min')),
+        ('number', NUMBER),
+    ],
+    'r': [
+        ('comment', r'#[^\n]*'),
+        ('string', DQ_STRING + '|' + SQ_STRING),
+        ('keyword', _words('if else repeat while function for in next break TRUE FALSE NULL Inf NaN NA '
+                           'library require return')),
+        ('builtin', _words('c data.frame lapply length lm mean print read.csv sapply sd summary')),
+        ('number', NUMBER),
+    ],
+    'julia': [
+        ('comment', r'#=[\s\S]*?=#|#[^\n]*'),
+        ('string', r'"""[\s\S]*?"""|' + DQ_STRING + r"|'(?:\\.|[^'\\\n])'"),
+        ('meta', r'@\w+'),
+        ('keyword', _words('abstract baremodule begin break catch const continue do else elseif end export '
+                           'false finally for function global if import in let local macro module mutable '
+                           'quote return struct true try using where while')),
+        ('builtin', _words('println print length size zeros ones collect map filter sum mean')),
+        ('number', NUMBER),
+    ],
+    'cpp': [
+        ('comment', C_COMMENT),
+        ('meta', r'^[ \t]*#[ \t]*\w+[^\n]*'),
+        ('string', r'(?:u8|[uUL])?' + DQ_STRING + r"|'(?:\\.|[^'\\\n])+'"),
+        ('keyword', _words('auto bool break case catch char class const constexpr continue default delete do '
+                           'double else enum explicit false float for if inline int long namespace new '
+                           'nullptr operator private protected public return short signed sizeof static '
+                           'struct switch template this throw true try typedef typename union unsigned '
+                           'using virtual void volatile while')),
+        ('builtin', r'\bstd::\w+|' + _words('size_t cout cin endl vector string map')),
+        ('number', NUMBER),
+    ],
+    'rust': [
+        ('comment', C_COMMENT),
+        ('string', r'b?r#*"[\s\S]*?"#*|b?' + DQ_STRING + r"|b?'(?:\\.|[^'\\\n])'"),
+        ('meta', r'#!?\[[^\]\n]*\]|\b\w+!'),
+        ('keyword', _words('as async await break const continue crate else enum extern false fn for if impl '
+                           'in let loop match mod move mut pub ref return self Self static struct super '
+                           'trait true type unsafe use where while')),
+        ('builtin', _words('Option Some None Result Ok Err Vec String Box i8 i16 i32 i64 u8 u16 u32 u64 '
+                           'usize isize f32 f64 bool char str')),
+        ('number', NUMBER),
+    ],
+}
+
+ALIASES = {'py': 'python', 'c++': 'cpp', 'jl': 'julia', 'rs': 'rust', 'm': 'matlab'}
+
+LEXERS = {
+    lang: re.compile('|'.join(f'(?P<{kind}{i}>{pattern})' for i, (kind, pattern) in enumerate(rules)),
+                     re.MULTILINE)
+    for lang, rules in LANGUAGES.items()
+}
+
+# In-process cache used when no persistent cache is passed in
+_memo = {}
+
+
+def language_of(lang):
+    """Canonical lexer name for a language label, or None if unsupported"""
+    lang = (lang or '').strip().lower()
+    lang = ALIASES.get(lang, lang)
+    return lang if lang in LEXERS else None
+
+
+def tokenize(code, lang):
+    """Yield (kind, text) over the whole snippet; kind is None for plain text"""
+    lexer = LEXERS[lang]
+    pos = 0
+    for m in lexer.finditer(code):
+        if m.start() == m.end():
+            continue
+        if m.start() > pos:
+            yield None, code[pos:m.start()]
+        yield m.lastgroup.rstrip('0123456789'), m.group()
+        pos = m.end()
+    if pos < len(code):
+        yield None, code[pos:]
+
+
+def render(code, lang):
+    """Escaped span markup for a snippet; unsupported languages are only escaped"""
+    lang = language_of(lang)
+    if lang is None:
+        return html.escape(code, quote=False)
+    out = []
+    for kind, text in tokenize(code, lang):
+        text = html.escape(text, quote=False)
+        out.append(f'<span class="{CLASSES[kind]}">{text}</span>' if kind else text)
+    return ''.join(out)
+
+
+def highlight(code, lang, cache=None):
+    """Highlighted markup for a snippet, reusing cached output for identical snippets"""
+    cache = _memo if cache is None else cache
+    key = content_hash(f'{LEXER_VERSION}\0{language_of(lang) or ""}\0{code}')
+    markup = cache.get(key)
+    if markup is None:
+        markup = cache[key] = render(code, lang)
+    return markup
+
+
+def with_css(page):
+    """Page with the highlight colours added to its first stylesheet, once"""
+    if '.hl-k' in page or '</style>' not in page:
+        return page
+    return page.replace('</style>', f'    {HIGHLIGHT_CSS}\n    </style>', 1)
+
+
+def load_cache(path=CACHE_PATH):
+    """Persistent snippet cache: hash -> markup, empty if built by another lexer version"""
+    data = load_json(path)
+    return data.get('snippets', {}) if data.get('version') == LEXER_VERSION else {}
+
+
+def save_cache(cache, path=CACHE_PATH):
+    """Write the snippet cache"""
+    save_json(path, {'version': LEXER_VERSION, 'snippets': cache})
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Streaming HTML tokenizer for text rewrite passes
+Splits a page into markup and text nodes so rewrite rules only ever see
+prose - never tags, attributes, inline CSS, scripts or code blocks
+"""
+
+import itertools
+import re
+
+from text_stream import PieceBuffer
+
+# Elements whose text is never rewritten
+SKIP_TAGS = ('style', 'script', 'code', 'pre')
+# Elements with one of these classes are treated like <pre>: code, and the
+# generated related-links block (related_posts.py), which is not the post's prose
+SKIP_CLASSES = ('code-block', 'related-posts')
+# Elements whose content is raw text, not markup
+RAW_TEXT_TAGS = ('style', 'script')
+
+VOID_TAGS = (
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr'
+)
+
+# A tag, honouring quoted attribute values that contain '>'
+TAG_RE = re.compile(r'<(/?)([A-Za-z][A-Za-z0-9-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+TAG_START_RE = re.compile(r'</?[A-Za-z]')
+CLASS_RE = re.compile(r'''\bclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', re.IGNORECASE)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(f, size=CHUNK_SIZE):
+    """Yield fixed-size chunks from an open text file"""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _starts_skip(name, attrs):
+    """Whether an opening tag begins a region that is never rewritten"""
+    if name in SKIP_TAGS:
+        return True
+    m = CLASS_RE.search(attrs)
+    if not m:
+        return False
+    classes = (m.group(1) or m.group(2) or m.group(3) or '').split()
+    return any(c in SKIP_CLASSES for c in classes)
+
+
+def iter_tokens(chunks):
+    """Yield (kind, text) tokens from an iterable of HTML chunks
+
+    kind is 'markup' for tags, comments and doctypes, 'text' for text that
+    rewrite passes may touch, and 'skip' for text inside skipped elements.
+    A single text node may arrive as several consecutive tokens when it
+    straddles a chunk boundary; joining the tokens always reproduces the input.
+    """
+    buf = ''
+    pos = 0
+    skip = None      # [tag name, nesting depth] of the open skipped element
+    raw = None       # closing-tag pattern while inside <script>/<style>
+    chunks = iter(chunks)
+    done = False
+
+    while True:
+        if not done and len(buf) - pos < CHUNK_SIZE:
+            chunk = next(chunks, None)
+            if chunk is None:
+                done = True
+            else:
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+
+        if pos >= len(buf):
+            if done:
+                return
+            continue
+
+        if raw is not None:
+            m = raw.search(buf, pos)
+            if m is None:
+                # Hold back enough to recognise a closing tag split across chunks
+                end = len(buf) if done else max(pos, len(buf) - 16)
+                if end > pos:
+                    yield 'skip', buf[pos:end]
+                    pos = end
+                if done:
+                    return
+                continue
+            if m.start() > pos:
+                yield 'skip', buf[pos:m.start()]
+            pos = m.start()
+            raw = None
+
+        kind = 'skip' if skip else 'text'
+        lt = buf.find('<', pos)
+        if lt == -1:
+            yield kind, buf[pos:]
+            pos = len(buf)
+            continue
+        if lt > pos:
+            yield kind, buf[pos:lt]
+            pos = lt
+
+        # pos is at '<'; find where this piece of markup ends
+        if buf.startswith('<!--', pos):
+            end = buf.find('-->', pos + 4)
+            end = -1 if end == -1 else end + 3
+        elif buf.startswith('<!', pos) or buf.startswith('<?', pos):
+            end = buf.find('>', pos)
+            end = -1 if end == -1 else end + 1
+        else:
+            m = TAG_RE.match(buf, pos)
+            end = m.end() if m else -1
+            undecided = len(buf) - pos < 3 and not done
+            if m is None and not undecided and (done or not TAG_START_RE.match(buf, pos)):
+                # A bare '<' in text, e.g. "a < b"
+                yield kind, '<'
+                pos += 1
+                continue
+
+        if end == -1:
+            if done:
+                yield kind, buf[pos:]
+                return
+            # Incomplete markup: pull in the next chunk
+            chunk = next(chunks, None)
+            if chunk is None:
+                done = True
+            else:
+                buf = buf[pos:] + chunk
+                pos = 0
+            continue
+
+        piece = buf[pos:end]
+        pos = end
+        yield 'markup', piece
+
+        m = TAG_RE.match(piece)
+        if m is None:
+            continue
+        closing, name, attrs = m.group(1), m.group(2).lower(), m.group(3)
+        self_closing = attrs.rstrip().endswith('/') or name in VOID_TAGS
+        if closing:
+            if skip and name == skip[0]:
+                skip[1] -= 1
+                if skip[1] == 0:
+                    skip = None
+            continue
+        if self_closing:
+            continue
+        if skip:
+            if name == skip[0]:
+                skip[1] += 1
+        elif _starts_skip(name, attrs):
+            skip = [name, 1]
+        if name in RAW_TEXT_TAGS:
+            raw = re.compile(r'</' + name + r'\s*>', re.IGNORECASE)
+
+
+def iter_text_nodes(chunks):
+    """Yield (kind, text) with adjacent pieces of one text node joined"""
+    pending = []
+    for kind, text in iter_tokens(chunks):
+        if kind == 'text':
+            pending.append(text)
+            continue
+        if pending:
+            yield 'text', ''.join(pending)
+            pending = []
+        yield kind, text
+    if pending:
+        yield 'text', ''.join(pending)
+
+
+def rewrite_text(html, rewrite):
+    """Apply rewrite(text) to every rewritable text node of html"""
+    out = []
+    for kind, text in iter_text_nodes([html]):
+        out.append(rewrite(text) if kind == 'text' else text)
+    return ''.join(out)
+
+
+def rewrite_text_stream(pieces, rewrite):
+    """rewrite_text over a stream of (text, origin) pieces
+
+    rewrite maps the pieces of one text node to its new pieces, e.g.
+    RuleSet.apply_stream; markup and skipped text pass through with their
+    origins, so only the edits show up as new text.
+    """
+    buf = PieceBuffer(context=0)
+
+    def chunks():
+        for text, origin in pieces:
+            buf.push(text, origin)
+            yield text
+
+    def tokens():
+        # Tokens join back to the input, so each one is the next run of buffered pieces
+        for kind, text in iter_tokens(chunks()):
+            taken = list(buf.take(len(text)))
+            buf.compact()
+            yield kind == 'text', taken
+
+    for is_text, group in itertools.groupby(tokens(), key=lambda token: token[0]):
+        node = (piece for _, taken in group for piece in taken)
+        if is_text:
+            yield from rewrite(node)
+        else:
+            yield from node
+
+
+def extract_text(html):
+    """Return the rewritable text of html with markup and code removed"""
+    return ''.join(text for kind, text in iter_text_nodes([html]) if kind == 'text')
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Minify and precompress the site into the build directory
+Strips comments and template whitespace from HTML/CSS (leaving pre,
+code and .code-block content alone), then writes .gz and .br siblings
+in parallel, skipping files whose content hash hasn't changed
+"""
+
+import argparse
+import gzip
+import os
+import posixpath
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from html_text import TAG_RE, iter_tokens
+from page_delta import DELTA_EXT, iter_deltas, materialize_file, variant_path_for
+from site_files import (BUILD_DIR, SITE_ROOT, TEXT_EXTENSIONS, content_hash, file_hash,
+                        iter_site_files, load_json, load_manifest, save_manifest)
+
+try:
+    import brotli
+except ImportError:  # .br output is skipped without the brotli package
+    brotli = None
+
+# Bump when minification output changes so every file is rebuilt
+MINIFY_VERSION = 2
+
+# Below this size compression costs more than it saves
+MIN_COMPRESS_BYTES = 512
+
+CSS_TOKEN_RE = re.compile(
+    r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'   # strings, kept as-is
+    r'|(/\*.*?\*/)'                                # comments, dropped
+    r'|(\s+)',                                     # whitespace, collapsed
+    re.DOTALL
+)
+CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_SCAN_RE = re.compile(
+    r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'   # strings
+    r'|([{};])'                                    # block and statement boundaries
+    r'|([^"\'{};]+|.)',                            # anything else
+    re.DOTALL
+)
+# At-rules whose block holds rules, not declarations
+GROUP_AT_RULES = ('media', 'supports', 'container', 'layer', 'document', 'scope')
+# Quoted values are skipped whole; space before the closing > (or /> after a
+# quoted value) is dropped, other runs of whitespace become one space
+TAG_SPACE_RE = re.compile(r'("[^"]*"|\'[^\']*\')|(\s+(?=>\Z)|(?<=["\'])\s+(?=/>\Z))|\s+')
+# Elements whose text keeps its exact whitespace, besides html_text's skipped ones
+PRESERVE_TAGS = ('textarea',)
+
+
+def minify_css(css):
+    """Drop comments and redundant whitespace from a stylesheet"""
+    css = CSS_TOKEN_RE.sub(lambda m: m.group(1) or ('' if m.group(2) else ' '), css)
+    # Strings were kept intact above; only unquoted punctuation is tightened
+    css = _outside_strings(css, _tighten_css)
+    return _tighten_declarations(css).strip()
+
+
+def _tighten_css(s):
+    return CSS_PUNCT_RE.sub(r'\1', s).replace(';}', '}')
+
+
+def _tighten_declarations(css):
+    """Drop the space after ':' in declaration blocks; selectors like 'a :hover' keep it"""
+    out = []
+    blocks = []      # True for each open block that holds declarations
+    prelude = ''
+    for m in CSS_SCAN_RE.finditer(css):
+        string, punct, text = m.groups()
+        if punct == '{':
+            at_rule = re.match(r'\s*@([\w-]+)', prelude)
+            blocks.append(not (at_rule and at_rule.group(1).lower() in GROUP_AT_RULES))
+            prelude = ''
+        elif punct:
+            if punct == '}' and blocks:
+                blocks.pop()
+            prelude = ''
+        elif text and blocks and blocks[-1]:
+            text = text.replace(': ', ':')
+        out.append(m.group(0) if text is None else text)
+        prelude += string or text or ''
+    return ''.join(out)
+
+
+def _outside_strings(css, fn):
+    """Apply fn to the parts of css that are not inside string literals"""
+    out = []
+    pos = 0
+    for m in re.finditer(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'', css):
+        out.append(fn(css[pos:m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(fn(css[pos:]))
+    return ''.join(out)
+
+
+def _minify_tag(tag):
+    """Collapse whitespace between attributes, leaving quoted values alone"""
+    return TAG_SPACE_RE.sub(lambda m: m.group(1) or ('' if m.group(2) else ' '), tag)
+
+
+def minify_html(html):
+    """Minify a page without changing how it renders"""
+    out = []
+    in_style = in_preserve = False
+    for kind, text in iter_tokens([html]):
+        if kind == 'markup':
+            if text.startswith('<!--'):
+                # Conditional comments still mean something to old IE
+                if text.startswith('<!--[if'):
+                    out.append(text)
+                continue
+            m = TAG_RE.match(text)
+            if m:
+                name = m.group(2).lower()
+                if name == 'style':
+                    in_style = not m.group(1)
+                elif name in PRESERVE_TAGS:
+                    in_preserve = not m.group(1)
+                text = _minify_tag(text)
+            out.append(text)
+        elif kind == 'skip':
+            # pre, code, .code-block and scripts keep their exact whitespace
+            out.append(minify_css(text) if in_style else text)
+        elif in_preserve:
+            out.append(text)
+        else:
+            out.append(re.sub(r'\s+', lambda m: '\n' if '\n' in m.group(0) else ' ', text))
+    return ''.join(out)
+
+
+def minify(rel_path, data):
+    """Minify file bytes according to their extension"""
+    ext = os.path.splitext(rel_path)[1].lower()
+    if ext == '.html':
+        return minify_html(data.decode('utf-8')).encode('utf-8')
+    if ext == '.css':
+        return minify_css(data.decode('utf-8')).encode('utf-8')
+    return data
+
+
+def write_output(out_path, output):
+    """Write a built file and, for text worth compressing, its .gz and .br siblings"""
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, 'wb') as f:
+        f.write(output)
+
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext in TEXT_EXTENSIONS and len(output) >= MIN_COMPRESS_BYTES:
+        # mtime=0 keeps .gz output byte-identical across builds
+        with open(out_path + '.gz', 'wb') as f:
+            f.write(gzip.compress(output, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(out_path + '.br', 'wb') as f:
+                f.write(brotli.compress(output, quality=11))
+
+
+def build_file(args):
+    """Minify one file into the build tree and write its compressed siblings"""
+    src, dest, rel_path = args
+    if src.endswith(DELTA_EXT):
+        data = materialize_file(src).encode('utf-8')
+    else:
+        with open(src, 'rb') as f:
+            data = f.read()
+    output = minify(rel_path, data)
+
+    write_output(os.path.join(dest, rel_path), output)
+    return rel_path, len(data), len(output), content_hash(output)
+
+
+def iter_sources(src):
+    """Yield (output rel_path, source path, source hash) for every file to publish"""
+    published = set()
+    for rel_path in iter_site_files(src):
+        path = os.path.join(src, rel_path)
+        published.add(rel_path)
+        yield rel_path, path, file_hash(path)
+    # Enhanced variants are published from their base page plus the stored edits,
+    # unless the variant is a committed page: that page is the published record
+    for delta_rel in iter_deltas(src):
+        if variant_path_for(delta_rel) in published:
+            print(f"⚠️  {delta_rel} ignored: {variant_path_for(delta_rel)} is committed")
+            continue
+        path = os.path.join(src, delta_rel)
+        base_rel = posixpath.join(posixpath.dirname(delta_rel), load_json(path)['base'])
+        source_hash = content_hash(file_hash(path) + file_hash(os.path.join(src, base_rel)))
+        yield variant_path_for(delta_rel), path, source_hash
+
+
+def build(src=SITE_ROOT, dest=BUILD_DIR, workers=None):
+    """Minify and precompress every changed file; return (built, skipped)"""
+    old = load_manifest(dest)
+    manifest = {}
+    jobs = []
+    skipped = 0
+
+    for rel_path, path, source_hash in iter_sources(src):
+        entry = old.get(rel_path)
+        manifest[rel_path] = {'source': source_hash, 'version': MINIFY_VERSION}
+        if (entry and entry.get('source') == source_hash and entry.get('version') == MINIFY_VERSION
+                and os.path.exists(os.path.join(dest, rel_path))):
+            manifest[rel_path] = entry
+            skipped += 1
+            continue
+        jobs.append((path, dest, rel_path))
+
+    # Remove outputs whose source is gone
+    for rel_path in set(old) - set(manifest):
+        for suffix in ('', '.gz', '.br'):
+            path = os.path.join(dest, rel_path + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    raw_total = min_total = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, raw_size, min_size, output_hash in pool.map(build_file, jobs, chunksize=4):
+            manifest[rel_path]['output'] = output_hash
+            raw_total += raw_size
+            min_total += min_size
+
+    save_manifest(manifest, dest)
+    if jobs:
+        print(f"Minified {len(jobs)} files: {raw_total:,} -> {min_total:,} bytes")
+    return len(jobs), skipped
+
+
+def main():
+    """Minify and precompress the site"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('src', nargs='?', default=SITE_ROOT)
+    parser.add_argument('dest', nargs='?', default=BUILD_DIR)
+    parser.add_argument('--clean', action='store_true', help='rebuild from scratch')
+    args = parser.parse_args()
+
+    if args.clean and os.path.isdir(args.dest):
+        shutil.rmtree(args.dest)
+
+    built, skipped = build(args.src, args.dest)
+    print(f"✅ Built {built} files, {skipped} unchanged")
+    if brotli is None:
+        print("⚠️  brotli not installed - wrote .gz siblings only")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate pages and repeated boilerplate blocks across the site
+MinHash signatures of word shingles, bucketed with locality-sensitive
+hashing, so only pages that share a band are ever compared. Signatures are
+kept in an incremental index: unchanged pages are never re-read and a new
+post is checked against the corpus without an all-pairs rescan
+"""
+
+import argparse
+import os
+import re
+import sys
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from html_text import TAG_RE, iter_tokens
+from site_files import BUILD_DIR, SITE_ROOT, content_hash, iter_site_files, load_json, save_json
+
+INDEX_PATH = os.path.join(BUILD_DIR, '.near-duplicates.json')
+# Bump when shingling or hashing changes so stored signatures are discarded
+INDEX_VERSION = 1
+
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+BANDS, ROWS = 32, 4                  # candidates from Jaccard ~0.4 up; verified later
+MIN_BLOCK_WORDS = 15
+
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'header', 'footer', 'aside', 'nav', 'li', 'ul', 'ol',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'tr', 'blockquote', 'main', 'body',
+}
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Fixed random permutations (a*x + b) mod P; x is a 32-bit shingle hash
+_MERSENNE = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20250910)
+_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)[:, None]
+
+
+def words(text):
+    """Lower-cased word tokens"""
+    return WORD_RE.findall(text.lower())
+
+
+def shingle_hashes(tokens, k=SHINGLE_WORDS):
+    """Distinct 32-bit hashes of every k-word shingle"""
+    count = max(len(tokens) - k + 1, 1) if tokens else 0
+    return np.unique(np.fromiter(
+        (zlib.crc32(' '.join(tokens[i:i + k]).encode('utf-8')) for i in range(count)),
+        dtype=np.uint64, count=count))
+
+
+def minhash(hashes):
+    """NUM_PERM minimum hash values over a set of shingle hashes"""
+    if not len(hashes):
+        return np.full(NUM_PERM, int(_MERSENNE), dtype=np.uint64)
+    return ((_A * hashes[None, :] + _B) % _MERSENNE).min(axis=1)
+
+
+def text_blocks(html):
+    """Text of each block-level element, skipping style, script and code"""
+    blocks, current = [], []
+    for kind, piece in iter_tokens([html]):
+        if kind == 'text':
+            current.append(piece)
+        elif kind == 'markup':
+            m = TAG_RE.match(piece)
+            if m and m.group(2).lower() in BLOCK_TAGS:
+                blocks.append(' '.join(current))
+                current = []
+    blocks.append(' '.join(current))
+    return [b for b in (re.sub(r'\s+', ' ', b).strip() for b in blocks) if b]
+
+
+def signature_page(args):
+    """Signatures of one page and of each of its substantial blocks"""
+    path, rel_path = args
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        html = f.read()
+    blocks = text_blocks(html)
+    sig = minhash(shingle_hashes(words(' '.join(blocks))))
+    block_entries = []
+    for block in blocks:
+        tokens = words(block)
+        if len(tokens) >= MIN_BLOCK_WORDS:
+            block_entries.append({
+                'sig': minhash(shingle_hashes(tokens)).tolist(),
+                'words': len(tokens),
+                'text': block[:100],
+            })
+    return rel_path, content_hash(html), {'sig': sig.tolist(), 'blocks': block_entries}
+
+
+def update_index(root=SITE_ROOT, index_path=INDEX_PATH, workers=None):
+    """Bring the stored signatures up to date; returns (index, pages re-read)"""
+    index = load_json(index_path)
+    if index.get('version') != INDEX_VERSION or index.get('root') != root:
+        index = {'version': INDEX_VERSION, 'root': root, 'pages': {}}
+    old = index['pages']
+    pages, jobs = {}, []
+    for rel_path in iter_site_files(root, {'.html'}):
+        path = os.path.join(root, rel_path)
+        st = os.stat(path)
+        entry = old.get(rel_path)
+        if entry and entry['stat'] == [st.st_size, st.st_mtime_ns]:
+            pages[rel_path] = entry
+            continue
+        jobs.append((path, rel_path))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for rel_path, digest, entry in pool.map(signature_page, jobs, chunksize=8):
+                st = os.stat(os.path.join(root, rel_path))
+                pages[rel_path] = dict(entry, stat=[st.st_size, st.st_mtime_ns], hash=digest)
+
+    index['pages'] = pages
+    save_json(index_path, index)
+    return index, len(jobs)
+
+
+class LSHIndex:
+    """Banded MinHash buckets: items sharing any band are candidates"""
+
+    def __init__(self, bands=BANDS, rows=ROWS):
+        self.bands, self.rows = bands, rows
+        self.buckets = defaultdict(list)
+        self.signatures = {}
+
+    def _keys(self, sig):
+        sig = np.asarray(sig, dtype=np.uint64)
+        return [(b, sig[b * self.rows:(b + 1) * self.rows].tobytes()) for b in range(self.bands)]
+
+    def add(self, key, sig):
+        self.signatures[key] = np.asarray(sig, dtype=np.uint64)
+        for band in self._keys(sig):
+            self.buckets[band].append(key)
+
+    def query(self, sig):
+        """Stored keys sharing at least one band with sig"""
+        found = set()
+        for band in self._keys(sig):
+            found.update(self.buckets.get(band, ()))
+        return found
+
+    def candidate_pairs(self):
+        """Every pair of stored keys that share a bucket"""
+        pairs = set()
+        for members in self.buckets.values():
+            if len(members) > 1:
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        if a != b:
+                            pairs.add((a, b) if a < b else (b, a))
+        return pairs
+
+    def similarity(self, a, b):
+        """Estimated Jaccard similarity of two stored keys"""
+        return float(np.mean(self.signatures[a] == self.signatures[b]))
+
+
+def page_lsh(index):
+    lsh = LSHIndex()
+    for rel_path, entry in index['pages'].items():
+        lsh.add(rel_path, entry['sig'])
+    return lsh
+
+
+def near_duplicate_pairs(index, threshold=0.5):
+    """(similarity, page, page) for every candidate pair above threshold"""
+    lsh = page_lsh(index)
+    pairs = []
+    for a, b in lsh.candidate_pairs():
+        s = lsh.similarity(a, b)
+        if s >= threshold:
+            pairs.append((s, a, b))
+    return sorted(pairs, reverse=True)
+
+
+def duplicate_groups(pairs):
+    """Connected groups of pages linked by near-duplicate pairs, largest first"""
+    groups = {}
+    for _, a, b in pairs:
+        merged = groups.get(a, {a}) | groups.get(b, {b})
+        for page in merged:
+            groups[page] = merged
+    unique = {id(g): g for g in groups.values()}.values()
+    return sorted((sorted(g) for g in unique), key=lambda g: (-len(g), g))
+
+
+def boilerplate_clusters(index, threshold=0.8, min_pages=3):
+    """Groups of near-identical blocks that occur on at least min_pages pages"""
+    lsh = LSHIndex()
+    for rel_path, entry in index['pages'].items():
+        for i, block in enumerate(entry['blocks']):
+            lsh.add((rel_path, i), block['sig'])
+
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in lsh.candidate_pairs():
+        if lsh.similarity(a, b) >= threshold:
+            parent[find(a)] = find(b)
+
+    groups = defaultdict(list)
+    for key in parent:
+        groups[find(key)].append(key)
+    clusters = []
+    for members in groups.values():
+        pages = sorted({page for page, _ in members})
+        if len(pages) >= min_pages:
+            page, i = members[0]
+            block = index['pages'][page]['blocks'][i]
+            clusters.append({'pages': pages, 'blocks': len(members),
+                             'words': block['words'], 'sample': block['text']})
+    return sorted(clusters, key=lambda c: -len(c['pages']) * c['words'])
+
+
+def check_files(paths, index, threshold=0.5):
+    """Compare new files against the indexed corpus: {path: [(similarity, page)]}"""
+    lsh = page_lsh(index)
+    matches = {}
+    for path in paths:
+        _, _, entry = signature_page((path, path))
+        sig = np.asarray(entry['sig'], dtype=np.uint64)
+        hits = []
+        for page in lsh.query(sig):
+            if os.path.abspath(os.path.join(index['root'], page)) == os.path.abspath(path):
+                continue
+            s = float(np.mean(lsh.signatures[page] == sig))
+            if s >= threshold:
+                hits.append((s, page))
+        matches[path] = sorted(hits, reverse=True)
+    return matches
+
+
+def main():
+    """Report near-duplicate pages and shared boilerplate"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--root', default=SITE_ROOT)
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='estimated Jaccard similarity for a near-duplicate pair')
+    parser.add_argument('--block-threshold', type=float, default=0.8)
+    parser.add_argument('--min-pages', type=int, default=3,
+                        help='pages a block must appear on to count as boilerplate')
+    parser.add_argument('--pairs', action='store_true', help='list every pair instead of groups')
+    parser.add_argument('--check', nargs='+', metavar='FILE',
+                        help='only check these files against the indexed corpus')
+    args = parser.parse_args()
+
+    index, changed = update_index(args.root)
+    print(f"📊 Indexed {len(index['pages'])} pages ({changed} re-read)")
+
+    if args.check:
+        found = False
+        for path, hits in check_files(args.check, index, args.threshold).items():
+            if hits:
+                found = True
+                print(f"⚠️  {path} resembles:")
+                for s, page in hits[:10]:
+                    print(f"   {s:.2f}  {page}")
+            else:
+                print(f"✅ {path}: no near-duplicates")
+        return 1 if found else 0
+
+    pairs = near_duplicate_pairs(index, args.threshold)
+    groups = duplicate_groups(pairs)
+    print(f"\n🔁 {len(pairs)} near-duplicate pair(s) at similarity >= {args.threshold}, "
+          f"in {len(groups)} group(s):")
+    if args.pairs:
+        for s, a, b in pairs:
+            print(f"   {s:.2f}  {a}  ~  {b}")
+    else:
+        for group in groups:
+            print(f"   {len(group):3d} pages: {', '.join(group[:4])}" + (', ...' if len(group) > 4 else ''))
+
+    clusters = boilerplate_clusters(index, args.block_threshold, args.min_pages)
+    print(f"\n🧱 {len(clusters)} boilerplate block(s) shared by >= {args.min_pages} pages:")
+    for c in clusters[:20]:
+        print(f"   {len(c['pages']):3d} pages, {c['words']:4d} words: {c['sample'][:70]}...")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Page-weight budgets and a local load benchmark for the built site
+Measures what each page costs a reader (raw and compressed bytes, requests,
+inline CSS, largest embedded asset), fails on budget overruns, and times a
+local static server under concurrent fetches of the output tree
+"""
+
+import argparse
+import fnmatch
+import gzip
+import http.client
+import json
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from html.parser import HTMLParser
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # optional: .br sizes are only reported when available
+    brotli = None
+
+from site_files import BUILD_DIR, iter_site_files, load_json
+
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'page-budgets.json')
+
+# Limits in KB (1024 bytes) and requests; page-budgets.json may override
+# them, per page with glob patterns: {"default": {...}, "pages": {"posts/*": {...}}}
+DEFAULT_BUDGETS = {
+    'default': {
+        'html_kb': 80,               # raw HTML
+        'transfer_kb': 60,           # gzip HTML + local subresources
+        'requests': 15,
+        'inline_css_kb': 25,
+        'largest_embedded_kb': 30,
+    },
+    'server': {
+        'ttfb_p95_ms': 50,
+    },
+}
+
+SUBRESOURCE_ATTRS = {
+    'script': 'src', 'img': 'src', 'iframe': 'src', 'source': 'src',
+    'video': 'src', 'audio': 'src', 'embed': 'src',
+}
+LINK_RELS = {'stylesheet', 'icon', 'manifest', 'preload', 'modulepreload', 'apple-touch-icon'}
+CSS_URL_RE = re.compile(r'url\(\s*[\'"]?(data:[^\'")]+)')
+
+
+class WeightParser(HTMLParser):
+    """Collect subresource URLs and inline/embedded byte counts of a page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.resources = []
+        self.inline_css = 0
+        self.embedded = []            # (bytes, description)
+        self._inline = None           # tag whose text is being measured
+        self._svg_depth = 0
+        self._svg_start = None
+
+    def _record_url(self, tag, url):
+        url = url.strip()
+        if url.startswith('data:'):
+            self.embedded.append((len(url), f'data URI in <{tag}>'))
+        elif url:
+            self.resources.append(url)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link':
+            rel = set((attrs.get('rel') or '').lower().split())
+            if rel & LINK_RELS and attrs.get('href'):
+                self._record_url(tag, attrs['href'])
+        elif SUBRESOURCE_ATTRS.get(tag) in attrs and attrs[SUBRESOURCE_ATTRS[tag]]:
+            self._record_url(tag, attrs[SUBRESOURCE_ATTRS[tag]])
+        if tag in ('style', 'script') and not attrs.get('src'):
+            self._inline = [tag, 0]
+        if attrs.get('style'):
+            self.inline_css += len(attrs['style'].encode('utf-8'))
+        if tag == 'svg':
+            if not self._svg_depth:
+                self._svg_start = self.getpos()
+            self._svg_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == 'svg':
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._inline and tag == self._inline[0]:
+            kind, size = self._inline
+            if kind == 'style':
+                self.inline_css += size
+            self.embedded.append((size, f'inline <{kind}>'))
+            self._inline = None
+        if tag == 'svg' and self._svg_depth:
+            self._svg_depth -= 1
+            if not self._svg_depth:
+                self.embedded.append((self._offset(self.getpos()) - self._offset(self._svg_start),
+                                      'inline <svg>'))
+
+    def handle_data(self, data):
+        if self._inline:
+            self._inline[1] += len(data.encode('utf-8'))
+            if self._inline[0] == 'style':
+                for uri in CSS_URL_RE.findall(data):
+                    self.embedded.append((len(uri), 'data URI in CSS'))
+
+    def _offset(self, pos):
+        line, col = pos
+        return self._line_offsets[line - 1] + col
+
+    def feed(self, data):
+        self._line_offsets = [0]
+        for line in data.splitlines(keepends=True):
+            self._line_offsets.append(self._line_offsets[-1] + len(line))
+        super().feed(data)
+
+
+def compressed_size(path, data):
+    """gzip size, from the prebuilt .gz when minify_site.py wrote one"""
+    if os.path.exists(path + '.gz'):
+        return os.path.getsize(path + '.gz')
+    return len(gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def local_target(page, url, root):
+    """File a same-site URL refers to, or None for external URLs"""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc:
+        return None
+    path = unquote(parts.path)
+    if not path:
+        return None
+    if path.startswith('/'):
+        target = os.path.join(root, path.lstrip('/'))
+    else:
+        target = os.path.join(root, os.path.dirname(page), path)
+    return os.path.normpath(target)
+
+
+def analyze_page(root, page):
+    """Weight of one page: sizes in bytes, request count, heaviest inline item"""
+    path = os.path.join(root, page)
+    with open(path, 'rb') as f:
+        data = f.read()
+    parser = WeightParser()
+    parser.feed(data.decode('utf-8', errors='replace'))
+    parser.close()
+
+    html_gzip = compressed_size(path, data)
+    transfer = html_gzip
+    external = missing = 0
+    seen = set()
+    for url in parser.resources:
+        target = local_target(page, url, root)
+        key = target or url
+        if key in seen:
+            continue
+        seen.add(key)
+        if target is None:
+            external += 1
+        elif os.path.isfile(target):
+            with open(target, 'rb') as f:
+                transfer += compressed_size(target, f.read())
+        else:
+            missing += 1
+
+    largest = max(parser.embedded, default=(0, 'none'))
+    return {
+        'page': page,
+        'html_bytes': len(data),
+        'html_gzip_bytes': html_gzip,
+        'html_br_bytes': len(brotli.compress(data, quality=11)) if brotli is not None else None,
+        'transfer_bytes': transfer,
+        'requests': 1 + len(seen),
+        'external_requests': external,
+        'missing_resources': missing,
+        'inline_css_bytes': parser.inline_css,
+        'largest_embedded_bytes': largest[0],
+        'largest_embedded': largest[1],
+    }
+
+
+def load_budgets(path=BUDGET_PATH):
+    """Default budgets merged with page-budgets.json, if present"""
+    custom = load_json(path)
+    budgets = {
+        'default': dict(DEFAULT_BUDGETS['default'], **custom.get('default', {})),
+        'pages': custom.get('pages', {}),
+        'server': dict(DEFAULT_BUDGETS['server'], **custom.get('server', {})),
+    }
+    return budgets
+
+
+def budget_for(page, budgets):
+    """Limits for one page: defaults, then every matching pattern in order"""
+    limits = dict(budgets['default'])
+    for pattern, override in budgets['pages'].items():
+        if fnmatch.fnmatch(page, pattern):
+            limits.update(override)
+    return limits
+
+
+METRICS = {
+    'html_kb': ('html_bytes', 1024),
+    'transfer_kb': ('transfer_bytes', 1024),
+    'requests': ('requests', 1),
+    'inline_css_kb': ('inline_css_bytes', 1024),
+    'largest_embedded_kb': ('largest_embedded_bytes', 1024),
+}
+
+
+def check_budgets(reports, budgets):
+    """Every (page, budget, actual, limit) that exceeds its limit"""
+    failures = []
+    for report in reports:
+        for name, limit in budget_for(report['page'], budgets).items():
+            if limit is None or name not in METRICS:
+                continue
+            field, unit = METRICS[name]
+            actual = report[field] / unit
+            if actual > limit:
+                failures.append((report['page'], name, actual, limit))
+    return failures
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """Static file handler without per-request logging"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark_server(root, pages, concurrency=8, rounds=20):
+    """Serve root locally and fetch pages concurrently; TTFB and throughput"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=root))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    local = threading.local()
+
+    def fetch(page):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        start = time.perf_counter()
+        local.conn.request('GET', '/' + page)
+        response = local.conn.getresponse()
+        ttfb = time.perf_counter() - start
+        body = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"{page}: HTTP {response.status}")
+        return ttfb, len(body)
+
+    try:
+        work = pages * rounds
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, work))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    ttfbs = sorted(t for t, _ in results)
+    return {
+        'requests': len(results),
+        'concurrency': concurrency,
+        'ttfb_mean_ms': statistics.mean(ttfbs) * 1000,
+        'ttfb_p95_ms': ttfbs[int(0.95 * (len(ttfbs) - 1))] * 1000,
+        'requests_per_s': len(results) / elapsed,
+        'mb_per_s': sum(n for _, n in results) / elapsed / 2**20,
+    }
+
+
+def main():
+    """Report page weights, enforce budgets and optionally benchmark serving"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=BUILD_DIR,
+                        help='site tree to measure (default: the minified build)')
+    parser.add_argument('--budgets', default=BUDGET_PATH, help='JSON budget overrides')
+    parser.add_argument('--serve', action='store_true', help='also run the local server benchmark')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=20, help='fetches of each page in the benchmark')
+    parser.add_argument('--json', help='write the full report to this file')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ {args.root} does not exist; run minify_site.py first")
+        return 2
+    pages = list(iter_site_files(args.root, {'.html'}))
+    reports = [analyze_page(args.root, page) for page in pages]
+    budgets = load_budgets(args.budgets)
+    failures = check_budgets(reports, budgets)
+
+    print(f"📊 {len(reports)} pages in {args.root}")
+    print(f"   {'page':48s} {'html':>8s} {'gzip':>8s} {'transfer':>9s} {'req':>4s} {'css':>7s}  largest embedded")
+    for r in sorted(reports, key=lambda r: -r['transfer_bytes'])[:15]:
+        print(f"   {r['page'][:48]:48s} {r['html_bytes'] / 1024:7.1f}K {r['html_gzip_bytes'] / 1024:7.1f}K "
+              f"{r['transfer_bytes'] / 1024:8.1f}K {r['requests']:4d} {r['inline_css_bytes'] / 1024:6.1f}K  "
+              f"{r['largest_embedded_bytes'] / 1024:.1f}K {r['largest_embedded']}")
+
+    report = {'pages': reports, 'budget_failures': failures}
+    if args.serve:
+        bench = benchmark_server(args.root, pages, args.concurrency, args.rounds)
+        report['server'] = bench
+        print(f"🚀 {bench['requests']} fetches x{bench['concurrency']}: "
+              f"TTFB mean {bench['ttfb_mean_ms']:.2f} ms, p95 {bench['ttfb_p95_ms']:.2f} ms, "
+              f"{bench['requests_per_s']:.0f} req/s, {bench['mb_per_s']:.1f} MB/s")
+        limit = budgets['server'].get('ttfb_p95_ms')
+        if limit is not None and bench['ttfb_p95_ms'] > limit:
+            failures.append(('(server)', 'ttfb_p95_ms', bench['ttfb_p95_ms'], limit))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if failures:
+        print(f"❌ {len(failures)} budget(s) exceeded:")
+        for page, name, actual, limit in failures:
+            print(f"   {page}: {name} {actual:.1f} > {limit}")
+        return 1
+    print("✅ All pages within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Enhanced page variants stored as splice operations against the base page
+An enhancement is recorded as an ordered list of [start, end, text] splices
+over the base post, so storage and rebuild I/O scale with the edits, not
+the page. The full variant is only materialized when the site is published
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sys
+
+from html_text import CHUNK_SIZE, iter_chunks
+from site_files import EXCLUDE_DIRS, SITE_ROOT, content_hash
+from text_stream import read_pieces
+
+DELTA_EXT = '.delta'
+VARIANT_SUFFIX = '-enhanced'
+# Bump when the delta format changes
+DELTA_VERSION = 1
+# Changed line blocks up to this many characters are diffed character by character
+REFINE_LIMIT = 20000
+
+
+def delta_path_for(base_path):
+    """Where the enhanced variant of a base page is recorded"""
+    return os.path.splitext(base_path)[0] + VARIANT_SUFFIX + DELTA_EXT
+
+
+def variant_path_for(delta_path):
+    """The page a delta materializes to"""
+    return os.path.splitext(delta_path)[0] + '.html'
+
+
+def compute_ops(base, page):
+    """Ordered [start, end, text] splices that turn base into page"""
+    a, b = base.splitlines(keepends=True), page.splitlines(keepends=True)
+    a_off, b_off = [0], [0]
+    for line in a:
+        a_off.append(a_off[-1] + len(line))
+    for line in b:
+        b_off.append(b_off[-1] + len(line))
+
+    ops = []
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        start, end = a_off[i1], a_off[i2]
+        old, new = base[start:end], page[b_off[j1]:b_off[j2]]
+        if tag != 'replace' or len(old) + len(new) > REFINE_LIMIT:
+            ops.append([start, end, new])
+            continue
+        # Most edits touch a few words inside a line
+        chars = difflib.SequenceMatcher(None, old, new, autojunk=False)
+        for ctag, c1, c2, d1, d2 in chars.get_opcodes():
+            if ctag != 'equal':
+                ops.append([start + c1, start + c2, new[d1:d2]])
+    return ops
+
+
+def apply_ops(base, ops):
+    """base with every splice applied; raises ValueError on malformed ops"""
+    out, pos = [], 0
+    for start, end, text in ops:
+        if not pos <= start <= end <= len(base):
+            raise ValueError(f"splice [{start}, {end}) is out of order or out of range")
+        out.append(base[pos:start])
+        out.append(text)
+        pos = end
+    out.append(base[pos:])
+    return ''.join(out)
+
+
+def make_delta(base_name, base, page):
+    """Delta record for page as a variant of base"""
+    return {
+        'version': DELTA_VERSION,
+        'base': base_name,
+        'base_hash': content_hash(base),
+        'page_hash': content_hash(page),
+        'ops': compute_ops(base, page),
+    }
+
+
+def stream_delta(base_path, transform, chunk_size=CHUNK_SIZE):
+    """Delta for a variant produced by streaming the base page through transform
+
+    transform maps the base page's (text, origin) pieces to the variant's.
+    Text carrying an origin is an unchanged copy of the base, so the splices
+    are read straight off the stream: no full copy of either page is held.
+    """
+    base_digest, page_digest = hashlib.sha256(), hashlib.sha256()
+    size = 0
+
+    def source(f):
+        nonlocal size
+        for chunk in iter_chunks(f, chunk_size):
+            base_digest.update(chunk.encode('utf-8'))
+            size += len(chunk)
+            yield chunk
+
+    ops, pos, inserted = [], 0, []
+    with open(base_path, 'r', encoding='utf-8') as f:
+        for text, origin in transform(read_pieces(source(f))):
+            page_digest.update(text.encode('utf-8'))
+            if origin is None:
+                inserted.append(text)
+                continue
+            if origin != pos or inserted:
+                ops.append([pos, origin, ''.join(inserted)])
+                inserted = []
+            pos = origin + len(text)
+    if pos != size or inserted:
+        ops.append([pos, size, ''.join(inserted)])
+    return {
+        'version': DELTA_VERSION,
+        'base': os.path.basename(base_path),
+        'base_hash': base_digest.hexdigest(),
+        'page_hash': page_digest.hexdigest(),
+        'ops': ops,
+    }
+
+
+def dump_delta(delta):
+    """Serialized delta, one splice per line so diffs of the record stay readable"""
+    head = {k: v for k, v in delta.items() if k != 'ops'}
+    lines = [json.dumps(op, ensure_ascii=False) for op in delta['ops']]
+    return (json.dumps(head, ensure_ascii=False)[:-1] + ', "ops": [\n'
+            + ',\n'.join(lines) + '\n]}\n')
+
+
+def materialize(delta, base):
+    """The variant page; raises ValueError if the base changed since the delta was recorded"""
+    if delta.get('version') != DELTA_VERSION:
+        raise ValueError(f"delta format {delta.get('version')} is not {DELTA_VERSION}")
+    if content_hash(base) != delta['base_hash']:
+        raise ValueError(f"{delta['base']} changed since the delta was recorded; re-run the enhancer")
+    page = apply_ops(base, delta['ops'])
+    if content_hash(page) != delta['page_hash']:
+        raise ValueError(f"delta for {delta['base']} does not reproduce the recorded page")
+    return page
+
+
+def materialize_file(delta_path):
+    """Read a delta and its base page (in the same directory) and build the variant"""
+    with open(delta_path, 'r', encoding='utf-8') as f:
+        delta = json.load(f)
+    with open(os.path.join(os.path.dirname(delta_path), delta['base']), 'r', encoding='utf-8') as f:
+        base = f.read()
+    return materialize(delta, base)
+
+
+def iter_deltas(root=SITE_ROOT):
+    """Yield the site-relative path of every delta, sorted"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d not in EXCLUDE_DIRS and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.endswith(DELTA_EXT):
+                yield os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, '/')
+
+
+def main():
+    """Check deltas or materialize one"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('check', help='verify every delta still applies to its base page')
+    show = sub.add_parser('materialize', help='print the page a delta describes')
+    show.add_argument('delta')
+    args = parser.parse_args()
+
+    if args.command == 'materialize':
+        sys.stdout.write(materialize_file(args.delta))
+        return 0
+
+    failed = 0
+    for rel_path in iter_deltas():
+        try:
+            materialize_file(os.path.join(SITE_ROOT, rel_path))
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"❌ {rel_path}: {e}")
+    print(f"{'❌' if failed else '✅'} {failed} of {len(list(iter_deltas()))} deltas stale")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
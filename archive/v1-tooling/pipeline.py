@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Pipelined read -> transform -> write executor for the post corpus
+Reads ahead and writes behind on background threads so disk latency
+overlaps with the regex work instead of alternating with it
+"""
+
+import queue
+import threading
+
+# Marks the end of a stage's stream
+_DONE = object()
+
+
+def _release(held):
+    if held is not None:
+        held.release()
+
+
+def _reader(paths, read_q, encoding, lock):
+    """Read each path into the bounded read-ahead queue, locking it first if asked"""
+    for path in paths:
+        held = None
+        try:
+            if lock is not None:
+                held = lock(path).acquire()
+            with open(path, 'r', encoding=encoding) as f:
+                read_q.put((path, f.read(), None, held))
+        except Exception as e:
+            _release(held)
+            read_q.put((path, None, e, None))
+    read_q.put(_DONE)
+
+
+def _writer(write_q, results, encoding):
+    """Drain the bounded write-behind queue to disk, releasing each path's lock"""
+    while True:
+        item = write_q.get()
+        if item is _DONE:
+            break
+        path, output_path, content, held = item
+        try:
+            with open(output_path, 'w', encoding=encoding) as f:
+                f.write(content)
+            results.append((path, output_path, None))
+        except Exception as e:
+            results.append((path, None, e))
+        finally:
+            _release(held)
+
+
+def run_pipeline(paths, transform, read_ahead=8, write_behind=8, encoding='utf-8', lock=None):
+    """Run transform over every path with overlapped reads and writes
+
+    transform(path, content) returns (output_path, new_content), or None to
+    leave the file alone. Both queues are bounded, so a slow disk holds back
+    the reader and a slow transform holds back nothing but the queue.
+    Returns a list of (path, output_path, error) tuples in input order.
+
+    lock(path), e.g. site_files.FileLock, is held from before a path is read
+    until its output is written, so another build never sees it half done.
+    Locks are taken in input order; pass sorted paths so that overlapping
+    builds always queue on the same file rather than deadlock.
+    """
+    read_q = queue.Queue(maxsize=read_ahead)
+    write_q = queue.Queue(maxsize=write_behind)
+    written = []
+
+    reader = threading.Thread(target=_reader, args=(paths, read_q, encoding, lock), daemon=True)
+    writer = threading.Thread(target=_writer, args=(write_q, written, encoding), daemon=True)
+    reader.start()
+    writer.start()
+
+    results = {}
+    order = []
+    while True:
+        item = read_q.get()
+        if item is _DONE:
+            break
+        path, content, error, held = item
+        order.append(path)
+        if error is not None:
+            results[path] = (path, None, error)
+            continue
+        try:
+            out = transform(path, content)
+        except Exception as e:
+            _release(held)
+            results[path] = (path, None, e)
+            continue
+        if out is None:
+            _release(held)
+            results[path] = (path, None, None)
+            continue
+        output_path, new_content = out
+        # Blocks when the writer falls behind (backpressure)
+        write_q.put((path, output_path, new_content, held))
+
+    write_q.put(_DONE)
+    writer.join()
+    reader.join()
+
+    for result in written:
+        results[result[0]] = result
+    return [results[path] for path in order]
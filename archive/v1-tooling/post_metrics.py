@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Word count, code-block count and reading time for each post
+Measured from the final rendered page and cached by content hash in the
+post metadata store, so unchanged pages are never re-tokenized. The page
+is hashed and measured without its own reading time, so the generator and
+every enhancer that rewrites a post afterwards refresh the same entry
+"""
+
+import argparse
+import math
+import os
+import re
+
+from html_text import CLASS_RE, TAG_RE, VOID_TAGS, extract_text, iter_tokens
+from site_files import BUILD_DIR, SITE_ROOT, content_hash, load_json, save_json
+
+STORE_PATH = os.path.join(BUILD_DIR, '.post-metadata.json')
+
+# Technical prose reads slower than fiction; code is read, not skimmed
+WORDS_PER_MINUTE = 200
+SECONDS_PER_CODE_BLOCK = 30
+# Bump when the metrics change so stored entries are re-measured
+METRICS_VERSION = 2
+
+WORD_RE = re.compile(r"[\w'’-]+")
+
+# Stands in for the reading time until the page is rendered and measured
+READING_TIME_MARKER = '<!-- reading-time -->'
+# The marker, or the figure a previous render put in its place
+READING_TIME_RE = re.compile(re.escape(READING_TIME_MARKER) + r'|\b\d+ min read\b')
+
+
+def _opens_code_block(name, attrs):
+    if name == 'pre':
+        return True
+    m = CLASS_RE.search(attrs)
+    return bool(m) and 'code-block' in (m.group(1) or m.group(2) or m.group(3) or '').split()
+
+
+def count_code_blocks(html):
+    """Outermost <pre> and .code-block elements: a <pre> inside a .code-block counts once"""
+    count = 0
+    block = None      # [tag name, nesting depth] of the open code block
+    for kind, text in iter_tokens([html]):
+        m = TAG_RE.match(text) if kind == 'markup' else None
+        if m is None:
+            continue
+        closing, name, attrs = m.group(1), m.group(2).lower(), m.group(3)
+        if attrs.rstrip().endswith('/') or name in VOID_TAGS:
+            continue
+        if block is not None:
+            if name == block[0]:
+                block[1] += -1 if closing else 1
+                if block[1] == 0:
+                    block = None
+        elif not closing and _opens_code_block(name, attrs):
+            count += 1
+            block = [name, 1]
+    return count
+
+
+def compute_metrics(html):
+    """Measure a rendered page: words of prose, code blocks, minutes to read"""
+    words = len(WORD_RE.findall(extract_text(html)))
+    code_blocks = count_code_blocks(html)
+    seconds = words / WORDS_PER_MINUTE * 60 + code_blocks * SECONDS_PER_CODE_BLOCK
+    return {
+        'words': words,
+        'code_blocks': code_blocks,
+        'reading_minutes': max(1, math.ceil(seconds / 60)),
+    }
+
+
+def load_store(path=STORE_PATH):
+    """Post metadata store: filename -> {'hash', 'words', 'code_blocks', 'reading_minutes'}"""
+    return load_json(path)
+
+
+def save_store(store, path=STORE_PATH):
+    """Write the post metadata store"""
+    save_json(path, store)
+
+
+def measure(filename, html, store=None):
+    """Metrics for a post, reusing the stored entry when its content is unchanged"""
+    digest = content_hash(html)
+    if store is not None:
+        entry = store.get(filename)
+        if entry and entry.get('hash') == digest and entry.get('version') == METRICS_VERSION:
+            return entry
+    entry = dict(compute_metrics(html), hash=digest, version=METRICS_VERSION)
+    if store is not None:
+        store[filename] = entry
+    return entry
+
+
+def format_reading_time(metrics):
+    """Reading time as shown in post-meta lines and index cards"""
+    return f"{metrics['reading_minutes']} min read"
+
+
+def measure_post(filename, html, store=None):
+    """measure() for a post page, leaving out the reading time it already shows"""
+    return measure(filename, READING_TIME_RE.sub('', html, count=1), store)
+
+
+def with_reading_time(filename, html, store=None):
+    """html with its post-meta reading time (or the marker) measured from the page itself"""
+    metrics = measure_post(filename, html, store)
+    return READING_TIME_RE.sub(format_reading_time(metrics), html, count=1)
+
+
+def main():
+    """Measure every post and update the metadata store"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('posts_dir', nargs='?', default=os.path.join(SITE_ROOT, 'posts'))
+    parser.add_argument('--store', default=STORE_PATH)
+    args = parser.parse_args()
+
+    store = load_store(args.store)
+    before = dict(store)
+    measured = total = 0
+
+    for filename in sorted(os.listdir(args.posts_dir)):
+        if not filename.endswith('.html'):
+            continue
+        with open(os.path.join(args.posts_dir, filename), 'r', encoding='utf-8') as f:
+            metrics = measure_post(filename, f.read(), store)
+        total += 1
+        # measure() hands back the stored entry itself when it is still current
+        if metrics is not before.get(filename):
+            measured += 1
+        print(f"{filename:55s} {metrics['words']:6,} words  "
+              f"{metrics['code_blocks']:3} code  {format_reading_time(metrics)}")
+
+    save_store(store, args.store)
+    print(f"\n✅ Measured {measured} changed posts, {total - measured} cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Emit a service worker and precache manifest for offline reading
+Precaches the core pages, the shared CSS and the current month's modules
+from the build tree, keyed by content revision: a deploy only re-downloads
+the entries whose bytes changed, and repeat visits are served locally
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import posixpath
+import shutil
+import sys
+import tempfile
+
+from fingerprint_assets import EMBEDDED_PAGES, FINGERPRINT_RE, HASHED_RE, MANIFEST_NAME, references
+import fingerprint_assets
+import minify_site
+from minify_site import write_output
+from search_index import NOINDEX_RE
+from site_files import BUILD_DIR, SITE_ROOT, content_hash, file_hash, iter_site_files, load_json
+
+blog = importlib.import_module('generate-blog-posts')
+
+SW_NAME = 'sw.js'
+PRECACHE_NAME = 'precache-manifest.json'
+REVISION_LENGTH = 16
+
+CORE_PAGES = [
+    'index.html', 'blog.html', 'framework.html', 'why.html', 'blog/index.html',
+    'models/index.html', 'models/workforce-pipeline.html',
+]
+# By logical name; the fingerprinted copy is what gets cached
+SHARED_ASSETS = ['mobile-responsive-styles.css']
+# Navigations that miss both caches while offline get this page
+OFFLINE_FALLBACK = 'index.html'
+# Subresources larger than this are left to the network (the notebook export)
+MAX_ENTRY_BYTES = 256 * 1024
+# Pages read offline beyond the precache; the oldest copies are dropped first
+RUNTIME_MAX_ENTRIES = 50
+# Served by the network only: a separate app, and the noindex archive
+BYPASS_PREFIXES = ['/proforge/', '/archive/']
+
+REGISTER_MARKER = 'serviceWorker.register'
+REGISTER_SNIPPET = f"<script>if ('serviceWorker' in navigator) navigator.serviceWorker.register('/{SW_NAME}');</script>"
+
+SW_TEMPLATE = r"""/*
+ * Offline cache for edikan.ai, generated by archive/v1-tooling/precache.py
+ * Precaches the core pages, shared CSS and the current month's modules.
+ * Entries are keyed by content revision, so a deploy only downloads what changed.
+ */
+'use strict';
+
+var VERSION = '__VERSION__';
+var PRECACHE = 'forge-precache';
+var RUNTIME = 'forge-runtime';
+var MANIFEST = __MANIFEST__;    // [url, revision]; revision is null for fingerprinted files
+var FALLBACK = '__FALLBACK__';
+var MAX_ENTRY_BYTES = __MAX_ENTRY_BYTES__;
+var RUNTIME_MAX_ENTRIES = __RUNTIME_MAX_ENTRIES__;
+var BYPASS = __BYPASS__;        // path prefixes the worker never handles
+
+function cacheKey(entry) {
+    return new URL(entry[0] + (entry[1] ? '?__rev=' + entry[1] : ''), self.location).href;
+}
+
+var keys = {};                  // absolute URL -> precache key
+MANIFEST.forEach(function (entry) {
+    keys[new URL(entry[0], self.location).href] = cacheKey(entry);
+});
+
+self.addEventListener('install', function (event) {
+    event.waitUntil(caches.open(PRECACHE).then(function (cache) {
+        return Promise.all(MANIFEST.map(function (entry) {
+            var key = cacheKey(entry);
+            return cache.match(key).then(function (hit) {
+                if (hit) return;        // unchanged since the last deploy
+                return fetch(entry[0], {cache: 'reload'}).then(function (response) {
+                    if (!response.ok) throw new Error(entry[0] + ': ' + response.status);
+                    return cache.put(key, response);
+                });
+            }).catch(function (error) {
+                // One missing entry must not block the rest; it is fetched live instead
+                console.warn('precache skipped', error);
+            });
+        }));
+    }).then(function () {
+        return self.skipWaiting();
+    }));
+});
+
+self.addEventListener('activate', function (event) {
+    var wanted = {};
+    Object.keys(keys).forEach(function (url) { wanted[keys[url]] = true; });
+    event.waitUntil(caches.open(PRECACHE).then(function (cache) {
+        return cache.keys().then(function (requests) {
+            return Promise.all(requests.filter(function (r) { return !wanted[r.url]; })
+                .map(function (r) { return cache.delete(r); }));
+        });
+    }).then(function () {
+        return self.clients.claim();
+    }));
+});
+
+// Drop the oldest runtime copies once there are more than RUNTIME_MAX_ENTRIES
+function trimRuntime(cache) {
+    return cache.keys().then(function (requests) {
+        return Promise.all(requests.slice(0, Math.max(0, requests.length - RUNTIME_MAX_ENTRIES))
+            .map(function (r) { return cache.delete(r); }));
+    });
+}
+
+function cacheable(response) {
+    var length = Number(response.headers.get('content-length'));
+    return response.ok && response.type === 'basic' && !(length > MAX_ENTRY_BYTES);
+}
+
+function precacheKey(request) {
+    var url = new URL(request.url);
+    url.search = '';
+    if (url.pathname.slice(-1) === '/') url.pathname += 'index.html';
+    return keys[url.href];
+}
+
+self.addEventListener('fetch', function (event) {
+    var request = event.request;
+    var url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+    if (BYPASS.some(function (prefix) { return url.pathname.indexOf(prefix) === 0; })) return;
+
+    var key = precacheKey(request);
+    if (key) {
+        event.respondWith(caches.match(key).then(function (hit) {
+            return hit || fetch(request);
+        }));
+        return;
+    }
+
+    // Everything else: network first, the last copy seen when offline. Large
+    // downloads are never copied, and the cache keeps only the newest entries
+    event.respondWith(fetch(request).then(function (response) {
+        if (cacheable(response)) {
+            var copy = response.clone();
+            event.waitUntil(caches.open(RUNTIME).then(function (cache) {
+                return cache.delete(request).then(function () {
+                    return cache.put(request, copy);
+                }).then(function () {
+                    return trimRuntime(cache);
+                });
+            }));
+        }
+        return response;
+    }).catch(function () {
+        return caches.match(request).then(function (hit) {
+            if (hit) return hit;
+            if (request.mode === 'navigate') return caches.match(keys[new URL(FALLBACK, self.location).href]);
+            return Response.error();
+        });
+    }));
+});
+"""
+
+
+def is_published(root, rel_path):
+    """Whether a page is in the build and indexable (redirect stubs and the archive are noindex)"""
+    path = os.path.join(root, rel_path)
+    if not os.path.exists(path):
+        return False
+    with open(path, 'r', encoding='utf-8') as f:
+        return not NOINDEX_RE.search(f.read())
+
+
+def current_section(root):
+    """The latest curriculum section with a published post in the build"""
+    current = None
+    for section, posts in blog.posts_by_section():
+        if any(is_published(root, f"posts/{p.filename}") for p in posts):
+            current = section
+    return current
+
+
+def section_pages(root, section):
+    """The section's published posts and its blog index page"""
+    pages = [f"blog/{section['slug']}.html"]
+    pages += [f"posts/{p.filename}" for _, posts in blog.posts_by_section()
+              for p in posts if blog.section_of(p) is section]
+    return [p for p in pages if is_published(root, p)]
+
+
+def register_worker(root, pages, served):
+    """Add the registration snippet to the served pages and take it out of the rest
+
+    Returns the number of pages that gained the snippet. Pages served by an
+    earlier build (last month's modules) lose it again.
+    """
+    changed = 0
+    for rel_path in pages:
+        path = os.path.join(root, rel_path)
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        if rel_path not in served:
+            if REGISTER_SNIPPET in html:
+                write_output(path, html.replace(REGISTER_SNIPPET, '').encode('utf-8'))
+            continue
+        if REGISTER_MARKER in html or '</body>' not in html:
+            continue
+        i = html.rfind('</body>')
+        write_output(path, (html[:i] + REGISTER_SNIPPET + html[i:]).encode('utf-8'))
+        changed += 1
+    return changed
+
+
+def precache_entries(root, section, max_entry_bytes=MAX_ENTRY_BYTES):
+    """[(url, revision)] for the core pages, shared CSS, the section and their subresources"""
+    assets = load_json(os.path.join(root, MANIFEST_NAME))
+    files = set(iter_site_files(root))
+    pages = [p for p in CORE_PAGES if p in files]
+    if section is not None:
+        pages += section_pages(root, section)
+
+    selected = list(pages)
+    selected += [assets.get(name, name) for name in SHARED_ASSETS if assets.get(name, name) in files]
+    for page in pages:
+        with open(os.path.join(root, page), 'r', encoding='utf-8') as f:
+            deps = references(f.read(), page, files)
+        selected += sorted(d for d in deps if d.endswith(('.css', '.js', '.svg', '.bin')) and d != SW_NAME
+                           and os.path.getsize(os.path.join(root, d)) <= max_entry_bytes)
+
+    fingerprinted = set(assets.values())
+    entries, seen = [], set()
+    for rel_path in selected:
+        if rel_path in seen:
+            continue
+        seen.add(rel_path)
+        name = posixpath.basename(rel_path)
+        # A hash in the URL already versions the file
+        versioned = rel_path in fingerprinted or FINGERPRINT_RE.search(name) or HASHED_RE.search(name)
+        revision = None if versioned else file_hash(os.path.join(root, rel_path))[:REVISION_LENGTH]
+        entries.append(('/' + rel_path, revision))
+    return entries
+
+
+def render_worker(entries, max_entry_bytes=MAX_ENTRY_BYTES):
+    """sw.js source; its bytes change whenever any entry does, which triggers an update"""
+    manifest = json.dumps([list(e) for e in entries], indent=0).replace('\n', '')
+    return (SW_TEMPLATE.replace('__VERSION__', content_hash(manifest)[:REVISION_LENGTH])
+            .replace('__MANIFEST__', manifest)
+            .replace('__FALLBACK__', '/' + OFFLINE_FALLBACK)
+            .replace('__MAX_ENTRY_BYTES__', str(max_entry_bytes))
+            .replace('__RUNTIME_MAX_ENTRIES__', str(RUNTIME_MAX_ENTRIES))
+            .replace('__BYPASS__', json.dumps(BYPASS_PREFIXES)))
+
+
+def build(root=BUILD_DIR, section=None, max_entry_bytes=MAX_ENTRY_BYTES):
+    """Register the worker in the pages it serves and write sw.js and the manifest; returns a summary"""
+    section = section or current_section(root)
+    entries = precache_entries(root, section, max_entry_bytes)
+
+    pages = [p for p in iter_site_files(root, {'.html'})
+             if p not in EMBEDDED_PAGES and not FINGERPRINT_RE.search(p)]
+    served = {url.lstrip('/') for url, _ in entries if url.endswith('.html')}
+    registered = register_worker(root, pages, served)
+    # Revisions must describe the pages as served, snippet included
+    if registered:
+        entries = precache_entries(root, section, max_entry_bytes)
+    old = dict(map(tuple, load_json(os.path.join(root, PRECACHE_NAME), default={}).get('entries', [])))
+    new = dict(entries)
+
+    write_output(os.path.join(root, SW_NAME), render_worker(entries, max_entry_bytes).encode('utf-8'))
+    write_output(os.path.join(root, PRECACHE_NAME), json.dumps(
+        {'section': section and section['slug'], 'entries': entries}, indent=1).encode('utf-8'))
+    return {
+        'section': section,
+        'entries': entries,
+        'registered': registered,
+        'added': sorted(set(new) - set(old)),
+        'changed': sorted(u for u in set(new) & set(old) if new[u] != old[u]),
+        'removed': sorted(set(old) - set(new)),
+    }
+
+
+def check_rebuild(src=SITE_ROOT):
+    """Names of the outputs that differ between two builds of an unchanged tree
+
+    Runs minify, fingerprint and precache twice into a scratch build
+    directory; a second deploy with no edits must not make clients
+    re-download anything.
+    """
+    dest = tempfile.mkdtemp(prefix='precache-')
+    outputs = (SW_NAME, PRECACHE_NAME)
+    try:
+        snapshots = []
+        for _ in range(2):
+            with contextlib.redirect_stdout(io.StringIO()):
+                minify_site.build(src, dest)
+                fingerprint_assets.build(dest)
+                build(dest)
+            snapshots.append([file_hash(os.path.join(dest, name)) for name in outputs])
+        return [name for name, first, second in zip(outputs, *snapshots) if first != second]
+    finally:
+        shutil.rmtree(dest, ignore_errors=True)
+
+
+def main():
+    """Write the service worker for the build directory"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=BUILD_DIR,
+                        help='build tree (default: the minified, fingerprinted build)')
+    parser.add_argument('--section', choices=[s['slug'] for s in blog.SECTIONS],
+                        help="month to precache (default: the latest with published posts)")
+    parser.add_argument('--max-entry-kb', type=int, default=MAX_ENTRY_BYTES // 1024)
+    parser.add_argument('--check', action='store_true',
+                        help='build the site twice in a scratch directory and fail if the worker changes')
+    args = parser.parse_args()
+
+    if args.check:
+        changed = check_rebuild()
+        for name in changed:
+            print(f"❌ {name} changed on a rebuild with no edits")
+        if not changed:
+            print(f"✅ {SW_NAME} and {PRECACHE_NAME} are identical across two builds")
+        return 1 if changed else 0
+
+    if not os.path.isdir(args.root):
+        print(f"❌ {args.root} does not exist; run minify_site.py first")
+        return 2
+    section = next((s for s in blog.SECTIONS if s['slug'] == args.section), None)
+    summary = build(args.root, section, args.max_entry_kb * 1024)
+    size = sum(os.path.getsize(os.path.join(args.root, url.lstrip('/'))) for url, _ in summary['entries'])
+    print(f"✅ {SW_NAME}: {len(summary['entries'])} entries ({size / 1024:.0f} KB), "
+          f"month {summary['section']['slug'] if summary['section'] else '-'}; "
+          f"registered in {summary['registered']} new page(s)")
+    print(f"📊 Since the last build: {len(summary['added'])} added, {len(summary['changed'])} changed, "
+          f"{len(summary['removed'])} removed")
+    for url in summary['changed']:
+        print(f"   🔁 {url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
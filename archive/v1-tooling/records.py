@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Typed records for post metadata and enhancement tables
+The tables stay plain literals where they are authored; each is loaded once
+into frozen __slots__ dataclasses, validated, with defaults filled in and
+repeated strings (dates, statuses, language tags) interned, so rendering
+reads attributes instead of chaining .get() fallbacks
+"""
+
+import sys
+from dataclasses import MISSING, dataclass, fields
+
+from highlight import language_of
+
+STATUSES = ('created', 'pending')
+
+# Field types the loader knows how to check
+OPTIONAL_TEXT = str | None
+TEXTS = tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Post:
+    """A curriculum post as listed on the blog index"""
+    filename: str
+    title: str
+    date: str
+    part: int
+    status: str
+
+    INTERNED = ('date', 'status')
+
+
+@dataclass(frozen=True, slots=True)
+class Module:
+    """A post still to be generated by create_all_posts"""
+    num: int
+    filename: str
+    title: str
+    date: str
+    focus: str
+    languages: TEXTS
+
+    INTERNED = ('date', 'languages')
+
+
+@dataclass(frozen=True, slots=True)
+class Story:
+    """Industry story block for a post type (enhance_all_posts_comprehensive)"""
+    hook: str
+    companies: TEXTS
+    disaster: str
+    cost: str
+    revelation: str
+    exercises: str
+
+    INTERNED = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Enhancement:
+    """Educational rewrite of one post; absent pieces are None (enhance_posts_educational)"""
+    title: OPTIONAL_TEXT = None
+    intro: OPTIONAL_TEXT = None
+    industrial_context: OPTIONAL_TEXT = None
+    real_example: OPTIONAL_TEXT = None
+
+    INTERNED = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Highlights:
+    """Examples and stories woven into a post (enhance_all_posts)"""
+    examples: TEXTS
+    industry_stories: TEXTS
+    key_insights: TEXTS
+
+    INTERNED = ()
+
+
+def _check(cls, name, kind, value, where):
+    """value as stored in the record, or ValueError naming the offending field"""
+    intern = name in cls.INTERNED
+    if kind is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif kind == TEXTS:
+        if isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+            return tuple(sys.intern(v) for v in value) if intern else tuple(value)
+    elif kind is str or (kind == OPTIONAL_TEXT and value is not None):
+        if isinstance(value, str):
+            return sys.intern(value) if intern else value
+    elif kind == OPTIONAL_TEXT:
+        return None
+    raise ValueError(f"{where}: {name} must be {getattr(kind, '__name__', kind)}, not {value!r:.40}")
+
+
+def make_record(cls, row, where, defaults=None):
+    """One validated record from a dict row; unknown or missing fields are errors"""
+    known = {f.name: f for f in fields(cls)}
+    unknown = set(row) - set(known)
+    if unknown:
+        raise ValueError(f"{where}: unknown field(s) {', '.join(sorted(unknown))}")
+    values = dict(defaults or {}, **row)
+    missing = [name for name, f in known.items() if name not in values and f.default is MISSING]
+    if missing:
+        raise ValueError(f"{where}: missing field(s) {', '.join(missing)}")
+    return cls(**{name: _check(cls, name, f.type, values.get(name), where) for name, f in known.items()})
+
+
+def load_records(cls, rows, table, defaults=None):
+    """Tuple of records from a list of dict rows"""
+    return tuple(make_record(cls, row, f"{table}[{i}]", defaults) for i, row in enumerate(rows))
+
+
+def load_table(cls, table, name, defaults=None):
+    """{key: record} from a dict of dict rows"""
+    return {sys.intern(key): make_record(cls, row, f"{name}[{key!r}]", defaults)
+            for key, row in table.items()}
+
+
+def load_posts(rows, table='POSTS'):
+    """Blog index posts, checked for a known status and unique filenames and parts"""
+    posts = load_records(Post, rows, table)
+    for i, post in enumerate(posts):
+        if post.status not in STATUSES:
+            raise ValueError(f"{table}[{i}]: status must be one of {', '.join(STATUSES)}, not {post.status!r}")
+    _unique(posts, 'filename', table)
+    _unique(posts, 'part', table)
+    return posts
+
+
+def load_modules(rows, table='all_posts'):
+    """Posts to generate, checked for highlightable language tags"""
+    modules = load_records(Module, rows, table, {'languages': ()})
+    for i, module in enumerate(modules):
+        for lang in module.languages:
+            if language_of(lang) != lang:
+                raise ValueError(f"{table}[{i}]: unknown language tag {lang!r}")
+    _unique(modules, 'filename', table)
+    return modules
+
+
+def _unique(records, name, table):
+    seen = set()
+    for i, record in enumerate(records):
+        value = getattr(record, name)
+        if value in seen:
+            raise ValueError(f"{table}[{i}]: duplicate {name} {value!r}")
+        seen.add(value)
+
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Ordered regex rewrite rules behind a literal prefilter
+Every rule declares, or derives from its pattern, literals that any match
+must contain. One substring scan of a document finds which literals occur,
+and only the rules that can fire run their regex. Per-rule counters show
+how often each rule was skipped, run and matched, so dead rules stand out.
+Rules with a match window can also run over a stream in bounded memory
+"""
+
+import itertools
+import re
+
+from text_stream import PieceBuffer
+
+# Derivation reads patterns with re's private parser, which may change between
+# releases; shipped rules declare literals and windows, and check_rules() fails
+# loudly when derivation stops reproducing them
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+# Derived literals shorter than this are not worth a prefilter
+MIN_LITERAL_LENGTH = 2
+# Upper bound on the alternatives one derived literal may expand to
+MAX_ALTERNATIVES = 8
+# Streaming reads at least this much ahead, so each regex search covers a useful span
+STREAM_READ_AHEAD = 16 * 1024
+# Non-ASCII characters that re.IGNORECASE matches against ASCII letters
+# (the Kelvin sign already lower-cases to k)
+FOLDS_TO_ASCII = {'İ': 'i', 'ı': 'i', 'ſ': 's'}
+
+
+def casefold_ascii(text):
+    """Lower-cased text in which an ASCII literal occurs wherever re.IGNORECASE finds it"""
+    if not text.isascii():
+        for char, ascii in FOLDS_TO_ASCII.items():
+            if char in text:
+                text = text.replace(char, ascii)
+    return text.lower()
+
+
+def _char_set(op, av):
+    """Characters a single-character item can match, or None if unknown"""
+    if op is sre_constants.LITERAL:
+        return [chr(av)]
+    if op is sre_constants.IN:
+        chars = []
+        for item_op, item_av in av:
+            if item_op is sre_constants.LITERAL:
+                chars.append(chr(item_av))
+            elif item_op is sre_constants.RANGE and item_av[1] - item_av[0] < MAX_ALTERNATIVES:
+                chars.extend(map(chr, range(item_av[0], item_av[1] + 1)))
+            else:
+                return None
+        return chars
+    return None
+
+
+def _runs(items):
+    """Runs of consecutive single-character positions that every match contains"""
+    runs, current = [], []
+
+    def close():
+        if current:
+            runs.append(list(current))
+            current.clear()
+
+    for op, av in items:
+        if op is sre_constants.AT:
+            continue                              # zero-width: \b, ^, $
+        if op is sre_constants.SUBPATTERN and not av[1] and not av[2]:
+            inner = _runs(av[3])
+            if len(inner) == 1 and len(inner[0]) == len(av[3]):
+                current.extend(inner[0])          # group of plain literals
+            else:
+                close()
+                runs.extend(inner)
+            continue
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, _, sub = av
+            chars = _char_set(*sub[0]) if low >= 1 and len(sub) == 1 else None
+            if chars is not None:
+                current.append(chars)             # the first repetition is certain
+            close()
+            continue
+        chars = _char_set(op, av)
+        if chars is None:
+            close()
+        else:
+            current.append(chars)
+    close()
+    return runs
+
+
+def _alternatives(run):
+    size = 1
+    for chars in run:
+        size *= len(chars)
+    return size
+
+
+def derive_window(pattern, flags=0):
+    """Characters past its start any attempt of pattern can look at, or None if unbounded"""
+    try:
+        low, high = sre_parse.parse(pattern, flags).getwidth()
+    except (re.error, AttributeError, TypeError):
+        return None
+    if low == 0 or high >= sre_constants.MAXREPEAT:
+        return None
+    # One more for a trailing \b or $, which peek at the next character
+    return high + 1
+
+
+def derive_literals(pattern, flags=0):
+    """Strings of which every match of pattern contains at least one, or None"""
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, AttributeError, TypeError):
+        return None
+    best = None
+    for run in _runs(list(parsed)):
+        # Trim the run from its wider end until the expansion stays small
+        while run and _alternatives(run) > MAX_ALTERNATIVES:
+            run = run[:-1] if len(run[-1]) >= len(run[0]) else run[1:]
+        if len(run) < MIN_LITERAL_LENGTH:
+            continue
+        key = (len(run), -_alternatives(run))
+        if best is None or key > best[0]:
+            best = (key, run)
+    if best is None:
+        return None
+    return tuple(''.join(chars) for chars in itertools.product(*best[1]))
+
+
+class Rule:
+    """One regex rewrite with its prefilter literals and counters
+
+    window bounds how far past its start any match attempt looks; it is
+    derived for fixed-width patterns and must be declared for the others
+    before the rule can be streamed. Derivation is a convenience for ad hoc
+    rules: shipped rules declare literals and window both.
+    """
+
+    def __init__(self, name, pattern, repl=None, flags=0, count=0, literals=None, window=None):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.repl = repl
+        self.count = count
+        self.window = window if window is not None else derive_window(pattern, flags)
+        self.literals = tuple(literals) if literals is not None else derive_literals(pattern, flags)
+        self.ignorecase = bool(flags & re.IGNORECASE)
+        if self.literals and self.ignorecase:
+            self.folded = tuple({lit.lower() for lit in self.literals})
+            self.ascii = all(lit.isascii() for lit in self.literals)
+            self.literal_re = re.compile('|'.join(map(re.escape, self.literals)), re.IGNORECASE)
+        self.skipped = self.runs = self.hits = 0
+
+    def can_match(self, text, folded):
+        """False only when no literal occurs in text, so the regex cannot match"""
+        if not self.literals:
+            return True
+        if not self.ignorecase:
+            haystack, literals = text, self.literals
+        elif self.ascii:
+            haystack, literals = folded, self.folded
+        else:
+            return self.literal_re.search(text) is not None
+        for lit in literals:
+            if lit in haystack:
+                return True
+        return False
+
+    def stream(self, pieces, repl=None):
+        """regex.subn over a stream of (text, origin) pieces, holding a few windows of text
+
+        A match is committed once it ends inside the buffered text and starts
+        at least a window before its end, where the rest of the stream can no
+        longer change it; anything earlier with no match is passed on. The
+        output joins to exactly what subn gives on the whole text.
+        """
+        if self.window is None:
+            raise ValueError(f"rule {self.name} has no match window and cannot be streamed")
+        replacement = self.repl if repl is None else repl
+        read_ahead = max(2 * self.window, STREAM_READ_AHEAD)
+        buf = PieceBuffer()
+        pieces = iter(pieces)
+        want, eof, hits = read_ahead, False, 0
+        self.runs += 1
+        while True:
+            while not eof and buf.pending() < want:
+                piece = next(pieces, None)
+                if piece is None:
+                    eof = True
+                else:
+                    buf.push(*piece)
+            if self.count and hits >= self.count:
+                yield from buf.take(buf.pending())
+                yield from pieces
+                return
+            text, pos = buf.text, buf.pos
+            safe = len(text) if eof else len(text) - self.window
+            window = text[pos:]
+            m = None
+            if self.can_match(window, casefold_ascii(window) if self.ignorecase else None):
+                m = self.regex.search(text, pos)
+            if m is not None and (eof or m.start() < safe):
+                if not eof and m.end() >= len(text):
+                    want = buf.pending() + read_ahead      # the match may run on: read further first
+                    continue
+                yield from buf.take(m.start() - pos)
+                buf.drop(m.end() - m.start())
+                out = m.expand(replacement) if isinstance(replacement, str) else replacement(m)
+                if out:
+                    yield out, None
+                hits += 1
+                self.hits += 1
+                buf.compact()
+                continue
+            if eof:
+                yield from buf.take(buf.pending())
+                return
+            yield from buf.take(safe - pos)
+            buf.compact()
+            want = read_ahead
+
+    def stats(self):
+        return {'rule': self.name, 'literals': list(self.literals or ()), 'skipped': self.skipped,
+                'runs': self.runs, 'hits': self.hits}
+
+
+class RuleSet:
+    """Rules applied in order, each only when the prefilter says it can fire"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.by_name = {rule.name: rule for rule in self.rules}
+        self.ignorecase = any(rule.ignorecase and rule.literals for rule in self.rules)
+
+    def scan(self, text, rules=None):
+        """Names of the rules (default: all) that can match somewhere in text"""
+        rules = self.rules if rules is None else rules
+        folded = casefold_ascii(text) if self.ignorecase else None
+        return {rule.name for rule in rules if rule.can_match(text, folded)}
+
+    def apply(self, text, names=None, repl=None):
+        """Run the selected rules (default: all) in order over text
+
+        repl maps rule names to replacements that override the rule's own.
+        A rule that changes the text triggers a rescan for the later rules
+        that were ruled out, since the replacement may have created a match.
+        """
+        rules = self.rules if names is None else [self.by_name[n] for n in names]
+        active = self.scan(text, rules)
+        for i, rule in enumerate(rules):
+            if rule.name not in active:
+                rule.skipped += 1
+                continue
+            replacement = rule.repl if repl is None else repl.get(rule.name, rule.repl)
+            text, n = rule.regex.subn(replacement, text, count=rule.count)
+            rule.runs += 1
+            rule.hits += n
+            if n:
+                later = [r for r in rules[i + 1:] if r.name not in active]
+                if later:
+                    active |= self.scan(text, later)
+        return text
+
+    def apply_stream(self, pieces, names=None, repl=None):
+        """apply() over a stream of (text, origin) pieces: the selected rules chained in order
+
+        Running a rule the prefilter would have skipped changes nothing, so
+        the chain gives the same text as apply() on the joined stream. A
+        stream short enough to hold whole only runs the rules that can fire.
+        """
+        rules = self.rules if names is None else [self.by_name[n] for n in names]
+        pieces = iter(pieces)
+        head, size = [], 0
+        for piece in pieces:
+            head.append(piece)
+            size += len(piece[0])
+            if size >= STREAM_READ_AHEAD:
+                break
+        else:
+            # Held whole: like apply(), only the rules that can fire on the current text run
+            text = ''.join(t for t, _ in head)
+            folded = casefold_ascii(text) if self.ignorecase else None
+            for rule in rules:
+                if not rule.can_match(text, folded):
+                    rule.skipped += 1
+                    continue
+                head = list(rule.stream(head, None if repl is None else repl.get(rule.name, rule.repl)))
+                changed = ''.join(t for t, _ in head)
+                if changed != text:
+                    text = changed
+                    folded = casefold_ascii(text) if self.ignorecase else None
+            yield from head
+            return
+        stream = itertools.chain(head, pieces)
+        for rule in rules:
+            stream = rule.stream(stream, None if repl is None else repl.get(rule.name, rule.repl))
+        yield from stream
+
+    def stats(self):
+        return [rule.stats() for rule in self.rules]
+
+    def reset_stats(self):
+        for rule in self.rules:
+            rule.skipped = rule.runs = rule.hits = 0
+
+
+# Patterns derivation must always handle; if these fail, re's parser changed
+DERIVATION_CANARIES = [
+    (r'\bab\s+', re.IGNORECASE, ('ab',), None),
+    (r'<!-- x -->', 0, ('<!-- x -->',), 11),
+]
+
+
+def check_rules(rule_sets):
+    """Problems with literal and window derivation for the given rule sets; empty when sound
+
+    Every declared literal set that derivation could produce (literals of
+    MIN_LITERAL_LENGTH or more) must be reproduced exactly, and a derived
+    window must fit inside the declared one. The canaries catch a parser
+    change that turns derivation off for every pattern at once.
+    """
+    problems = []
+    for pattern, flags, literals, window in DERIVATION_CANARIES:
+        if derive_literals(pattern, flags) != literals or derive_window(pattern, flags) != window:
+            problems.append(f"derivation is broken on {pattern!r}: re's private parser changed")
+    for rule in (rule for rule_set in rule_sets for rule in rule_set.rules):
+        pattern, flags = rule.regex.pattern, rule.regex.flags
+        if rule.literals and min(map(len, rule.literals)) >= MIN_LITERAL_LENGTH:
+            derived = derive_literals(pattern, flags)
+            if derived is None or set(derived) != set(rule.literals):
+                problems.append(f"rule {rule.name}: literals {list(rule.literals)} "
+                                f"but derivation gives {derived}")
+        window = derive_window(pattern, flags)
+        if window is not None and (rule.window is None or window > rule.window):
+            problems.append(f"rule {rule.name}: window {rule.window} but a match can look {window} ahead")
+    return problems
+
+
+def format_stats(rule_sets):
+    """Table of per-rule counters, dead rules flagged"""
+    lines = [f"   {'rule':20s} {'prefilter':16s} {'skipped':>8s} {'runs':>8s} {'hits':>8s}"]
+    for rule_set in rule_sets:
+        for s in rule_set.stats():
+            literals = '|'.join(s['literals']) or '(always runs)'
+            flag = '  ⚠️ never matched' if s['runs'] + s['skipped'] and not s['hits'] else ''
+            lines.append(f"   {s['rule']:20s} {literals[:16]:16s} {s['skipped']:8d} {s['runs']:8d} "
+                         f"{s['hits']:8d}{flag}")
+    return '\n'.join(lines)
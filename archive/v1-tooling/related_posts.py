@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Precompute related-module links for every published post
+Each post becomes a sparse TF-IDF vector of its text plus its post type,
+languages and focus; the top-k cosine neighbours come from one sparse
+matrix product and are injected as a related-links block. Term counts are
+cached per content hash, and a changed post only recomputes the rows it
+touches. Run after minify_site.py and before precache.py
+"""
+
+import argparse
+import importlib
+import os
+import posixpath
+import re
+import sys
+from collections import Counter
+
+import numpy as np
+
+from enhance_all_posts_comprehensive import get_post_type
+from minify_site import write_output
+from page_delta import VARIANT_SUFFIX
+from search_index import SOURCE_DIRS, read_document, tokenize
+from site_files import BUILD_DIR, content_hash, load_json, load_manifest, save_json
+
+blog = importlib.import_module('generate-blog-posts')
+create_all_posts = importlib.import_module('create_all_posts')
+
+CACHE_PATH = os.path.join(BUILD_DIR, '.related-cache.json')
+# Bump when features or weighting change so cached neighbours are discarded
+RELATED_VERSION = 1
+
+TOP_K = 3
+# Neighbours below this cosine share little more than boilerplate
+MIN_SCORE = 0.05
+# Scores are rounded so a row recomputed alone ranks exactly as in a full build
+SCORE_DIGITS = 4
+# A post type or language counts as much as a word used this many times
+METADATA_WEIGHT = 3
+# Rows multiplied at once; bounds the dense block of scores to ROW_BLOCK x posts
+ROW_BLOCK = 256
+
+RELATED_START = '<!-- related-posts -->'
+RELATED_END = '<!-- /related-posts -->'
+RELATED_RE = re.compile(re.escape(RELATED_START) + '.*?' + re.escape(RELATED_END), re.DOTALL)
+BLOCK_STYLE = 'margin-top:30px;padding:20px;border:1px solid #e2e8f0;border-radius:8px'
+
+MODULES = {m.filename: m for m in create_all_posts.all_posts}
+SECTION_TITLES = {p.filename: blog.section_of(p)['title'] for p in blog.POSTS}
+
+
+def metadata_terms(filename):
+    """Pseudo-terms for a post from the post tables: type, languages and focus"""
+    terms = Counter()
+    post_type = get_post_type(filename)
+    if post_type != 'general':
+        terms[f"type:{post_type}"] += METADATA_WEIGHT
+    module = MODULES.get(filename)
+    if module is not None:
+        for lang in module.languages:
+            terms[f"lang:{lang}"] += METADATA_WEIGHT
+        terms.update(tokenize(module.focus))
+    return dict(terms)
+
+
+def strip_block(html):
+    """html without a previously injected related-links block"""
+    return RELATED_RE.sub('', html)
+
+
+def _expand(starts, lengths):
+    """Concatenated ranges starts[i]:starts[i] + lengths[i], without a Python loop"""
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+
+
+class TfidfMatrix:
+    """L2-normalized TF-IDF rows in CSR form, with a CSC copy for products"""
+
+    def __init__(self, term_counts):
+        self.n = len(term_counts)
+        vocabulary = {t: i for i, t in enumerate(sorted(set().union(*term_counts)))}
+        lengths = np.array([len(terms) for terms in term_counts], dtype=np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.indices = np.fromiter((vocabulary[t] for terms in term_counts for t in terms),
+                                   dtype=np.int64, count=int(lengths.sum()))
+        counts = np.fromiter((c for terms in term_counts for c in terms.values()),
+                             dtype=np.float64, count=int(lengths.sum()))
+        rows = np.repeat(np.arange(self.n), lengths)
+
+        # Sublinear term frequency, smoothed inverse document frequency
+        df = np.bincount(self.indices, minlength=len(vocabulary))
+        idf = np.log((1 + self.n) / (1 + df)) + 1
+        data = (1 + np.log(counts)) * idf[self.indices]
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=self.n))
+        self.data = data / np.where(norms > 0, norms, 1)[rows]
+
+        order = np.argsort(self.indices, kind='stable')
+        self.col_ptr = np.concatenate(([0], np.cumsum(df)))
+        self.col_rows = rows[order]
+        self.col_data = self.data[order]
+
+    def similarities(self, rows):
+        """Dense (len(rows), n) cosine similarities of the given rows to every row"""
+        rows = np.asarray(rows, dtype=np.int64)
+        q_len = self.indptr[rows + 1] - self.indptr[rows]
+        q_pos = _expand(self.indptr[rows], q_len)
+        q_row = np.repeat(np.arange(len(rows)), q_len)
+        terms = self.indices[q_pos]
+        # Every stored row sharing a term with a query row, via the term's postings
+        p_len = self.col_ptr[terms + 1] - self.col_ptr[terms]
+        p_pos = _expand(self.col_ptr[terms], p_len)
+        keys = np.repeat(q_row, p_len) * self.n + self.col_rows[p_pos]
+        values = np.repeat(self.data[q_pos], p_len) * self.col_data[p_pos]
+        return np.bincount(keys, weights=values, minlength=len(rows) * self.n).reshape(len(rows), self.n)
+
+
+def top_neighbours(urls, scores, row, k):
+    """[[url, score]] of the k best-scoring other posts, ties broken by URL"""
+    scores = np.round(scores, SCORE_DIGITS)
+    scores[row] = -1
+    candidates = np.flatnonzero(scores >= MIN_SCORE)
+    # urls are sorted, so the index doubles as the tie-break
+    best = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+    return [[urls[j], float(scores[j])] for j in best]
+
+
+def collect_posts(root, cache, source_dirs=SOURCE_DIRS):
+    """{url: entry} for every post, re-reading only pages whose content changed"""
+    manifest = load_manifest(root) if root == BUILD_DIR else {}
+    cached = cache['docs']
+    docs = {}
+    read = 0
+    for source_dir in source_dirs:
+        for filename in sorted(os.listdir(os.path.join(root, source_dir))):
+            if not filename.endswith('.html') or VARIANT_SUFFIX in filename:
+                continue
+            url = f"{source_dir}/{filename}"
+            path = os.path.join(root, url)
+            entry = manifest.get(url)
+            if entry:
+                # The minified output, before any block was injected
+                digest = entry['output']
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    digest = content_hash(strip_block(f.read()))
+            if url in cached and cached[url]['hash'] == digest:
+                doc = dict(cached[url])
+            else:
+                doc = read_document(path) or {'unpublished': True}
+                doc['hash'] = digest
+                read += 1
+            if not doc.get('unpublished'):
+                doc['meta'] = metadata_terms(filename)
+            docs[url] = doc
+    return docs, read
+
+
+def _features(doc):
+    terms = Counter(doc['terms'])
+    terms.update(doc['meta'])
+    return terms
+
+
+def touched_rows(urls, docs, old_docs):
+    """Indices of posts whose neighbour lists must be recomputed from scratch"""
+    if set(urls) != set(old_docs):
+        # The post count enters every IDF weight
+        return list(range(len(urls)))
+    features = {url: _features(docs[url]) for url in urls}
+    old_features = {url: _features(old_docs[url]) for url in urls}
+    changed = {url for url in urls if features[url] != old_features[url]}
+    df = Counter(t for url in urls for t in features[url])
+    old_df = Counter(t for url in urls for t in old_features[url])
+    moved = {t for t in df.keys() | old_df.keys() if df[t] != old_df[t]}
+    # A post's vector changes with its own terms or with the weight of any of them
+    vectors = changed | {url for url in urls if not moved.isdisjoint(features[url])}
+    return [i for i, url in enumerate(urls)
+            if url in vectors or any(n in vectors for n, _ in old_docs[url]['related'])]
+
+
+def update_related(root=BUILD_DIR, cache_path=CACHE_PATH, k=TOP_K):
+    """Bring every post's neighbours up to date; returns (docs, pages re-read, rows recomputed)"""
+    cache = load_json(cache_path)
+    if cache.get('version') != RELATED_VERSION or cache.get('root') != root or cache.get('k') != k:
+        cache = {'version': RELATED_VERSION, 'root': root, 'k': k, 'docs': {}}
+    old_docs = {url: doc for url, doc in cache['docs'].items() if not doc.get('unpublished')}
+    docs, read = collect_posts(root, cache)
+
+    urls = sorted(url for url, doc in docs.items() if not doc.get('unpublished'))
+    rows = touched_rows(urls, docs, old_docs) if urls else []
+    if rows:
+        matrix = TfidfMatrix([_features(docs[url]) for url in urls])
+        recomputed = set(rows)
+        # Scores against the recomputed rows, for merging into the lists that are kept
+        fresh = {url: [] for url in urls}
+        for i in range(0, len(rows), ROW_BLOCK):
+            block = rows[i:i + ROW_BLOCK]
+            for row, scores in zip(block, matrix.similarities(block)):
+                docs[urls[row]]['related'] = top_neighbours(urls, scores, row, k)
+                for j in np.flatnonzero(np.round(scores, SCORE_DIGITS) >= MIN_SCORE):
+                    if j != row and j not in recomputed:
+                        fresh[urls[j]].append([urls[row], float(round(scores[j], SCORE_DIGITS))])
+        for j, url in enumerate(urls):
+            if j not in recomputed:
+                # Kept neighbours scored the same before; only recomputed posts can join them
+                merged = dict(old_docs[url]['related'] + fresh[url])
+                docs[url]['related'] = sorted(map(list, merged.items()), key=lambda r: (-r[1], r[0]))[:k]
+    for url in urls:
+        docs[url].setdefault('related', old_docs.get(url, {}).get('related', []))
+
+    cache['docs'] = docs
+    return cache, read, len(rows)
+
+
+def render_block(url, related, docs):
+    """The related-links block for one post, in the build tree's minified form"""
+    if not related:
+        return ''
+    items = []
+    for other, _ in related:
+        href = posixpath.relpath(other, posixpath.dirname(url))
+        section = SECTION_TITLES.get(posixpath.basename(other))
+        note = f" <small>{section}</small>" if section else ''
+        items.append(f'<li><a href="{href}">{docs[other]["title"]}</a>{note}</li>')
+    return (f'{RELATED_START}<nav class="related-posts" aria-label="Related modules" style="{BLOCK_STYLE}">'
+            f'<h3 style="margin-top:0">Related modules</h3><ul>{"".join(items)}</ul></nav>{RELATED_END}')
+
+
+def inject_block(html, block):
+    """html with its related-links block replaced, placed at the end of the article"""
+    html = strip_block(html)
+    if not block:
+        return html
+    i = html.rfind('</article>')
+    if i == -1:
+        i = html.rfind('</body>')
+    if i == -1:
+        return html + block
+    return html[:i] + block + html[i:]
+
+
+def write_blocks(root, cache, old_docs):
+    """Inject each post's block where its neighbours or its page changed; returns pages written"""
+    written = 0
+    docs = cache['docs']
+    for url, doc in docs.items():
+        if doc.get('unpublished'):
+            continue
+        path = os.path.join(root, url)
+        st = os.stat(path)
+        old = old_docs.get(url, {})
+        if old.get('stat') == [st.st_size, st.st_mtime_ns] and old.get('related') == doc['related']:
+            doc['stat'] = old['stat']
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        updated = inject_block(html, render_block(url, doc['related'], docs))
+        if updated != html:
+            write_output(path, updated.encode('utf-8'))
+            written += 1
+        st = os.stat(path)
+        doc['stat'] = [st.st_size, st.st_mtime_ns]
+    return written
+
+
+def main():
+    """Recompute related modules and inject the links into the build tree"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=BUILD_DIR,
+                        help='build tree (default: the minified build)')
+    parser.add_argument('--cache', default=CACHE_PATH)
+    parser.add_argument('-k', type=int, default=TOP_K, help='links per post')
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    if not os.path.isdir(root):
+        print(f"❌ {root} does not exist; run minify_site.py first")
+        return 2
+    # _site can exist with nothing but caches in it (search, highlight, metadata)
+    missing = [d for d in SOURCE_DIRS if not os.path.isdir(os.path.join(root, d))]
+    if missing:
+        print(f"❌ {root} has no {', '.join(missing)}; run minify_site.py first")
+        return 2
+    old_docs = load_json(args.cache).get('docs', {})
+    cache, read, recomputed = update_related(root, args.cache, args.k)
+    written = write_blocks(root, cache, old_docs)
+    save_json(args.cache, cache)
+
+    published = [url for url, doc in cache['docs'].items() if not doc.get('unpublished')]
+    print(f"📊 {len(published)} published posts ({read} re-read), {recomputed} neighbour rows recomputed")
+    print(f"✅ Related links updated in {written} pages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
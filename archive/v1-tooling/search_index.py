@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Build the sharded full-text search index for the curriculum
+Tokenizes each published post once, then writes a document table and an
+inverted index split into shards by term prefix, with delta-encoded
+posting lists; search.js fetches only the shards a query needs
+"""
+
+import argparse
+import json
+import os
+import re
+from collections import Counter
+
+from html_text import extract_text
+from site_files import (BUILD_DIR, SITE_ROOT, content_hash, file_hash, load_json,
+                        load_manifest, save_json)
+
+CACHE_PATH = os.path.join(BUILD_DIR, '.search-cache.json')
+# Committed next to blog.html: GitHub Pages serves the repo, not the build tree
+OUTPUT_DIR = os.path.join(SITE_ROOT, 'search')
+# Bump when tokenization changes so cached token counts are discarded
+INDEX_VERSION = 2
+
+SOURCE_DIRS = ('posts',)
+PREFIX_LENGTH = 2
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+TITLE_RE = re.compile(r'<title>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+NOINDEX_RE = re.compile(r'<meta[^>]+name=["\']robots["\'][^>]+noindex', re.IGNORECASE)
+STOPWORDS = frozenset("""
+a an and are as at be but by can do for from has have if in into is it its
+not of on or so that the their then there these this to was we were what
+when which who will with you your
+""".split())
+# Single letters that are curriculum languages (R, and C from C/C++)
+SHORT_TERMS = frozenset({'c', 'r'})
+
+
+def tokenize(text):
+    """Lower-cased index terms of text, stopwords and single letters (bar SHORT_TERMS) removed"""
+    return [t for t in TOKEN_RE.findall(text.lower())
+            if (len(t) > 1 or t in SHORT_TERMS) and t not in STOPWORDS]
+
+
+def read_document(path):
+    """Title and term counts of a page, or None if it is not published"""
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    # Redirect stubs and archived pages are noindex
+    if NOINDEX_RE.search(html):
+        return None
+    m = TITLE_RE.search(html)
+    title = re.sub(r'\s+', ' ', m.group(1)).strip() if m else os.path.basename(path)
+    title = re.sub(r'\s+-\s+edikan\.ai$', '', title)
+    return {'title': title, 'terms': dict(Counter(tokenize(extract_text(html))))}
+
+
+def collect_documents(root=SITE_ROOT, cache_path=CACHE_PATH, source_dirs=SOURCE_DIRS):
+    """Term counts for every published post, re-reading only changed files
+
+    When indexing the build tree (after minify_site.py) the manifest already
+    holds each page's output hash, so unchanged pages are neither read nor hashed.
+    """
+    cache = load_json(cache_path)
+    if cache.get('version') != INDEX_VERSION:
+        cache = {'version': INDEX_VERSION, 'docs': {}}
+    cached = cache['docs']
+    manifest = load_manifest(root) if root == BUILD_DIR else {}
+
+    docs = {}
+    read = 0
+    for source_dir in source_dirs:
+        for filename in sorted(os.listdir(os.path.join(root, source_dir))):
+            if not filename.endswith('.html') or '-enhanced' in filename:
+                continue
+            url = f"{source_dir}/{filename}"
+            path = os.path.join(root, url)
+            entry = manifest.get(url)
+            digest = entry['output'] if entry else file_hash(path)
+            if url in cached and cached[url]['hash'] == digest:
+                doc = cached[url]
+            else:
+                doc = read_document(path)
+                doc = dict(doc or {'unpublished': True}, hash=digest)
+                read += 1
+            docs[url] = doc
+
+    cache['docs'] = docs
+    save_json(cache_path, cache)
+    return {url: doc for url, doc in docs.items() if not doc.get('unpublished')}, read
+
+
+def build_shards(docs):
+    """Document table plus {prefix: {term: [doc id deltas, term counts]}}"""
+    table = [{'url': url, 'title': docs[url]['title']} for url in sorted(docs)]
+    postings = {}
+    for doc_id, entry in enumerate(table):
+        for term, count in docs[entry['url']]['terms'].items():
+            postings.setdefault(term, []).append((doc_id, count))
+
+    shards = {}
+    for term in sorted(postings):
+        ids, counts, last = [], [], 0
+        for doc_id, count in postings[term]:
+            ids.append(doc_id - last)
+            counts.append(count)
+            last = doc_id
+        shards.setdefault(term[:PREFIX_LENGTH], {})[term] = [ids, counts]
+    return table, shards
+
+
+def write_index(table, shards, output_dir=OUTPUT_DIR):
+    """Write index.json and changed shards; return the number of shards written"""
+    old = load_json(os.path.join(output_dir, 'index.json'))
+    old_shards = old.get('shards', {})
+
+    written = 0
+    hashes = {}
+    for prefix, shard in shards.items():
+        path = os.path.join(output_dir, f"{prefix}.json")
+        data = json.dumps(shard, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        hashes[prefix] = content_hash(data)[:12]
+        if old_shards.get(prefix) == hashes[prefix] and os.path.exists(path):
+            continue
+        os.makedirs(output_dir, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        written += 1
+
+    for prefix in set(old_shards) - set(shards):
+        path = os.path.join(output_dir, f"{prefix}.json")
+        if os.path.exists(path):
+            os.remove(path)
+
+    save_json(os.path.join(output_dir, 'index.json'), {
+        'version': INDEX_VERSION,
+        'prefix_length': PREFIX_LENGTH,
+        'docs': table,
+        'shards': hashes,
+    })
+    return written
+
+
+def main():
+    """Rebuild the search index from the published posts"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=SITE_ROOT)
+    parser.add_argument('--output', default=OUTPUT_DIR)
+    parser.add_argument('--cache', default=CACHE_PATH)
+    args = parser.parse_args()
+
+    docs, read = collect_documents(os.path.abspath(args.root), args.cache)
+    table, shards = build_shards(docs)
+    written = write_index(table, shards, args.output)
+    terms = sum(len(shard) for shard in shards.values())
+    print(f"Indexed {len(table)} posts ({read} re-read): {terms:,} terms in {len(shards)} shards")
+    print(f"✅ Wrote {written} changed shards to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
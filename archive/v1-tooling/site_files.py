@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Shared locations and helpers for the site build stages
+Knows where the site lives, which files ship, how the build manifest
+of content hashes is stored, and how overlapping builds take turns on a post
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): builds run unlocked
+    fcntl = None
+
+SITE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BUILD_DIR = os.path.join(SITE_ROOT, '_site')
+MANIFEST_NAME = '.manifest.json'
+
+# Never part of the deployed site
+EXCLUDE_DIRS = {'.git', '.github', '_site', 'v1-tooling', '__pycache__', 'node_modules'}
+EXCLUDE_EXTENSIONS = {'.py', '.pyc', '.md', '.jsonl', '.gz', '.br', '.delta'}
+
+# How long a build waits for another build's lock before giving up
+LOCK_TIMEOUT = 120
+LOCK_POLL = 0.05
+
+# Files worth precompressing and minifying
+TEXT_EXTENSIONS = {'.html', '.css', '.js', '.svg', '.xml', '.txt', '.json', '.ipynb'}
+
+
+def iter_site_files(root=SITE_ROOT, extensions=None):
+    """Yield the site-relative path of every deployable file, sorted"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames
+                             if d not in EXCLUDE_DIRS and not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.startswith('.'):
+                continue
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in EXCLUDE_EXTENSIONS:
+                continue
+            if extensions is not None and ext not in extensions:
+                continue
+            path = os.path.join(dirpath, filename)
+            yield os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def content_hash(data):
+    """SHA-256 hex digest of bytes or text"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(path):
+    """SHA-256 hex digest of a file's bytes"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_json(path, default=None):
+    """Load a JSON file, or return default if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def save_json(path, data):
+    """Atomically write data as JSON"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def load_manifest(build_dir=BUILD_DIR):
+    """Build manifest: site-relative path -> {'source': hash, 'output': hash, ...}"""
+    return load_json(os.path.join(build_dir, MANIFEST_NAME))
+
+
+def save_manifest(manifest, build_dir=BUILD_DIR):
+    """Write the build manifest next to the output tree"""
+    save_json(os.path.join(build_dir, MANIFEST_NAME), manifest)
+
+
+# Locks held in this process: (thread id, real path) -> [open file, depth]
+_held = {}
+_held_guard = threading.Lock()
+
+
+class FileLock:
+    """Advisory exclusive lock on an existing file, shared by every build stage
+
+    flock ties the lock to an open file, so two opens of the same path would
+    block each other even within one process; nested locks on a path the
+    calling thread already holds just deepen it instead. Other threads get
+    their own open and wait like another process would. A lock may be
+    released from a different thread than took it (run_pipeline's writer).
+    Stages rewrite posts in place, so the locked inode outlives each write.
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = os.path.realpath(path)
+        self.timeout = timeout
+        self._key = None
+
+    def acquire(self):
+        key = (threading.get_ident(), self.path)
+        with _held_guard:
+            held = _held.get(key)
+            if held is not None:
+                self._key = key
+                held[1] += 1
+                return self
+        f = open(self.path, 'rb')
+        if fcntl is not None:
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() > deadline:
+                        f.close()
+                        raise TimeoutError(f"{self.path} is locked by another build") from None
+                    time.sleep(LOCK_POLL)
+        with _held_guard:
+            _held[key] = [f, 1]
+        self._key = key
+        return self
+
+    def release(self):
+        with _held_guard:
+            held = _held[self._key]
+            held[1] -= 1
+            if held[1]:
+                return
+            del _held[self._key]
+        # Closing the file drops the flock
+        held[0].close()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
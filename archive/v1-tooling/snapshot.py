@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Golden-output snapshot check for the page generators and enhancers
+Renders the whole corpus through create_all_posts, the rich-content and
+educational enhancers (whole and streamed) and the blog index into a temp
+tree, compares each file's hash with the committed golden manifest, and
+shows diffs only for files that changed. A byte-identical safety net for pipeline refactors.
+The enhancers' regex rules are checked first: their declared prefilter
+literals and windows must still agree with what re's parser derives.
+A plain build_coordinator run must also leave every live essay byte-identical,
+and a second build of an unchanged site must emit the same service worker
+"""
+
+import argparse
+import contextlib
+import difflib
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from build_coordinator import changed_essays
+from post_metrics import measure_post
+from precache import check_rebuild
+from regex_rules import RuleSet, check_rules
+from site_files import BUILD_DIR, SITE_ROOT, content_hash, load_json, save_json
+from text_stream import join_pieces, read_pieces
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots.json')
+# Local copies of the golden pages, so a mismatch can be shown as a diff
+GOLDEN_COPIES = os.path.join(BUILD_DIR, '.golden')
+# Bump when the layout of the rendered tree changes
+SNAPSHOT_VERSION = 1
+
+# Base posts the enhancers read (enhanced variants are derived, not inputs)
+POST_DIRS = ['posts', 'archive/v1-posts']
+# Small and odd, so stream windows straddle every kind of boundary
+STREAM_CHUNK = 509
+MAX_DIFF_LINES = 80
+
+
+def source_posts(root=SITE_ROOT):
+    """[(site-relative path, content)] of every base post"""
+    posts = []
+    for post_dir in POST_DIRS:
+        for filename in sorted(os.listdir(os.path.join(root, post_dir))):
+            if filename.endswith('.html') and '-enhanced' not in filename:
+                with open(os.path.join(root, post_dir, filename), 'r', encoding='utf-8') as f:
+                    posts.append((f"{post_dir}/{filename}", f.read()))
+    return posts
+
+
+def render_generated(posts):
+    """Every module page create_all_posts would write, from fresh caches"""
+    create_all_posts = importlib.import_module('create_all_posts')
+    metrics_store, highlight_cache = {}, {}
+    for m in create_all_posts.all_posts:
+        yield (f"create_all_posts/{m.filename}", None,
+               create_all_posts.create_post(m.num, m.filename, m.title, m.date, m.focus, m.languages,
+                                            metrics_store, highlight_cache))
+
+
+def render_comprehensive(posts):
+    """The rich-content block of every post type, and every post it would enrich"""
+    comprehensive = importlib.import_module('enhance_all_posts_comprehensive')
+    for post_type in sorted(comprehensive.STORIES) + ['general']:
+        yield f"comprehensive/types/{post_type}.html", None, comprehensive.create_rich_content(post_type)
+    for rel_path, content in posts:
+        enriched = comprehensive.enrich_content(os.path.basename(rel_path), content)
+        if enriched is not None:
+            yield f"comprehensive/{rel_path}", content_hash(content), enriched
+
+
+def render_educational(posts):
+    """The enhanced variant of every post"""
+    educational = importlib.import_module('enhance_posts_educational')
+    for rel_path, content in posts:
+        yield (f"educational/{rel_path}", content_hash(content),
+               educational.enhance_content(os.path.basename(rel_path), content))
+
+
+def render_educational_stream(posts):
+    """The same variants through the bounded-memory streaming path, in small chunks"""
+    educational = importlib.import_module('enhance_posts_educational')
+    for rel_path, content in posts:
+        chunks = (content[i:i + STREAM_CHUNK] for i in range(0, len(content), STREAM_CHUNK))
+        pieces = educational.enhance_stream(os.path.basename(rel_path), read_pieces(chunks))
+        yield f"educational_stream/{rel_path}", content_hash(content), join_pieces(pieces)
+
+
+def render_blog(posts):
+    """The single-page index, the landing page and every section shard"""
+    blog = importlib.import_module('generate-blog-posts')
+    # Reading times measured from the posts themselves, not the local build's store
+    metrics_store = {}
+    for rel_path, content in posts:
+        if rel_path.startswith('posts/'):
+            measure_post(os.path.basename(rel_path), content, metrics_store)
+    yield 'blog/blog.html', None, blog.create_blog_index(metrics_store)
+    yield 'blog/index.html', None, blog.create_landing_page(metrics_store)
+    grouped = blog.posts_by_section()
+    sections = [section for section, _ in grouped]
+    for i, (section, section_posts) in enumerate(grouped):
+        neighbours = (sections[i - 1] if i else None, sections[i + 1] if i + 1 < len(sections) else None)
+        for name, html in blog.create_section_page(section, section_posts, *neighbours, metrics_store).items():
+            yield f"blog/{name}", None, html
+
+
+RENDERERS = {
+    'create_all_posts': render_generated,
+    'comprehensive': render_comprehensive,
+    'educational': render_educational,
+    'educational_stream': render_educational_stream,
+    'blog': render_blog,
+}
+
+
+def rule_problems():
+    """check_rules over every shipped rule set"""
+    educational = importlib.import_module('enhance_posts_educational')
+    return check_rules([educational.STRUCTURE_RULES, educational.PRONOUN_RULES,
+                        RuleSet([educational.EXERCISES_RULE])])
+
+
+def render_corpus(out_dir, names=None, root=SITE_ROOT):
+    """Write every renderer's output under out_dir; returns {path: {'input', 'output'}}"""
+    posts = source_posts(root)
+    files = {}
+    for name in names or RENDERERS:
+        # The scripts narrate as they go; only their output matters here
+        with contextlib.redirect_stdout(io.StringIO()):
+            rendered = list(RENDERERS[name](posts))
+        for rel_path, input_hash, text in rendered:
+            path = os.path.join(out_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            files[rel_path] = {'input': input_hash, 'output': content_hash(text)}
+    return files
+
+
+def compare(files, golden, names=None):
+    """(changed, added, missing) paths against the golden manifest"""
+    prefixes = tuple(f"{name}/" for name in names) if names else ('',)
+    expected = {p: e for p, e in golden.items() if p.startswith(prefixes)}
+    changed = sorted(p for p in files if p in expected and files[p]['output'] != expected[p]['output'])
+    added = sorted(set(files) - set(expected))
+    missing = sorted(set(expected) - set(files))
+    return changed, added, missing
+
+
+def show_diff(rel_path, out_dir, golden_entry):
+    """Unified diff against the local golden copy, if there is a matching one"""
+    golden_path = os.path.join(GOLDEN_COPIES, rel_path)
+    try:
+        with open(golden_path, 'r', encoding='utf-8') as f:
+            before = f.read()
+    except OSError:
+        before = None
+    if before is None or content_hash(before) != golden_entry['output']:
+        print("      (no local golden copy; run --update on the golden commit to see diffs)")
+        return
+    with open(os.path.join(out_dir, rel_path), 'r', encoding='utf-8') as f:
+        after = f.read()
+    diff = list(difflib.unified_diff(before.splitlines(), after.splitlines(),
+                                     f"golden/{rel_path}", f"rendered/{rel_path}", lineterm='', n=2))
+    for line in diff[:MAX_DIFF_LINES]:
+        print(f"      {line}")
+    if len(diff) > MAX_DIFF_LINES:
+        print(f"      ... {len(diff) - MAX_DIFF_LINES} more diff lines")
+
+
+def save_copies(out_dir, names=None):
+    """Keep the rendered tree as the local golden copies"""
+    for name in names or RENDERERS:
+        target = os.path.join(GOLDEN_COPIES, name)
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        if os.path.isdir(os.path.join(out_dir, name)):
+            shutil.copytree(os.path.join(out_dir, name), target)
+
+
+def main():
+    """Render the corpus and compare it with the golden manifest"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', action='append', choices=sorted(RENDERERS),
+                        help='check one renderer (repeatable; default: all)')
+    parser.add_argument('--update', action='store_true',
+                        help='accept the current output as the new golden manifest')
+    parser.add_argument('--keep', metavar='DIR', help='write the rendered tree here and keep it')
+    parser.add_argument('--golden', default=GOLDEN_PATH)
+    args = parser.parse_args()
+
+    problems = rule_problems()
+    problems += [f"posts/{f} is changed by a plain build_coordinator run" for f in changed_essays()]
+    problems += [f"{name} changed on a rebuild with no edits" for name in check_rebuild()]
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        return 1
+
+    start = time.perf_counter()
+    out_dir = args.keep or tempfile.mkdtemp(prefix='snapshot-')
+    try:
+        files = render_corpus(out_dir, args.only)
+        elapsed = time.perf_counter() - start
+        manifest = load_json(args.golden)
+        golden = manifest.get('files', {}) if manifest.get('version') == SNAPSHOT_VERSION else {}
+
+        if args.update:
+            if args.only:
+                prefixes = tuple(f"{name}/" for name in args.only)
+                files = dict({p: e for p, e in golden.items() if not p.startswith(prefixes)}, **files)
+            changed, added, missing = compare(files, golden)
+            save_json(args.golden, {'version': SNAPSHOT_VERSION, 'files': files})
+            save_copies(out_dir, args.only)
+            print(f"✅ Golden manifest updated: {len(files)} files "
+                  f"({len(changed)} changed, {len(added)} added, {len(missing)} removed) in {elapsed:.2f}s")
+            return 0
+
+        changed, added, missing = compare(files, golden, args.only)
+        if not (changed or added or missing):
+            # A passing run is a known-good render: keep it around for future diffs
+            save_copies(out_dir, args.only)
+            print(f"✅ {len(files)} rendered files match the golden manifest ({elapsed:.2f}s)")
+            return 0
+
+        for rel_path in changed:
+            note = ' (its input post changed too)' if files[rel_path]['input'] != golden[rel_path]['input'] else ''
+            print(f"❌ changed: {rel_path}{note}")
+            show_diff(rel_path, out_dir, golden[rel_path])
+        for rel_path in added:
+            print(f"⚠️  new, not in the golden manifest: {rel_path}")
+        for rel_path in missing:
+            print(f"⚠️  in the golden manifest but not rendered: {rel_path}")
+        print(f"❌ {len(changed)} changed, {len(added)} new, {len(missing)} missing of "
+              f"{len(files)} rendered files ({elapsed:.2f}s); run with --update if this is intended")
+        return 1
+    finally:
+        if not args.keep:
+            shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
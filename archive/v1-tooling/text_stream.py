@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Bounded buffers for streaming text rewrites
+A stream is a sequence of (text, origin) pieces: origin is the offset of
+text in the source document when it is an unchanged copy, None when a
+rewrite produced it. Stages hold only a window of pending text, and the
+origins let a consumer recover the edits without diffing the whole page
+"""
+
+from collections import deque
+
+# Characters kept before the pending text so \b and lookbehinds see real context
+CONTEXT = 64
+# Consumed text is only cut from the buffer once this much has built up
+COMPACT_AT = 1 << 15
+
+
+def read_pieces(chunks, start=0):
+    """(chunk, offset) pieces for an iterable of source chunks"""
+    offset = start
+    for chunk in chunks:
+        yield chunk, offset
+        offset += len(chunk)
+
+
+def join_pieces(pieces):
+    """The text a stream spells out"""
+    return ''.join(text for text, _ in pieces)
+
+
+class PieceBuffer:
+    """Pending text of a stream, and where each part of it came from"""
+
+    def __init__(self, context=CONTEXT):
+        self.context = context
+        self._text = ''           # kept context, then the pending text
+        self._incoming = []       # pushed text not yet joined onto _text
+        self.size = 0             # len(self.text)
+        self.pos = 0              # start of the pending text in self.text
+        self.segments = deque()   # [length, origin] runs covering the pending text
+
+    @property
+    def text(self):
+        # Pushes are joined in one go when the text is next needed
+        if self._incoming:
+            self._text += ''.join(self._incoming)
+            self._incoming.clear()
+        return self._text
+
+    def pending(self):
+        return self.size - self.pos
+
+    def push(self, text, origin):
+        if text:
+            self._incoming.append(text)
+            self.size += len(text)
+            self.segments.append([len(text), origin])
+
+    def take(self, n):
+        """Yield the next n pending characters as pieces"""
+        text = self.text
+        while n > 0:
+            segment = self.segments[0]
+            length, origin = segment
+            k = min(n, length)
+            yield text[self.pos:self.pos + k], origin
+            self.pos += k
+            n -= k
+            if k == length:
+                self.segments.popleft()
+            else:
+                segment[0] -= k
+                segment[1] = None if origin is None else origin + k
+
+    def drop(self, n):
+        """Consume the next n pending characters without emitting them"""
+        for _ in self.take(n):
+            pass
+
+    def compact(self):
+        """Forget consumed text beyond the context, once enough has built up"""
+        if self.pos > self.context + COMPACT_AT:
+            cut = self.pos - self.context
+            self._text = self.text[cut:]
+            self.size -= cut
+            self.pos -= cut
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Validate every internal link and anchor in the site
+Parses all pages once (in parallel, cached by content hash), builds a
+reverse index of hrefs and ids, and reports broken links, missing anchors
+and orphaned pages
+"""
+
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from site_files import (BUILD_DIR, SITE_ROOT, content_hash, file_hash,
+                        iter_site_files, load_json, save_json)
+
+CACHE_PATH = os.path.join(BUILD_DIR, '.link-cache.json')
+# Bump when parse output changes so the cache is discarded
+CACHE_VERSION = 1
+
+# Pages that are reachable without an inbound link
+ENTRY_POINTS = {'index.html', '404.html'}
+
+LINK_ATTRS = {
+    'a': 'href', 'link': 'href', 'area': 'href',
+    'img': 'src', 'script': 'src', 'iframe': 'src', 'source': 'src',
+}
+REFRESH_RE = re.compile(r'url\s*=\s*[\'"]?([^\'";]+)', re.IGNORECASE)
+LOC_RE = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+SKIP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:')
+
+
+class PageParser(HTMLParser):
+    """Collect outgoing links, element ids and the noindex flag of a page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.ids = []
+        self.noindex = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get('id'):
+            self.ids.append(attrs['id'])
+        if tag == 'a' and attrs.get('name'):
+            self.ids.append(attrs['name'])
+        attr = LINK_ATTRS.get(tag)
+        if attr and attrs.get(attr) is not None:
+            # Only <link> rels that name a real resource are followed
+            rel = set((attrs.get('rel') or '').lower().split())
+            if tag != 'link' or rel & {'canonical', 'stylesheet', 'icon', 'manifest'}:
+                self.links.append(attrs[attr].strip())
+        if tag == 'meta':
+            if (attrs.get('http-equiv') or '').lower() == 'refresh':
+                m = REFRESH_RE.search(attrs.get('content') or '')
+                if m:
+                    self.links.append(m.group(1).strip())
+            if (attrs.get('name') or '').lower() == 'robots' and 'noindex' in (attrs.get('content') or ''):
+                self.noindex = True
+
+    handle_startendtag = handle_starttag
+
+
+def parse_page(args):
+    """Parse one file into {'links', 'ids', 'noindex'}"""
+    path, rel_path = args
+    with open(path, 'rb') as f:
+        data = f.read()
+    text = data.decode('utf-8', errors='replace')
+    if rel_path.endswith('.xml'):
+        return rel_path, content_hash(data), {'links': LOC_RE.findall(text), 'ids': [], 'noindex': True}
+    parser = PageParser()
+    parser.feed(text)
+    parser.close()
+    return rel_path, content_hash(data), {
+        'links': parser.links, 'ids': parser.ids, 'noindex': parser.noindex
+    }
+
+
+def site_host(root):
+    """The site's own host name, from the GitHub Pages CNAME file"""
+    try:
+        with open(os.path.join(root, 'CNAME'), 'r', encoding='utf-8') as f:
+            return f.read().strip().lower()
+    except OSError:
+        return None
+
+
+def resolve(source, link, host, files):
+    """Resolve a link from source to (site-relative path, fragment), or None if external"""
+    if not link or link.lower().startswith(SKIP_SCHEMES):
+        return None
+    parts = urlsplit(link)
+    if parts.scheme or parts.netloc:
+        if parts.netloc.lower().split(':')[0] not in (host, 'www.' + (host or '')):
+            return None
+        path = parts.path or '/'
+    else:
+        path = parts.path
+    fragment = parts.fragment
+
+    if not path:
+        target = source
+    elif path.startswith('/'):
+        target = path.lstrip('/')
+    else:
+        target = os.path.normpath(os.path.join(os.path.dirname(source), path))
+    target = unquote(target).replace(os.sep, '/')
+    if target in ('.', ''):
+        target = 'index.html'
+    if target.endswith('/') or (target not in files and target + '/index.html' in files):
+        target = target.rstrip('/') + '/index.html'
+    return target, fragment
+
+
+def scan(root=SITE_ROOT, cache_path=CACHE_PATH, workers=None):
+    """Parse every page, reusing cached results for unchanged files"""
+    cache = load_json(cache_path)
+    if cache.get('version') != CACHE_VERSION:
+        cache = {'version': CACHE_VERSION, 'root': root, 'pages': {}}
+    cached = cache['pages'] if cache.get('root') == root else {}
+
+    pages = {}
+    files = set()
+    jobs = []
+    for rel_path in iter_site_files(root):
+        files.add(rel_path)
+        if not rel_path.endswith(('.html', '.xml')):
+            continue
+        path = os.path.join(root, rel_path)
+        st = os.stat(path)
+        entry = cached.get(rel_path)
+        # Same size and mtime: trust the cache without reading the file
+        if entry and entry['stat'] == [st.st_size, st.st_mtime_ns]:
+            pages[rel_path] = entry
+            continue
+        # Touched but not edited (a checkout, a copy): the hash saves the parse
+        if entry and entry['hash'] == file_hash(path):
+            pages[rel_path] = dict(entry, stat=[st.st_size, st.st_mtime_ns])
+            continue
+        jobs.append((path, rel_path))
+
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for rel_path, digest, parsed in pool.map(parse_page, jobs, chunksize=16):
+                st = os.stat(os.path.join(root, rel_path))
+                pages[rel_path] = {'stat': [st.st_size, st.st_mtime_ns], 'hash': digest, 'page': parsed}
+
+    cache['pages'] = pages
+    cache['root'] = root
+    save_json(cache_path, cache)
+    return files, {rel_path: entry['page'] for rel_path, entry in pages.items()}, len(jobs)
+
+
+def build_index(files, pages, host):
+    """Reverse index: target path -> list of (source, link, fragment)"""
+    index = {}
+    for source, page in pages.items():
+        for link in page['links']:
+            resolved = resolve(source, link, host, files)
+            if resolved is None:
+                continue
+            target, fragment = resolved
+            index.setdefault(target, []).append((source, link, fragment))
+    return index
+
+
+def validate(root=SITE_ROOT, cache_path=CACHE_PATH):
+    """Return a report dict of broken links, missing anchors, placeholders and orphans"""
+    files, pages, parsed = scan(root, cache_path)
+    index = build_index(files, pages, site_host(root))
+    ids = {rel_path: set(page['ids']) for rel_path, page in pages.items()}
+
+    broken = []
+    anchors = []
+    placeholders = []
+    for target, refs in sorted(index.items()):
+        for source, link, fragment in refs:
+            if link == '#':
+                placeholders.append((source, link))
+            elif target not in files:
+                broken.append((source, link))
+            elif (fragment and target in ids and fragment not in ids[target]
+                  and unquote(fragment) not in ids[target]):
+                anchors.append((source, link))
+
+    linked = {target for target, refs in index.items()
+              if any(source != target for source, _, _ in refs)}
+    orphans = sorted(rel_path for rel_path, page in pages.items()
+                     if rel_path.endswith('.html')
+                     and rel_path not in linked
+                     and os.path.basename(rel_path) not in ENTRY_POINTS
+                     and not page['noindex'])
+
+    return {
+        'pages': len(pages), 'parsed': parsed,
+        'broken': broken, 'anchors': anchors,
+        'placeholders': placeholders, 'orphans': orphans,
+    }
+
+
+def main():
+    """Validate links and exit non-zero if any are broken"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('root', nargs='?', default=SITE_ROOT)
+    parser.add_argument('--cache', default=CACHE_PATH)
+    args = parser.parse_args()
+
+    report = validate(os.path.abspath(args.root), args.cache)
+    print(f"Checked {report['pages']} pages ({report['parsed']} re-parsed)")
+
+    for title, key in [('Broken links', 'broken'), ('Missing anchors', 'anchors'),
+                       ('Placeholder links', 'placeholders')]:
+        if report[key]:
+            print(f"\n{title}:")
+            for source, link in report[key]:
+                print(f"  {source} -> {link}")
+    if report['orphans']:
+        print("\nOrphaned pages (no inbound links):")
+        for rel_path in report['orphans']:
+            print(f"  {rel_path}")
+
+    if report['broken'] or report['anchors']:
+        print(f"\n❌ {len(report['broken'])} broken links, {len(report['anchors'])} missing anchors")
+        sys.exit(1)
+    print("\n✅ All internal links resolve")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmarks for the workforce pipeline model functions.
+
+Times enrollment paths, graduates, the Figure 2 cumulative gap, the
+sensitivity sweep and the stock-flow engine across scenario counts (3 to
+10^5) and horizons (the 2015-2040 YEARS range at annual to quarter-year
+resolution). Each case records mean and p95 wall time and peak traced
+memory, and every run is appended to a JSON history so vectorization work
+shows up as numbers and regressions fail --check.
+
+Usage:  python benchmarks.py [--quick] [--case NAME ...] [--check] [--tolerance 1.5]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+import stock_flow as sf
+from workforce_model import A, cumulative_gap, graduates
+
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark-history.json')
+
+SCENARIO_COUNTS = [3, 100, 1_000, 10_000, 100_000]
+STEPS = [1.0, 0.5, 0.25]              # years per step: annual, half-year, quarter
+QUICK = dict(scenarios=[3, 1_000], steps=[1.0, 0.25])
+EDGE_BAND = (300, 500)
+SWEEP = dict(lag=[4, 5], completion=[0.60, 0.70, 0.80], need=[300, 400, 500])
+
+
+def _inputs(n, dt):
+    '''Time grid, multipliers and enrollment for n scenarios at step dt.'''
+    years = sf.time_grid(2015, 2040, dt)
+    m = np.linspace(1.0, 3.0, n)
+    return years, m, sf.scenario_enrollment(m, years)
+
+
+def case_enrollment_paths(n, dt):
+    years, m, _ = _inputs(n, dt)
+    return lambda: sf.scenario_enrollment(m, years)
+
+
+def case_graduates(n, dt):
+    years, _, enroll = _inputs(n, dt)
+    lag = int(round(A['lag'] / dt))
+    return lambda: graduates(enroll, lag=lag, years=years)
+
+
+def case_fig2_gap(n, dt):
+    years, _, enroll = _inputs(n, dt)
+    supply = graduates(enroll, lag=int(round(A['lag'] / dt)), years=years) * A['industry_entry']
+    return lambda: [cumulative_gap(supply, need, years) for need in EDGE_BAND]
+
+
+def case_sensitivity_sweep(n, dt):
+    years, _, enroll = _inputs(n, dt)
+    w = (years >= 2026) & (years <= 2035)
+
+    def run():
+        out = []
+        for lag in SWEEP['lag']:
+            for comp in SWEEP['completion']:
+                g = graduates(enroll, lag=int(round(lag / dt)), completion=comp, years=years)
+                g = g[:, w] * A['industry_entry']
+                out.extend(np.maximum(need - g, 0).sum(axis=1) for need in SWEEP['need'])
+        return out
+    return run
+
+
+def case_stock_flow(n, dt):
+    years, _, enroll = _inputs(n, dt)
+    params = sf.make_params(n)
+    return lambda: sf.simulate(enroll, params, years)
+
+
+CASES = {
+    'enrollment_paths': case_enrollment_paths,
+    'graduates': case_graduates,
+    'fig2_gap': case_fig2_gap,
+    'sensitivity_sweep': case_sensitivity_sweep,
+    'stock_flow': case_stock_flow,
+}
+
+
+def measure(fn, repeat=None, budget=0.5):
+    '''Mean/p95 seconds over repeated calls and peak traced bytes of one call.'''
+    fn()  # warm up
+    if repeat is None:
+        t0 = time.perf_counter()
+        fn()
+        repeat = int(np.clip(budget / max(time.perf_counter() - t0, 1e-6), 3, 200))
+    times = np.empty(repeat)
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times[i] = time.perf_counter() - t0
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return dict(mean_s=float(times.mean()), p95_s=float(np.percentile(times, 95)),
+                peak_bytes=int(peak), repeat=repeat)
+
+
+def run(cases=CASES, scenarios=SCENARIO_COUNTS, steps=STEPS):
+    '''Measure every case x scenario count x step; returns {case/n/dt: stats}.'''
+    results = {}
+    for name in cases:
+        for n in scenarios:
+            for dt in steps:
+                key = f"{name}/n={n}/dt={dt:g}"
+                results[key] = measure(CASES[name](n, dt))
+                r = results[key]
+                print(f"  {key:40s} mean {r['mean_s'] * 1e3:9.3f} ms  "
+                      f"p95 {r['p95_s'] * 1e3:9.3f} ms  peak {r['peak_bytes'] / 2**20:8.2f} MiB")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                               text=True, cwd=os.path.dirname(HISTORY)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path=HISTORY):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def record(results, path=HISTORY):
+    '''Append this run to the JSON history.'''
+    history = load_history(path)
+    history.append(dict(
+        timestamp=datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        commit=_git_commit(),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        machine=platform.machine(),
+        results=results,
+    ))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=1)
+
+
+def regressions(results, history, tolerance=1.5, window=5):
+    '''Cases whose mean is more than tolerance x the median of recent runs.'''
+    slow = []
+    for key, r in results.items():
+        past = [run['results'][key]['mean_s'] for run in history[-window:] if key in run['results']]
+        if past and r['mean_s'] > tolerance * float(np.median(past)):
+            slow.append((key, r['mean_s'], float(np.median(past))))
+    return slow
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--case', action='append', choices=sorted(CASES),
+                        help='benchmark only this case (repeatable)')
+    parser.add_argument('--quick', action='store_true', help='small scenario counts and two horizons')
+    parser.add_argument('--check', action='store_true',
+                        help='exit 1 if a case is slower than --tolerance x its recent median')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    parser.add_argument('--no-record', action='store_true', help='do not append to the history')
+    args = parser.parse_args()
+
+    grid = QUICK if args.quick else dict(scenarios=SCENARIO_COUNTS, steps=STEPS)
+    history = load_history()
+    print(f"Benchmarking {len(args.case or CASES)} case(s)")
+    results = run(args.case or CASES, **grid)
+
+    slow = regressions(results, history, args.tolerance)
+    if not args.no_record:
+        record(results)
+        print(f"Recorded run {len(history) + 1} in {HISTORY}")
+    for key, now, before in slow:
+        print(f"  slower: {key} {now * 1e3:.3f} ms vs median {before * 1e3:.3f} ms")
+    if args.check and slow:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Precompute scenario lookup tables for the interactive workforce-pipeline page.
+
+Evaluates the cohort model (workforce_model.graduates) over a dense grid of
+the A assumptions and packs the graduate trajectories into one quantized
+int16 binary that scenario-explorer.js fetches once and interpolates in the
+browser -- slider-driven what-ifs with no backend and no notebook re-run.
+
+Layout of workforce-scenarios.bin (little-endian):
+    b'WFS1' | uint32 header length | UTF-8 JSON header | pad to 8 bytes | int16 data
+The header gives the axes, years, array shape and the scale factor:
+    graduates = int16 value * scale
+Industry entry (A3) and demand (A4) are plain multipliers/offsets of these
+trajectories, so the page applies them exactly instead of tabulating them.
+Completion (A2) is not an axis: calibrating to the 2020 anchor (V2) cancels
+it exactly, as the notebook's sensitivity section notes. The grid is kept in
+the model result store, so rebuilding after an unrelated edit is a lookup.
+
+Usage:  python build_scenario_tables.py [output.bin]
+"""
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from result_store import pick, result
+from workforce_model import A, V, YEARS, enrollment_paths, graduates
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'workforce-scenarios.bin')
+
+# Sensitivity ranges from the notebook, widened so sliders have room
+AXES = dict(
+    # A1, whole years; capped at 5 because the 2020 calibration anchor
+    # needs a cohort that entered within the 2015+ enrollment series
+    lag        = [2, 3, 4, 5],
+    multiplier = np.round(np.arange(1.0, 4.001, 0.1), 2).tolist(),   # A5: enrollment vs. 2023 level
+)
+
+
+def build_table(axes=AXES):
+    '''Graduates per year, shape (lag, multiplier, year).'''
+    enroll = enrollment_paths(axes['multiplier'])
+    table = np.empty((len(axes['lag']), len(axes['multiplier']), len(YEARS)))
+    for i, lag in enumerate(axes['lag']):
+        table[i] = graduates(enroll, lag=lag)
+    return table
+
+
+@result('explorer_table', inputs=lambda: dict(
+        V=pick(V, 'enroll_2015', 'enroll_2023', 'degrees_2020'),
+        A=pick(A, 'lag', 'completion'), axes=AXES, years=YEARS))
+def explorer_table():
+    '''The explorer grid as a stored result.'''
+    return dict(graduates=build_table())
+
+
+def pack(table, axes=AXES):
+    '''Quantize to int16 with a single scale factor and prepend the header.'''
+    scale = float(table.max()) / 32767 if table.max() > 0 else 1.0
+    data = np.round(table / scale).astype('<i2')
+    header = json.dumps(dict(
+        version=1,
+        years=YEARS.tolist(),
+        axes=axes,
+        shape=list(data.shape),
+        scale=scale,
+        defaults=dict(lag=A['lag'], multiplier=2.0,
+                      industry_entry=A['industry_entry'], eng_openings=A['eng_openings']),
+        anchors=dict(degrees_2020=V['degrees_2020'], enroll_2023=V['enroll_2023']),
+    ), separators=(',', ':')).encode('utf-8')
+    head = b'WFS1' + struct.pack('<I', len(header)) + header
+    head += b'\0' * (-len(head) % 8)
+    return head + data.tobytes()
+
+
+def main():
+    out = sys.argv[1] if len(sys.argv) > 1 else OUTPUT
+    table = np.asarray(explorer_table()['graduates'])
+    blob = pack(table)
+    with open(out, 'wb') as f:
+        f.write(blob)
+    err = np.abs(np.frombuffer(blob[-table.size * 2:], '<i2').reshape(table.shape)
+                 * (table.max() / 32767) - table).max()
+    print(f"Wrote {out}: {table.shape[0] * table.shape[1]} trajectories, "
+          f"{len(blob):,} bytes, max quantization error {err:.3f} graduates/yr")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Stored results of the Minerals Workforce Pipeline Model.
+
+The trajectories and summary tables of workforce_pipeline_model_v02.ipynb
+(Figure 1 supply, the demand table dm, the Figure 2 rows and the
+sensitivity table sens), registered with result_store so that figures and
+scripts read them from disk instead of recomputing them. Each result
+declares the V/A entries it reads; editing one constant recomputes only the
+results that depend on it, and editing the model code recomputes the
+results that run it. The notebook loads dm, the Figure 2 rows and sens
+from here (so its HTML export shows the stored numbers), and
+workforce-pipeline.html reads them through build_scenario_tables.py;
+models/index.html quotes no model figures.
+
+    from model_results import sensitivity_table
+    sens = pd.DataFrame(sensitivity_table())   # memory-mapped columns
+
+Usage:  python model_results.py     (refresh every result, prune stale keys)
+"""
+import numpy as np
+
+from result_store import REGISTRY, get, pick, prune, result
+from workforce_model import A, V, YEARS, SCENARIO_MULTIPLIERS, enrollment_paths, graduates
+
+# Figure 2 demand band (V11: BLS ~400/yr, band 300-500) and window
+EDGE_BAND = (300, 500)
+GAP_WINDOW = (2026, 2035)
+
+# Sensitivity ranges of the notebook's assumption sweep
+SENSITIVITY = dict(
+    scenario='S1_grant_doubling',
+    lag=[4, 5],
+    completion=[0.60, 0.70, 0.80],
+    eng_need_per_yr=[300, 400, 500],
+)
+
+ENROLLMENT_INPUTS = ('enroll_2015', 'enroll_2023', 'degrees_2020')
+
+
+def _window(years=YEARS):
+    return (years >= GAP_WINDOW[0]) & (years <= GAP_WINDOW[1])
+
+
+@result('trajectories', inputs=lambda: dict(
+        V=pick(V, *ENROLLMENT_INPUTS), A=pick(A, 'lag', 'completion'),
+        scenarios=SCENARIO_MULTIPLIERS, years=YEARS))
+def trajectories():
+    '''Enrollment and calibrated graduates per named scenario.'''
+    enroll = enrollment_paths(list(SCENARIO_MULTIPLIERS.values()))
+    return dict(
+        scenario=np.array(list(SCENARIO_MULTIPLIERS)),
+        years=YEARS,
+        enrollment=enroll,
+        graduates=graduates(enroll),
+    )
+
+
+@result('demand_table', inputs=lambda: dict(
+        V=pick(V, 'jobs_per_year_lo', 'jobs_per_year_hi'), A=pick(A, 'eng_openings')))
+def demand_table():
+    '''Annual openings per tier for the low and high V6 cases (dm).'''
+    total = np.array([V['jobs_per_year_lo'], V['jobs_per_year_hi']], dtype=float)
+    return dict(
+        case=np.array(['lo', 'hi']),
+        total=total,
+        engineer=np.full(2, float(A['eng_openings'])),
+        practitioner=total - A['eng_openings'],
+    )
+
+
+@result('gap_table', deps=('trajectories',), inputs=lambda: dict(
+        A=pick(A, 'industry_entry'), band=EDGE_BAND, window=GAP_WINDOW))
+def gap_table(trajectories):
+    '''Figure 2: cumulative engineer-tier gap per scenario across the demand band.'''
+    supply = np.asarray(trajectories['graduates']) * A['industry_entry']
+    w = _window(np.asarray(trajectories['years']))
+    lo = np.cumsum(np.maximum(EDGE_BAND[0] - supply[:, w], 0), axis=1)
+    hi = np.cumsum(np.maximum(EDGE_BAND[1] - supply[:, w], 0), axis=1)
+    return dict(
+        scenario=np.asarray(trajectories['scenario']),
+        years=YEARS[w],
+        supply=supply,
+        cum_gap_lo=lo,
+        cum_gap_hi=hi,
+        cum_gap_2035_lo=lo[:, -1].astype(int),
+        cum_gap_2035_hi=hi[:, -1].astype(int),
+    )
+
+
+@result('sensitivity_table', inputs=lambda: dict(
+        V=pick(V, *ENROLLMENT_INPUTS), A=pick(A, 'lag', 'industry_entry'),
+        scenarios=SCENARIO_MULTIPLIERS, sweep=SENSITIVITY, window=GAP_WINDOW))
+def sensitivity_table():
+    '''Cumulative engineer-tier gap over lag x completion x need (sens).'''
+    enroll = enrollment_paths([SCENARIO_MULTIPLIERS[SENSITIVITY['scenario']]])
+    lag, comp, need = np.meshgrid(SENSITIVITY['lag'], SENSITIVITY['completion'],
+                                  SENSITIVITY['eng_need_per_yr'], indexing='ij')
+    lag, comp, need = lag.ravel(), comp.ravel(), need.ravel()
+    supply = {(l, c): graduates(enroll, lag=l, completion=c)[0] * A['industry_entry']
+              for l in SENSITIVITY['lag'] for c in SENSITIVITY['completion']}
+    w = _window()
+    gap = np.array([np.maximum(n - supply[l, c][w], 0).sum() for l, c, n in zip(lag, comp, need)])
+    return dict(
+        lag=lag,
+        completion=comp,
+        eng_need_per_yr=need,
+        first_gain_year=2027 + lag,
+        cum_eng_gap_2026_2035=gap.astype(int),
+    )
+
+
+def main():
+    for name in REGISTRY:
+        r = get(name)
+        print(f"{'computed' if r.computed else 'cached  '} {name:20s} {r.key}  "
+              f"{', '.join(r)}")
+    removed = prune()
+    if removed:
+        print(f"Pruned {removed} stale result(s)")
+    g = gap_table()
+    for s, lo, hi in zip(g['scenario'], g['cum_gap_2035_lo'], g['cum_gap_2035_hi']):
+        print(f"{s:20s} cumulative engineer gap 2026-2035: {lo:,} - {hi:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Policy-mix optimizer for the workforce pipeline model.
+
+Finds the yearly degree-enrollment levels and accelerated-cohort sizes that
+minimize cumulative unfilled openings (both tiers, 2026-2035) under capacity
+limits, and among those mixes the cheapest one. The stock-flow engine is
+linear in both decisions once the pre-policy history is fixed, so the model
+is probed with one batched stock_flow.simulate call (baseline plus one unit
+impulse per decision) and the problem becomes
+
+    minimize    sum_t dt * (w_eng * u_eng[t] + w_prac * u_prac[t]) + eps * cost . x
+    subject to  u >= openings - (baseline + J (x - x_status_quo)),  u >= 0
+                capacity bounds, yearly ramp limits, optional budget
+
+Solved exactly with scipy.optimize.linprog when scipy is installed, otherwise
+by a batched cross-entropy search that scores thousands of candidate
+policies per iteration with one matrix product. Either way it runs in about
+a second, so re-run it whenever a V constant is re-verified.
+
+Usage:  python policy_optimizer.py [budget_usd]
+"""
+import sys
+import time
+
+import numpy as np
+
+import stock_flow as sf
+from workforce_model import V
+
+try:
+    from scipy.optimize import linprog
+except ImportError:  # optional: fall back to the numpy search
+    linprog = None
+
+# ASSUMPTIONS for the optimizer (flagged; placeholders until sourced)
+CAPACITY = dict(
+    enroll_min=V['enroll_2023'],            # programs do not shrink below the V5 level
+    enroll_max=3 * V['enroll_2023'],        # A5 upper bound (S2, tripling)
+    enroll_ramp=V['enroll_2023'],           # at most one 2023-sized increment per year
+    accel_max=V['jobs_per_year_hi'],        # V6: no point training past total openings
+    accel_ramp=3_000,                       # providers add at most 3,000 seats per year
+)
+COSTS = dict(
+    enroll=30_000,                          # USD per enrolled degree student-year
+    accel=8_000,                            # USD per accelerated-pathway start
+)
+POLICY_YEARS = np.arange(2027, 2036)        # grants take effect from 2027, as in S1/S2
+GAP_WINDOW = (2026, 2035)
+
+
+def response(params=None, dt=0.25, policy_years=POLICY_YEARS):
+    '''Baseline outputs and the linear response to each decision variable.
+
+    Returns (years, base, J) where base holds per-tier entrants and openings
+    for the status-quo policy and J[tier] has shape (T, 2 * D): entrants per
+    unit of enroll[y] (first D columns) and accel[y] (last D columns).
+    '''
+    params = params or sf.make_params(1)
+    years = sf.time_grid(2015, 2040, dt)
+    D = len(policy_years)
+    n = 1 + 2 * D
+    p = {k: np.broadcast_to(v[:1], (n,)).copy() for k, v in params.items()}
+
+    enroll = np.repeat(sf.scenario_enrollment([1.0], years), n, axis=0)
+    accel = np.zeros((n, len(years)))
+    # Row 1 + j perturbs decision j by one student/start in its policy year
+    year_of = np.floor(years + 1e-9)
+    for j, y in enumerate(policy_years):
+        enroll[1 + j, year_of == y] += 1.0
+        accel[1 + D + j, year_of == y] += 1.0
+    out = sf.simulate(enroll, p, years, accel)
+
+    base = {k: out[k][0] for k in ('eng_entrants', 'prac_entrants', 'eng_openings', 'prac_openings')}
+    J = {tier: (out[f'{tier}_entrants'][1:] - out[f'{tier}_entrants'][0]).T for tier in ('eng', 'prac')}
+    return years, base, J
+
+
+def _problem(params, dt, capacity, costs, weights, window, policy_years):
+    '''Objective pieces shared by both solvers.'''
+    years, base, J = response(params, dt, policy_years)
+    w = (years >= window[0]) & (years < window[1] + 1 - dt / 2)
+    D = len(policy_years)
+    lo = np.r_[np.full(D, capacity['enroll_min']), np.zeros(D)]
+    hi = np.r_[np.full(D, capacity['enroll_max']), np.full(D, capacity['accel_max'])]
+    cost = np.r_[np.full(D, costs['enroll']), np.full(D, costs['accel'])]
+    status_quo = np.r_[np.full(D, V['enroll_2023']), np.zeros(D)]
+    shortfall = {t: (base[f'{t}_openings'] - base[f'{t}_entrants'])[w] for t in ('eng', 'prac')}
+    return dict(years=years, dt=dt, D=D, lo=lo, hi=hi, cost=cost, status_quo=status_quo, weights=weights,
+                J={t: J[t][w] for t in J}, shortfall=shortfall)
+
+
+def _gaps(prob, x):
+    '''Cumulative unfilled openings per tier for a batch of policies x (P, 2D).'''
+    # The baseline already runs the status quo, so only the change from it adds entrants
+    dx = x - prob['status_quo']
+    return {t: np.maximum(prob['shortfall'][t] - dx @ prob['J'][t].T, 0).sum(axis=-1) * prob['dt']
+            for t in ('eng', 'prac')}
+
+
+def simulated_gaps(x, params=None, dt=0.25, window=GAP_WINDOW, policy_years=POLICY_YEARS):
+    '''Cumulative unfilled openings per tier from a full stock-flow run of policy x (2D,).'''
+    params = params or sf.make_params(1)
+    years = sf.time_grid(2015, 2040, dt)
+    D = len(policy_years)
+    enroll = sf.scenario_enrollment([1.0], years)
+    accel = np.zeros((1, len(years)))
+    year_of = np.floor(years + 1e-9)
+    for j, y in enumerate(policy_years):
+        enroll[0, year_of == y] = x[j]
+        accel[0, year_of == y] = x[D + j]
+    out = sf.simulate(enroll, {k: v[:1] for k, v in params.items()}, years, accel)
+    w = (years >= window[0]) & (years < window[1] + 1 - dt / 2)
+    return {t: float(np.maximum(out[f'{t}_openings'][0] - out[f'{t}_entrants'][0], 0)[w].sum() * dt)
+            for t in ('eng', 'prac')}
+
+
+def check(prob, x, params=None, window=GAP_WINDOW, policy_years=POLICY_YEARS, rtol=1e-6):
+    '''Raise ValueError unless the linear model reproduces the simulated gaps of policy x.'''
+    linear = _gaps(prob, np.asarray(x, dtype=float)[None])
+    simulated = simulated_gaps(x, params, prob['dt'], window, policy_years)
+    for t in ('eng', 'prac'):
+        if not np.isclose(linear[t][0], simulated[t], rtol=rtol, atol=1e-6):
+            raise ValueError(f"{t} gap is {linear[t][0]:,.2f} in the linear model "
+                             f"but {simulated[t]:,.2f} when simulated")
+
+
+def _solve_lp(prob, capacity, budget, start):
+    '''Exact solution with scipy's HiGHS LP solver.'''
+    D, dt = prob['D'], prob['dt']
+    Je, Jp = prob['J']['eng'], prob['J']['prac']
+    Te, Tp = len(Je), len(Jp)
+    nx = 2 * D
+    # Variables: x (2D), u_eng (Te), u_prac (Tp)
+    eps = 1e-9
+    c = np.r_[eps * prob['cost'], np.full(Te, prob['weights']['eng'] * dt),
+              np.full(Tp, prob['weights']['prac'] * dt)]
+    rows, rhs = [], []
+    # -J x - u <= -(shortfall + J status_quo), i.e. u >= shortfall - J (x - status_quo)
+    rows.append(np.hstack([-Je, -np.eye(Te), np.zeros((Te, Tp))]))
+    rhs.append(-(prob['shortfall']['eng'] + Je @ prob['status_quo']))
+    rows.append(np.hstack([-Jp, np.zeros((Tp, Te)), -np.eye(Tp)]))
+    rhs.append(-(prob['shortfall']['prac'] + Jp @ prob['status_quo']))
+    # Ramp limits: x[j] - x[j-1] <= ramp; the first year ramps from the start level
+    for block, ramp, s0 in ((0, capacity['enroll_ramp'], start[0]), (D, capacity['accel_ramp'], start[1])):
+        R = np.zeros((D, nx + Te + Tp))
+        R[np.arange(D), block + np.arange(D)] = 1
+        R[np.arange(1, D), block + np.arange(D - 1)] = -1
+        rows.append(R)
+        rhs.append(np.r_[s0 + ramp, np.full(D - 1, ramp)])
+    if budget is not None:
+        rows.append(np.r_[prob['cost'], np.zeros(Te + Tp)][None])
+        rhs.append([budget + prob['cost'] @ prob['status_quo']])
+    bounds = [(l, h) for l, h in zip(prob['lo'], prob['hi'])] + [(0, None)] * (Te + Tp)
+    res = linprog(c, A_ub=np.vstack(rows), b_ub=np.concatenate(rhs), bounds=bounds, method='highs')
+    if not res.success:
+        raise ValueError(f"policy LP failed: {res.message}")
+    return res.x[:nx]
+
+
+def _repair(prob, capacity, budget, start, x):
+    '''Project a batch of candidate policies onto the constraints.'''
+    D = prob['D']
+    x = np.clip(x, prob['lo'], prob['hi'])
+    for block, ramp, s0 in ((0, capacity['enroll_ramp'], start[0]), (D, capacity['accel_ramp'], start[1])):
+        prev = np.full(len(x), float(s0))
+        for j in range(block, block + D):
+            x[:, j] = np.minimum(x[:, j], prev + ramp)
+            prev = x[:, j]
+    if budget is not None:
+        extra = (x - prob['status_quo']) @ prob['cost']
+        scale = np.clip(budget / np.maximum(extra, 1e-9), 0, 1)
+        x = prob['status_quo'] + (x - prob['status_quo']) * scale[:, None]
+    return x
+
+
+def _solve_search(prob, capacity, budget, start, population=4000, elite=200, iterations=150, seed=0):
+    '''Batched cross-entropy search: sample, repair, score, refit to the elite.'''
+    rng = np.random.default_rng(seed)
+    mean = (prob['lo'] + prob['hi']) / 2
+    std = (prob['hi'] - prob['lo']) / 2
+    best, best_score = None, np.inf
+    span = np.maximum(prob['hi'] - prob['lo'], 1)
+    for _ in range(iterations):
+        x = _repair(prob, capacity, budget, start, mean + std * rng.standard_normal((population, len(mean))))
+        g = _gaps(prob, x)
+        score = prob['weights']['eng'] * g['eng'] + prob['weights']['prac'] * g['prac'] + 1e-9 * (x @ prob['cost'])
+        order = np.argsort(score)[:elite]
+        if score[order[0]] < best_score:
+            best, best_score = x[order[0]].copy(), score[order[0]]
+        mean = x[order].mean(axis=0)
+        std = np.maximum(x[order].std(axis=0), 1e-3 * span)
+        if std.max() < 1e-2 * span.min():
+            break
+    return best
+
+
+def optimize(params=None, dt=0.25, budget=None, capacity=None, costs=None,
+             weights=None, window=GAP_WINDOW, policy_years=POLICY_YEARS, solver=None):
+    '''Cheapest policy mix minimizing cumulative unfilled openings in window.
+
+    solver is 'lp' (needs scipy), 'search', or None to pick the best available.
+    budget and the returned cost count spending above the status quo (V5
+    enrollment held at the 2023 level, no accelerated cohorts).
+    Returns a dict with the yearly enroll/accel plans, per-tier cumulative gaps,
+    cost and the solver used.
+    '''
+    capacity = dict(CAPACITY, **(capacity or {}))
+    costs = dict(COSTS, **(costs or {}))
+    weights = dict(dict(eng=1.0, prac=1.0), **(weights or {}))
+    solver = solver or ('lp' if linprog is not None else 'search')
+    if solver == 'lp' and linprog is None:
+        raise ImportError("solver='lp' needs scipy; use solver='search'")
+
+    prob = _problem(params, dt, capacity, costs, weights, window, policy_years)
+    start = (V['enroll_2023'], 0.0)
+    t0 = time.perf_counter()
+    if solver == 'lp':
+        x = _solve_lp(prob, capacity, budget, start)
+    else:
+        x = _solve_search(prob, capacity, budget, start)
+    elapsed = time.perf_counter() - t0
+
+    g = _gaps(prob, x[None])
+    D = prob['D']
+    return dict(
+        years=np.asarray(policy_years),
+        enroll=x[:D], accel=x[D:],
+        eng_gap=float(g['eng'][0]), prac_gap=float(g['prac'][0]),
+        cost=float((x - prob['status_quo']) @ prob['cost']),
+        solver=solver, seconds=elapsed,
+    )
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    prob = _problem(None, 0.25, CAPACITY, COSTS, dict(eng=1.0, prac=1.0), GAP_WINDOW, POLICY_YEARS)
+    # The status quo must reproduce the simulated baseline, and the chosen mix its own run
+    check(prob, prob['status_quo'])
+    status_quo = _gaps(prob, prob['status_quo'][None])
+    r = optimize(budget=budget)
+    check(prob, np.r_[r['enroll'], r['accel']])
+    print(f"Policy mix ({r['solver']}, {r['seconds']:.2f}s)"
+          + (f", budget ${budget:,.0f}" if budget is not None else ''))
+    print(f"{'year':>6} {'enrollment':>11} {'accel starts':>13}")
+    for y, e, a in zip(r['years'], r['enroll'], r['accel']):
+        print(f"{y:>6} {e:>11,.0f} {a:>13,.0f}")
+    print(f"Cumulative unfilled openings {GAP_WINDOW[0]}-{GAP_WINDOW[1]}: "
+          f"engineer {r['eng_gap']:,.0f} (status quo {status_quo['eng'][0]:,.0f}), "
+          f"practitioner {r['prac_gap']:,.0f} (status quo {status_quo['prac'][0]:,.0f})")
+    print(f"Cost above status quo ${r['cost']:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""
+On-disk result store for model outputs.
+
+A result is a named set of numpy columns (trajectories, summary-table
+columns) computed from some inputs and, optionally, from other results:
+
+    @result('trajectories', inputs=lambda: dict(V=pick(V, 'enroll_2023'), ...))
+    def trajectories():
+        return dict(years=YEARS, graduates=...)
+
+    @result('gap_table', inputs=lambda: ..., deps=('trajectories',))
+    def gap_table(trajectories):
+        ...
+
+Calling the decorated function returns the stored columns when they exist
+and computes and stores them otherwise. The key of a result hashes its
+version, the values returned by its inputs(), the source of the model code
+it runs and the keys of its deps, so a changed V/A constant or scenario
+definition invalidates exactly the results that read it, plus everything
+downstream of them. The code is every module in this directory that
+compute() reaches through its module's globals (workforce_model.py,
+stock_flow.py, ...), hashed whole: editing any of them recomputes the
+results that use it, including an edit that does not touch V or A.
+
+Layout: STORE_DIR/<name>/<key>/<column>.npy plus meta.json. One .npy file
+per column (rather than a zipped .npz) keeps every column loadable with
+np.load(mmap_mode='r'), so readers map only the columns they touch.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.results')
+
+REGISTRY = {}
+
+
+class Result(dict):
+    '''Columns of one stored result, with the name and key it was stored under.'''
+
+    def __init__(self, name, key, columns, computed):
+        super().__init__(columns)
+        self.name = name
+        self.key = key
+        self.computed = computed
+
+
+def pick(mapping, *names):
+    '''The named entries of mapping, for declaring which inputs a result reads.'''
+    return {k: mapping[k] for k in names}
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"cannot hash input of type {type(value).__name__}")
+
+
+def code_files(compute):
+    '''Source files of the local modules compute() can reach, its own included.'''
+    root = os.path.dirname(os.path.abspath(inspect.getsourcefile(compute)))
+    files = {}
+    stack = [inspect.getmodule(compute)]
+    while stack:
+        module = stack.pop()
+        path = getattr(module, '__file__', None)
+        if not path or module.__name__ in files or os.path.dirname(os.path.abspath(path)) != root:
+            continue
+        files[module.__name__] = os.path.abspath(path)
+        for obj in vars(module).values():
+            if inspect.ismodule(obj):
+                stack.append(obj)
+            elif inspect.isfunction(obj) or inspect.isclass(obj):
+                stack.append(inspect.getmodule(obj))
+    return sorted(files.values())
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def code_hash(compute):
+    '''Hash of the source files a result's computation depends on.'''
+    digest = hashlib.sha256()
+    for path in code_files(compute):
+        st = os.stat(path)
+        digest.update(os.path.basename(path).encode('utf-8'))
+        digest.update(_file_digest(path, st.st_mtime_ns, st.st_size).encode('ascii'))
+    return digest.hexdigest()
+
+
+def result_key(name):
+    '''Content key of a registered result, following its dependencies.'''
+    spec = REGISTRY[name]
+    payload = dict(
+        name=name,
+        version=spec['version'],
+        inputs=spec['inputs'](),
+        code=code_hash(spec['compute']),
+        deps={d: result_key(d) for d in spec['deps']},
+    )
+    blob = json.dumps(payload, sort_keys=True, default=_jsonable).encode('utf-8')
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def load(name, key, root=STORE_DIR):
+    '''Memory-mapped columns of a stored result, or None if it is not stored.'''
+    path = os.path.join(root, name, key)
+    try:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return {c: np.load(os.path.join(path, c + '.npy'), mmap_mode='r') for c in meta['columns']}
+
+
+def save(name, key, columns, root=STORE_DIR):
+    '''Write the columns of a result; the directory appears atomically.'''
+    parent = os.path.join(root, name)
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent, prefix='.tmp-')
+    try:
+        for c, values in columns.items():
+            np.save(os.path.join(tmp, c + '.npy'), np.asarray(values), allow_pickle=False)
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(dict(name=name, key=key, columns=list(columns)), f, indent=2)
+        os.replace(tmp, os.path.join(parent, key))
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(os.path.join(parent, key)):
+            raise
+
+
+def get(name, root=STORE_DIR):
+    '''Stored result if its key is current, otherwise compute and store it.'''
+    spec = REGISTRY[name]
+    key = result_key(name)
+    columns = load(name, key, root)
+    if columns is not None:
+        return Result(name, key, columns, computed=False)
+    deps = {d: get(d, root) for d in spec['deps']}
+    save(name, key, spec['compute'](**deps), root)
+    return Result(name, key, load(name, key, root), computed=True)
+
+
+def result(name, inputs=lambda: {}, deps=(), version=1):
+    '''Register compute() as a stored result; calling it returns the columns.'''
+    def register(compute):
+        REGISTRY[name] = dict(compute=compute, inputs=inputs, deps=tuple(deps), version=version)
+
+        @functools.wraps(compute)
+        def cached(root=STORE_DIR):
+            return get(name, root)
+        return cached
+    return register
+
+
+def prune(root=STORE_DIR):
+    '''Delete stored keys of registered results that are no longer current.'''
+    removed = 0
+    for name in REGISTRY:
+        if not os.path.isdir(os.path.join(root, name)):
+            continue
+        current = result_key(name)
+        for key in os.listdir(os.path.join(root, name)):
+            if key != current:
+                shutil.rmtree(os.path.join(root, name, key), ignore_errors=True)
+                removed += 1
+    return removed
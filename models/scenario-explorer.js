@@ -0,0 +1,130 @@
+/*
+ * Scenario explorer for the Minerals Workforce Pipeline Model.
+ * Fetches the precomputed trajectory table (workforce-scenarios.bin, built by
+ * build_scenario_tables.py) once, then answers every slider move by
+ * interpolating between grid points in the browser.
+ */
+(function () {
+    'use strict';
+
+    var root = document.getElementById('scenario-explorer');
+    if (!root) return;
+    var canvas = root.querySelector('canvas');
+    var ctx = canvas.getContext('2d');
+    var controls = {};
+    ['lag', 'multiplier', 'industry_entry', 'eng_openings'].forEach(function (name) {
+        controls[name] = root.querySelector('[name="' + name + '"]');
+    });
+    var out = {
+        gap: root.querySelector('[data-out="gap"]'),
+        first: root.querySelector('[data-out="first"]'),
+    };
+
+    var table = null;
+
+    function parse(buffer) {
+        var view = new DataView(buffer);
+        var magic = String.fromCharCode.apply(null, new Uint8Array(buffer, 0, 4));
+        if (magic !== 'WFS1') throw new Error('not a scenario table');
+        var len = view.getUint32(4, true);
+        var header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, len)));
+        var offset = Math.ceil((8 + len) / 8) * 8;
+        header.data = new Int16Array(buffer, offset);
+        return header;
+    }
+
+    // Position of x on a sorted axis as (lower index, weight of upper)
+    function locate(axis, x) {
+        if (x <= axis[0]) return [0, 0];
+        for (var i = 0; i < axis.length - 1; i++) {
+            if (x <= axis[i + 1]) return [i, (x - axis[i]) / (axis[i + 1] - axis[i])];
+        }
+        return [axis.length - 2, 1];
+    }
+
+    function trajectory(lag, multiplier) {
+        var s = table.shape, n = s[2];
+        var li = Math.max(0, table.axes.lag.indexOf(lag));
+        var m = locate(table.axes.multiplier, multiplier);
+        var lo = (li * s[1] + m[0]) * n, hi = lo + (m[1] ? n : 0);
+        var result = new Float64Array(n);
+        for (var t = 0; t < n; t++) {
+            result[t] = ((1 - m[1]) * table.data[lo + t] + m[1] * table.data[hi + t]) * table.scale;
+        }
+        return result;
+    }
+
+    function values() {
+        return {
+            lag: parseInt(controls.lag.value, 10),
+            multiplier: parseFloat(controls.multiplier.value),
+            industry_entry: parseFloat(controls.industry_entry.value),
+            eng_openings: parseFloat(controls.eng_openings.value),
+        };
+    }
+
+    function draw() {
+        var v = values(), years = table.years;
+        var supply = trajectory(v.lag, v.multiplier).map(function (g) {
+            return g * v.industry_entry;
+        });
+        root.querySelectorAll('[data-value]').forEach(function (el) {
+            el.textContent = controls[el.getAttribute('data-value')].value;
+        });
+
+        var gap = 0, first = null;
+        years.forEach(function (y, i) {
+            if (y >= 2026 && y <= 2035) gap += Math.max(v.eng_openings - supply[i], 0);
+            if (first === null && y >= 2026 && supply[i] >= v.eng_openings) first = y;
+        });
+        out.gap.textContent = Math.round(gap).toLocaleString();
+        out.first.textContent = first === null ? 'not by ' + years[years.length - 1] : first;
+
+        var w = canvas.width, h = canvas.height, pad = 40;
+        var ymax = Math.max(v.eng_openings * 1.5, Math.max.apply(null, supply)) * 1.1;
+        var x = function (y) { return pad + (y - years[0]) / (years[years.length - 1] - years[0]) * (w - 2 * pad); };
+        var y = function (g) { return h - pad - g / ymax * (h - 2 * pad); };
+
+        ctx.clearRect(0, 0, w, h);
+        ctx.fillStyle = 'rgba(192, 57, 43, 0.15)';
+        ctx.fillRect(pad, y(v.eng_openings + 100), w - 2 * pad, y(v.eng_openings - 100) - y(v.eng_openings + 100));
+        ctx.strokeStyle = '#c0392b';
+        ctx.setLineDash([6, 4]);
+        ctx.beginPath(); ctx.moveTo(pad, y(v.eng_openings)); ctx.lineTo(w - pad, y(v.eng_openings)); ctx.stroke();
+        ctx.setLineDash([]);
+
+        ctx.strokeStyle = '#1f5fa8';
+        ctx.lineWidth = 2.5;
+        ctx.beginPath();
+        supply.forEach(function (g, i) { i ? ctx.lineTo(x(years[i]), y(g)) : ctx.moveTo(x(years[i]), y(g)); });
+        ctx.stroke();
+        ctx.lineWidth = 1;
+
+        ctx.fillStyle = '#4a5568';
+        ctx.font = '12px Inter, sans-serif';
+        for (var yr = 2015; yr <= 2040; yr += 5) ctx.fillText(yr, x(yr) - 14, h - pad + 18);
+        ctx.fillText('0', 8, y(0) + 4);
+        ctx.fillText(Math.round(ymax), 4, y(ymax) + 12);
+    }
+
+    var queued = false;
+    function schedule() {
+        if (queued) return;
+        queued = true;
+        requestAnimationFrame(function () { queued = false; draw(); });
+    }
+
+    fetch(root.getAttribute('data-table'))
+        .then(function (r) { return r.arrayBuffer(); })
+        .then(function (buffer) {
+            table = parse(buffer);
+            Object.keys(controls).forEach(function (name) {
+                if (table.defaults[name] !== undefined) controls[name].value = table.defaults[name];
+                controls[name].addEventListener('input', schedule);
+            });
+            draw();
+        })
+        .catch(function () {
+            root.querySelector('.explorer-status').textContent = 'The scenario table could not be loaded.';
+        });
+})();
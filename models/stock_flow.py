@@ -0,0 +1,148 @@
+"""
+Discrete-time stock-and-flow engine for the two-tier workforce model.
+
+Advances every scenario and parameter draw at once: inputs and outputs are
+(n, T) arrays, where n is the number of scenario/draw combinations and T the
+number of time steps. Flows are rates per year, so the same model runs on
+the notebook's annual YEARS grid or on a sub-annual grid like the 0.25-year
+years_fine grid of Figure 3.
+
+Tiers and flows
+    engineer tier      degree enrollment -> (A1 lag, A2 completion, V2
+                       calibration, A3 industry entry) -> engineer entrants
+    practitioner tier  accelerated intake -> (A6 accel_lag, accel_completion)
+                       -> practitioner entrants
+    both tiers         retirements at a constant hazard calibrated to V1
+Demand per tier follows the notebook's demand table: engineer openings (A4)
+and practitioner openings (V6 total minus A4).
+
+With dt=1, integer lags and no accelerated intake, engineer entrants equal
+the notebook's graduates(enrollment_path(s)) * A['industry_entry'] exactly.
+"""
+import numpy as np
+
+from workforce_model import A, V, enrollment_paths
+
+# Program length used to turn enrollment levels into entering cohorts (A7)
+PROGRAM_YEARS = A['lag']
+
+# ASSUMPTIONS added by the engine (flagged; not in the v0.2 notebook)
+DEFAULTS = dict(
+    lag=A['lag'],
+    completion=A['completion'],
+    industry_entry=A['industry_entry'],
+    eng_openings=A['eng_openings'],
+    accel_lag=A['accel_lag'],
+    accel_completion=1.0,             # share of accelerated intake that enters work
+    jobs_per_year=(V['jobs_per_year_lo'] + V['jobs_per_year_hi']) / 2,
+    # V1: ~221,000 retire by 2029, "more than half" the workforce -> at most
+    # 2 x V1 workers in 2023, half of whom leave over 2023-2029
+    workforce_2023=2 * V['retirees_by_2029'],
+    engineers_2023=15 * V['degrees_2020'],   # ~15 graduating classes at the V2 rate
+    retire_halflife=2029 - 2023,
+)
+
+
+def time_grid(start=2015, end=2040, dt=1.0):
+    '''Time points from start to end inclusive, dt years apart.'''
+    return np.round(np.arange(start, end + dt / 2, dt), 6)
+
+
+def make_params(n, **values):
+    '''Parameter arrays of shape (n,), from DEFAULTS overridden by values.'''
+    unknown = set(values) - set(DEFAULTS)
+    if unknown:
+        raise KeyError(f"unknown parameters: {sorted(unknown)}")
+    return {k: np.broadcast_to(np.asarray(values.get(k, v), dtype=float), (n,)).copy()
+            for k, v in DEFAULTS.items()}
+
+
+def product_params(**axes):
+    '''Cartesian product of parameter values: every combination becomes one row.'''
+    names = list(axes)
+    grids = np.meshgrid(*[np.asarray(axes[k], dtype=float) for k in names], indexing='ij')
+    n = grids[0].size if grids else 1
+    return make_params(n, **{k: g.ravel() for k, g in zip(names, grids)})
+
+
+def sample_params(n, ranges, seed=0):
+    '''n parameter draws, uniform within each (lo, hi) range; other params default.'''
+    rng = np.random.default_rng(seed)
+    return make_params(n, **{k: rng.uniform(lo, hi, n) for k, (lo, hi) in ranges.items()})
+
+
+def _delayed(rate, steps):
+    '''rate shifted right by a per-row number of steps (zeros before the start).'''
+    n, T = rate.shape
+    src = np.arange(T)[None, :] - steps[:, None]
+    out = np.take_along_axis(rate, np.clip(src, 0, T - 1), axis=1)
+    out[src < 0] = 0.0
+    return out
+
+
+def simulate(enroll, params, years, accel_intake=None, calibrate=True):
+    '''Run the two-tier model for every row of enroll/params at once.
+
+    enroll        (n, T) degree-program enrollment level on the years grid
+    params        dict of (n,) arrays, e.g. from make_params/product_params
+    years         (T,) evenly spaced time grid
+    accel_intake  (n, T) accelerated-pathway starts per year (default none)
+
+    Returns a dict of (n, T) arrays (per-year rates unless noted):
+    eng_entrants, prac_entrants, eng_openings, prac_openings, eng_gap,
+    prac_gap, retirements, eng_stock and prac_stock (headcounts).
+    '''
+    years = np.asarray(years, dtype=float)
+    enroll = np.atleast_2d(np.asarray(enroll, dtype=float))
+    n, T = enroll.shape
+    dt = years[1] - years[0] if T > 1 else 1.0
+    p = {k: np.broadcast_to(v, (n,)) for k, v in params.items()}
+    if accel_intake is None:
+        accel_intake = np.zeros((n, T))
+
+    out = {k: np.empty((n, T)) for k in ('eng_stock', 'prac_stock', 'retirements')}
+
+    # Engineer tier: cohort = enrollment / program length, graduating lag later
+    lag_steps = np.rint(p['lag'] / dt).astype(int)
+    grads = _delayed(enroll / PROGRAM_YEARS, lag_steps) * p['completion'][:, None]
+    if calibrate:
+        i2020 = int(np.argmin(np.abs(years - 2020)))
+        grads *= (V['degrees_2020'] / grads[:, i2020])[:, None]
+    eng_in = grads * p['industry_entry'][:, None]
+
+    # Practitioner tier: accelerated cohorts produce workers accel_lag later
+    accel_steps = np.rint(p['accel_lag'] / dt).astype(int)
+    prac_in = _delayed(np.asarray(accel_intake, dtype=float), accel_steps) * p['accel_completion'][:, None]
+
+    # Stocks advance together; one vector update per time step for all rows
+    hazard = np.log(2) / p['retire_halflife']
+    keep = np.exp(-hazard * dt)
+    eng = p['engineers_2023'] * np.exp(hazard * (2023 - years[0]))
+    prac = (p['workforce_2023'] - p['engineers_2023']) * np.exp(hazard * (2023 - years[0]))
+    for t in range(T):
+        out['eng_stock'][:, t] = eng
+        out['prac_stock'][:, t] = prac
+        out['retirements'][:, t] = (eng + prac) * hazard
+        eng = eng * keep + eng_in[:, t] * dt
+        prac = prac * keep + prac_in[:, t] * dt
+
+    out['eng_entrants'] = eng_in
+    out['prac_entrants'] = prac_in
+    out['eng_openings'] = np.broadcast_to(p['eng_openings'][:, None], (n, T))
+    out['prac_openings'] = np.broadcast_to((p['jobs_per_year'] - p['eng_openings'])[:, None], (n, T))
+    out['eng_gap'] = np.maximum(out['eng_openings'] - eng_in, 0)
+    out['prac_gap'] = np.maximum(out['prac_openings'] - prac_in, 0)
+    return out
+
+
+def cumulative(rate, years, start=2026, end=2035):
+    '''Total of a per-year rate over [start, end], integrated on the grid.'''
+    years = np.asarray(years, dtype=float)
+    dt = years[1] - years[0] if len(years) > 1 else 1.0
+    w = (years >= start) & (years < end + 1 - dt / 2)
+    return rate[..., w].sum(axis=-1) * dt
+
+
+def scenario_enrollment(multipliers, years):
+    '''Enrollment paths on any time grid for a batch of A5 multipliers.'''
+    return enrollment_paths(multipliers, np.floor(np.asarray(years) + 1e-9))
@@ -0,0 +1,84 @@
+"""
+The Minerals Workforce Pipeline Model, as an importable module.
+
+Mirrors the data layer and cohort model of workforce_pipeline_model_v02.ipynb
+(sections 1-2) so that build steps can evaluate the model without running
+the notebook. V holds VERIFIED constants, A the flagged assumptions; see the
+notebook for sources and sensitivity ranges.
+"""
+import numpy as np
+
+# ---------------- VERIFIED constants (see notebook table) ----------------
+V = dict(
+    retirees_by_2029      = 221_000,   # V1: SME
+    degrees_2020          = 327,       # V2: CSIS
+    grad_drop_2016_2020   = 0.39,      # V3: CSIS
+    enroll_2023           = 600,       # V5: <600; modeled at the bound (conservative)
+    enroll_2015           = 1_500,     # V5: "~1,500 eight years earlier"
+    jobs_per_year_lo      = 11_000,    # V6: SME
+    jobs_per_year_hi      = 13_000,    # V6: SME
+)
+V['degrees_2016'] = round(V['degrees_2020'] / (1 - V['grad_drop_2016_2020']))  # ≈ 536
+
+# ---------------- ASSUMPTIONS (flagged, with sensitivity ranges) ----------------
+A = dict(lag=4, completion=0.70, industry_entry=0.80,
+         eng_openings=400,   # A4 anchored to V11 (BLS OOH)
+         accel_lag=1.5)
+
+YEARS = np.arange(2015, 2041)
+
+# Enrollment multiplier reached from 2028 under each named scenario (A5)
+SCENARIO_MULTIPLIERS = {
+    'S0_baseline': 1.0,
+    'S1_grant_doubling': 2.0,
+    'S2_grant_tripling': 3.0,
+}
+
+
+def enrollment_path(scenario, years=YEARS):
+    '''Annual new-cohort enrollment (proxied by total enrollment level, A7).'''
+    return enrollment_paths(np.array([SCENARIO_MULTIPLIERS.get(scenario, 1.0)]), years)[0]
+
+
+def enrollment_paths(multipliers, years=YEARS):
+    '''Enrollment for a batch of policy responses, shape (len(multipliers), len(years)).
+
+    A multiplier m reproduces the notebook scenarios: enrollment steps halfway
+    to m x the 2023 level in 2027 and reaches it from 2028 (m=2 is S1, m=3 S2).
+    '''
+    multipliers = np.asarray(multipliers, dtype=float).reshape(-1, 1)
+    years = np.asarray(years, dtype=float)
+    base = np.where(years <= 2023,
+                    np.interp(years, [2015, 2023], [V['enroll_2015'], V['enroll_2023']]),
+                    V['enroll_2023'])
+    e = np.broadcast_to(base, (len(multipliers), len(years))).copy()
+    e[:, years == 2027] = V['enroll_2023'] * (1 + multipliers) / 2
+    e[:, years >= 2028] = V['enroll_2023'] * multipliers
+    return e
+
+
+def graduates(enroll, lag=None, completion=None, calibrate=True, years=YEARS):
+    '''G(t) = k * completion * cohort_share_of_enrollment(t - lag).
+    Enrollment level -> entering-cohort size via division by program length
+    (steady-state approximation), lagged, discounted by completion, and scaled
+    by a single calibration constant k chosen so the model reproduces the
+    VERIFIED 2020 graduation count (V2) exactly. k > 1 indicates the degree
+    series (V2) covers a somewhat broader population than the enrollment
+    series (V5) -- a commensurability gap documented as limitation L0.
+
+    enroll may be a single path or a (scenarios, years) batch.'''
+    lag = lag or A['lag']; completion = completion or A['completion']
+    cohort = np.asarray(enroll, dtype=float) / A['lag']
+    g = np.zeros_like(cohort)
+    g[..., lag:] = cohort[..., :-lag] * completion
+    if calibrate:
+        i2020 = np.where(years == 2020)[0][0]
+        k = V['degrees_2020'] / g[..., i2020:i2020 + 1]
+        g = g * k
+    return g
+
+
+def cumulative_gap(supply, need, years=YEARS, start=2026, end=2035):
+    '''Running total of unfilled openings max(need - supply, 0) over [start, end].'''
+    w = (years >= start) & (years <= end)
+    return np.cumsum(np.maximum(need - np.asarray(supply)[..., w], 0), axis=-1)
@@ -0,0 +1,124 @@
+/*
+ * Curriculum search for edikan.ai
+ * Loads the small document table once, then fetches only the index shards
+ * (grouped by two-letter term prefix) that the typed query needs.
+ * The index is built by archive/v1-tooling/search_index.py.
+ */
+(function () {
+    'use strict';
+
+    var STOPWORDS = ('a an and are as at be but by can do for from has have if in into is it its ' +
+        'not of on or so that the their then there these this to was we were what ' +
+        'when which who will with you your').split(' ');
+    // Single letters that are curriculum languages; keep in step with search_index.py
+    var SHORT_TERMS = ['c', 'r'];
+
+    var script = document.currentScript;
+    var base = (script && script.getAttribute('data-index')) || 'search/';
+    var input = document.getElementById('search-input');
+    var results = document.getElementById('search-results');
+    if (!input || !results) return;
+
+    var meta = null;
+    var shards = {};
+
+    function fetchJSON(url) {
+        return fetch(url).then(function (r) {
+            if (!r.ok) throw new Error(url + ': ' + r.status);
+            return r.json();
+        });
+    }
+
+    function loadMeta() {
+        if (!meta) meta = fetchJSON(base + 'index.json');
+        return meta;
+    }
+
+    function loadShard(index, prefix) {
+        if (!index.shards[prefix]) return Promise.resolve({});
+        if (!shards[prefix]) {
+            shards[prefix] = fetchJSON(base + prefix + '.json?v=' + index.shards[prefix]);
+        }
+        return shards[prefix];
+    }
+
+    function tokenize(text) {
+        return (text.toLowerCase().match(/[a-z0-9]+/g) || []).filter(function (t) {
+            return (t.length > 1 || SHORT_TERMS.indexOf(t) !== -1) && STOPWORDS.indexOf(t) === -1;
+        });
+    }
+
+    // Expand delta-encoded doc ids into {docId: count}
+    function decode(posting) {
+        var hits = {}, id = 0;
+        for (var i = 0; i < posting[0].length; i++) {
+            id += posting[0][i];
+            hits[id] = posting[1][i];
+        }
+        return hits;
+    }
+
+    function search(query) {
+        var terms = tokenize(query);
+        if (!terms.length) return Promise.resolve([]);
+        return loadMeta().then(function (index) {
+            var n = index.docs.length;
+            return Promise.all(terms.map(function (term, i) {
+                return loadShard(index, term.slice(0, index.prefix_length)).then(function (shard) {
+                    // The last term is still being typed, so match it as a prefix
+                    var keys = i === terms.length - 1
+                        ? Object.keys(shard).filter(function (k) { return k.indexOf(term) === 0; })
+                        : (shard[term] ? [term] : []);
+                    var scores = {};
+                    keys.forEach(function (k) {
+                        var hits = decode(shard[k]);
+                        var idf = Math.log(1 + n / shard[k][0].length);
+                        Object.keys(hits).forEach(function (id) {
+                            scores[id] = (scores[id] || 0) + (1 + Math.log(hits[id])) * idf;
+                        });
+                    });
+                    return scores;
+                });
+            })).then(function (perTerm) {
+                // Every term must match
+                var total = perTerm[0];
+                perTerm.slice(1).forEach(function (scores) {
+                    Object.keys(total).forEach(function (id) {
+                        if (!(id in scores)) delete total[id];
+                        else total[id] += scores[id];
+                    });
+                });
+                return Object.keys(total)
+                    .sort(function (a, b) { return total[b] - total[a]; })
+                    .slice(0, 10)
+                    .map(function (id) { return index.docs[id]; });
+            });
+        });
+    }
+
+    function render(docs, query) {
+        results.innerHTML = '';
+        if (!query.trim()) return;
+        if (!docs.length) {
+            results.textContent = 'No modules match "' + query + '".';
+            return;
+        }
+        docs.forEach(function (doc) {
+            var a = document.createElement('a');
+            a.href = doc.url;
+            a.className = 'search-result';
+            a.textContent = doc.title;
+            results.appendChild(a);
+        });
+    }
+
+    var pending = 0;
+    input.addEventListener('input', function () {
+        var query = input.value, ticket = ++pending;
+        search(query).then(function (docs) {
+            if (ticket === pending) render(docs, query);
+        }).catch(function () {
+            results.textContent = 'Search is unavailable right now.';
+        });
+    });
+})();